@@ -0,0 +1,144 @@
+import os
+import threading
+from typing import Optional
+
+import httpx
+from dotenv import load_dotenv
+
+import replay
+from tracing import metrics, span
+
+load_dotenv()
+
+
+# Point at a local stub (e.g. http://127.0.0.1:9000) to run without the live API
+BASE_URL = os.getenv("AEROCRS_BASE_URL", "https://api.aerocrs.com/v5")
+
+# Connection pool + timeouts shared by every AeroCRS call in the process
+AEROCRS_TIMEOUT = float(os.getenv("AEROCRS_TIMEOUT", "30"))
+AEROCRS_CONNECT_TIMEOUT = float(os.getenv("AEROCRS_CONNECT_TIMEOUT", "5"))
+AEROCRS_MAX_CONNECTIONS = int(os.getenv("AEROCRS_MAX_CONNECTIONS", "100"))
+AEROCRS_MAX_KEEPALIVE = int(os.getenv("AEROCRS_MAX_KEEPALIVE", "20"))
+AEROCRS_KEEPALIVE_EXPIRY = float(os.getenv("AEROCRS_KEEPALIVE_EXPIRY", "30"))
+
+
+def get_headers() -> dict:
+    headers = {
+        "Content-Type": "application/json",
+        "auth_id": os.getenv("AUTHID"),
+        "auth_password": os.getenv("AUTHPASSSWORD")
+    }
+    # httpx rejects None header values (requests silently dropped them)
+    return {k: v for k, v in headers.items() if v is not None}
+
+
+# ─────────────────────────────────────────────
+# CLIENT — pooled, keep-alive, sync + async
+# ─────────────────────────────────────────────
+
+class AeroCRSClient:
+    """Thin wrapper around pooled httpx clients for the AeroCRS v5 API.
+
+    The sync client is used by the bot tools (which LangGraph runs in worker
+    threads); the async client is used by the FastAPI handlers. Both are
+    created lazily and reuse connections across calls. Pass `transport` /
+    `async_transport` (e.g. httpx.MockTransport) to serve canned responses.
+    """
+
+    def __init__(
+        self,
+        base_url: str = BASE_URL,
+        timeout: float = AEROCRS_TIMEOUT,
+        connect_timeout: float = AEROCRS_CONNECT_TIMEOUT,
+        max_connections: int = AEROCRS_MAX_CONNECTIONS,
+        max_keepalive: int = AEROCRS_MAX_KEEPALIVE,
+        keepalive_expiry: float = AEROCRS_KEEPALIVE_EXPIRY,
+        transport: Optional[httpx.BaseTransport] = None,
+        async_transport: Optional[httpx.AsyncBaseTransport] = None,
+    ):
+        self.base_url = base_url.rstrip("/")
+        self._timeout = httpx.Timeout(timeout, connect=connect_timeout)
+        self._limits = httpx.Limits(
+            max_connections=max_connections,
+            max_keepalive_connections=max_keepalive,
+            keepalive_expiry=keepalive_expiry,
+        )
+        self._transport = transport
+        self._async_transport = async_transport
+        self._sync: Optional[httpx.Client] = None
+        self._async: Optional[httpx.AsyncClient] = None
+        self._lock = threading.Lock()
+
+    def _client(self) -> httpx.Client:
+        if self._sync is None:
+            with self._lock:  # tool calls may race here from worker threads
+                if self._sync is None:
+                    self._sync = httpx.Client(
+                        base_url=self.base_url, timeout=self._timeout,
+                        limits=self._limits, transport=self._transport,
+                    )
+        return self._sync
+
+    def _async_client(self) -> httpx.AsyncClient:
+        if self._async is None:
+            self._async = httpx.AsyncClient(
+                base_url=self.base_url, timeout=self._timeout,
+                limits=self._limits, transport=self._async_transport,
+            )
+        return self._async
+
+    # ── tracing ──
+
+    @staticmethod
+    def _span(method: str, path: str):
+        endpoint = path.split("?", 1)[0]
+        return span(f"aerocrs.{method} {endpoint}", endpoint=endpoint, method=method)
+
+    @staticmethod
+    def _record(s, r: httpx.Response) -> dict:
+        s.set(status=r.status_code, bytes=len(r.content))
+        metrics.inc("travellink_aerocrs_response_bytes_total", len(r.content), endpoint=s.attrs["endpoint"])
+        data = r.json()
+        if replay.recording():
+            replay.record("aerocrs", key=replay.http_key(r.request.method, r.request.url),
+                          status=r.status_code, body=data)
+        return data
+
+    # ── sync ──
+
+    def get(self, path: str, params: Optional[dict] = None) -> dict:
+        with self._span("GET", path) as s:
+            r = self._client().get(path, params=params, headers=get_headers())
+            return self._record(s, r)
+
+    def post(self, path: str, payload: dict) -> dict:
+        with self._span("POST", path) as s:
+            r = self._client().post(path, json=payload, headers=get_headers())
+            return self._record(s, r)
+
+    # ── async ──
+
+    async def aget(self, path: str, params: Optional[dict] = None) -> dict:
+        with self._span("GET", path) as s:
+            r = await self._async_client().get(path, params=params, headers=get_headers())
+            return self._record(s, r)
+
+    async def apost(self, path: str, payload: dict) -> dict:
+        with self._span("POST", path) as s:
+            r = await self._async_client().post(path, json=payload, headers=get_headers())
+            return self._record(s, r)
+
+    def close(self) -> None:
+        if self._sync is not None:
+            self._sync.close()
+            self._sync = None
+
+    async def aclose(self) -> None:
+        if self._async is not None:
+            await self._async.aclose()
+            self._async = None
+        self.close()
+
+
+# Shared by app.py and bot.py
+client = AeroCRSClient()
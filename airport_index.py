@@ -0,0 +1,192 @@
+import re
+from collections import defaultdict
+from heapq import nlargest
+from typing import Optional
+
+from thefuzz import fuzz
+
+
+# Matching thresholds (same as the original linear scan)
+MATCH_THRESHOLD = 60
+SIMILAR_THRESHOLD = 40
+SIMILAR_LIMIT = 5
+
+# Most airports returned for one city by AirportIndex.group
+GROUP_LIMIT = 6
+
+# How many n-gram-ranked candidates get a real fuzzy score
+FUZZY_CANDIDATES = 64
+
+# Trigrams prune substring matches; bigrams rank fuzzy candidates so that
+# short misspellings ("sxto" → "sato") still share grams with the target
+_GRAM = 3
+_FUZZY_GRAM = 2
+
+
+def clean_text(text: str) -> str:
+    text = text.lower()
+    text = re.sub(r"[^a-z0-9 ]", " ", text)
+    return re.sub(r"\s+", " ", text).strip()
+
+
+def _grams(text: str, n: int = _GRAM) -> set:
+    return {text[i:i + n] for i in range(len(text) - n + 1)}
+
+
+# ─────────────────────────────────────────────
+# AIRPORT INDEX — built once per destination list
+# ─────────────────────────────────────────────
+
+class AirportIndex:
+    """Prebuilt lookup structures over a destination list.
+
+    - exact map: lowercased code / IATA → first destination position
+    - token index: cleaned name word → positions (also a city's airport group)
+    - first-word index: first name word → positions (short names inside a long query)
+    - trigram index: cleaned name trigram → positions (substring pruning)
+    - bigram index: cleaned name bigram → positions (fuzzy candidate ranking)
+
+    Lookups keep the semantics of the old linear scan: the first destination
+    (in list order) whose code/IATA equals the query or whose name contains
+    every query word wins; otherwise the best fuzzy score >= 60.
+    """
+
+    def __init__(self, destinations: list):
+        self.destinations = destinations
+        self._names = []
+        self._first_words = []
+        self._exact = {}
+        self._tokens = defaultdict(list)
+        self._by_first_word = defaultdict(list)
+        self._trigrams = defaultdict(list)
+        self._bigrams = defaultdict(list)
+
+        for pos, dest in enumerate(destinations):
+            name = clean_text(dest.get("name") or "")
+            self._names.append(name)
+            first_word = name.split()[0] if name else ""
+            self._first_words.append(first_word)
+            self._by_first_word[first_word].append(pos)
+            for key in ((dest.get("code") or "").lower(), (dest.get("iatacode") or "").lower()):
+                if key:
+                    self._exact.setdefault(key, pos)
+            for token in set(name.split()):
+                self._tokens[token].append(pos)
+            for gram in _grams(name):
+                self._trigrams[gram].append(pos)
+            for gram in _grams(name, _FUZZY_GRAM):
+                self._bigrams[gram].append(pos)
+
+    def __len__(self) -> int:
+        return len(self.destinations)
+
+    # ── exact / substring stage ──
+
+    def _substring_positions(self, words: list) -> list:
+        """Positions whose name may contain every word, in list order."""
+        postings = []
+        for word in words:
+            if len(word) < _GRAM:
+                continue  # too short to prune on; verified below
+            word_postings = [self._trigrams.get(g, ()) for g in _grams(word)]
+            postings.extend(word_postings)
+        if not postings:
+            return range(len(self._names))
+        postings.sort(key=len)
+        candidates = set(postings[0])
+        for p in postings[1:]:
+            if not candidates:
+                break
+            candidates.intersection_update(p)
+        return sorted(candidates)
+
+    def _first_exact(self, query: str) -> Optional[int]:
+        best = self._exact.get(query)
+        words = query.split()
+        for pos in self._substring_positions(words):
+            if best is not None and pos >= best:
+                break
+            name = self._names[pos]
+            if all(w in name for w in words):
+                return pos
+        return best
+
+    # ── fuzzy stage ──
+
+    def _fuzzy_positions(self, query: str) -> list:
+        """Top candidates by shared bigrams/tokens, in list order."""
+        query_grams = _grams(query, _FUZZY_GRAM)
+        if len(query) < _GRAM:
+            return range(len(self._names))
+        overlap = defaultdict(int)
+        for gram in query_grams:
+            for pos in self._bigrams.get(gram, ()):
+                overlap[pos] += 1
+        for token in query.split():
+            for pos in self._tokens.get(token, ()):
+                overlap[pos] += len(token)  # whole-word hits outrank scattered grams
+        top = {pos for pos, _ in nlargest(FUZZY_CANDIDATES, overlap.items(), key=lambda kv: (kv[1], -kv[0]))}
+
+        # A first word that appears inside the query scores 100 on the
+        # first-word partial ratio, however few grams it shares
+        for i in range(len(query)):
+            for j in range(i + 1, len(query) + 1):
+                top.update(self._by_first_word.get(query[i:j], ()))
+        return sorted(top)
+
+    def match(self, query: str) -> Optional[dict]:
+        """Return the best matching destination dict, or None."""
+        if not self.destinations:
+            return None
+        query = clean_text(query)
+        if not query:
+            return self.destinations[0]
+
+        pos = self._first_exact(query)
+        if pos is not None:
+            return self.destinations[pos]
+
+        best_pos, best_score = None, 0
+        for pos in self._fuzzy_positions(query):
+            score = max(
+                fuzz.partial_ratio(query, self._names[pos]),
+                fuzz.partial_ratio(query, self._first_words[pos]),
+            )
+            if score > best_score:
+                best_score, best_pos = score, pos
+        if best_score >= MATCH_THRESHOLD:
+            return self.destinations[best_pos]
+        return None
+
+    def match_code(self, query: str) -> Optional[str]:
+        dest = self.match(query)
+        return dest["code"] if dest else None
+
+    def group(self, query: str, limit: int = GROUP_LIMIT) -> list:
+        """Every destination whose name contains all the query's words as whole
+        words (a city's airports and airstrips), in list order. A code query
+        groups by the first word of that destination's name."""
+        query = clean_text(query)
+        if not query:
+            return []
+        pos = self._exact.get(query)
+        words = [self._first_words[pos]] if pos is not None and self._first_words[pos] else query.split()
+        postings = sorted((self._tokens.get(w, ()) for w in words), key=len)
+        positions = set(postings[0])
+        for p in postings[1:]:
+            positions.intersection_update(p)
+        return [self.destinations[pos] for pos in sorted(positions)[:limit]]
+
+    def similar(self, query: str, limit: int = SIMILAR_LIMIT, min_score: int = SIMILAR_THRESHOLD) -> list:
+        """Closest destinations by fuzzy name score, best first."""
+        query = clean_text(query)
+        scored = []
+        for pos in self._fuzzy_positions(query):
+            score = fuzz.partial_ratio(query, self._names[pos])
+            if score >= min_score:
+                scored.append((score, pos))
+        scored.sort(key=lambda sp: (-sp[0], sp[1]))
+        return [
+            {"name": self.destinations[pos].get("name"), "code": self.destinations[pos].get("code"), "score": score}
+            for score, pos in scored[:limit]
+        ]
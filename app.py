@@ -1,19 +1,33 @@
 from fastapi import FastAPI, HTTPException
 from fastapi.middleware.cors import CORSMiddleware
-from pydantic import BaseModel
+from fastapi.responses import JSONResponse, PlainTextResponse, StreamingResponse
+from starlette.concurrency import run_in_threadpool
+from pydantic import BaseModel, Field
 from typing import Optional, List
-from langchain_core.messages import HumanMessage, SystemMessage, ToolMessage, AIMessage
+from langchain_core.messages import HumanMessage, SystemMessage, AIMessage
 
-from bot import create_graph
-import requests
-import os
-import json
+from aerocrs import client as aerocrs
+from bot import (SUMMARY_TAG, create_graph, destination_catalog, fast_path_stats, flight_cache, invalidate_route,
+                 trim_stats, context_stats, prompt_cache_stats, stats_lock,
+                 FARE_CALENDAR_MAX_DAYS, fare_calendar_dates, fare_calendar_payload, iter_fare_calendar, flight_classes,
+                 full_flight_results, normalize_date)
+from compact import compact_flight_results
+from logs import get_logger, lazy
+from replay import recorder
+from tracing import TracingMiddleware, metrics
+import serialization
 
-AUTHID = os.getenv("AUTHID")
-AUTHPASSSWORD = os.getenv("AUTHPASSSWORD")
-BASE_URL = "https://api.aerocrs.com/v5"
+log = get_logger("app")
 
-app = FastAPI()
+
+class FastJSONResponse(JSONResponse):
+    """JSONResponse rendered by the configured serializer backend (see serialization.py)."""
+
+    def render(self, content) -> bytes:
+        return serialization.dumps_bytes(content)
+
+
+app = FastAPI(default_response_class=FastJSONResponse)
 
 app.add_middleware(
     CORSMiddleware,
@@ -21,12 +35,26 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=["X-Trace-Id"],
 )
+# One trace per request: node / tool / LLM / AeroCRS spans, exported if TRACE_EXPORT_PATH is set
+app.add_middleware(TracingMiddleware)
 
-# Single shared graph instance with MemorySaver
+# Single shared graph instance — compiled once, reset per thread via its checkpointer
 graph = create_graph()
 
 
+@app.on_event("startup")
+def warm_caches():
+    # Load destinations in the background so the first search doesn't pay for it
+    destination_catalog.warm()
+
+
+@app.on_event("shutdown")
+async def close_clients():
+    await aerocrs.aclose()
+
+
 # ─────────────────────────────────────────────
 # MODELS
 # ─────────────────────────────────────────────
@@ -34,12 +62,16 @@ graph = create_graph()
 class ChatRequest(BaseModel):
     message: str
     thread_id: Optional[str] = "default_thread"
+    # Send flight_results in the compact columnar form (see compact.py);
+    # full fare-class detail is then fetched per flight from /flight-classes
+    compact: bool = False
 
 class ChatResponse(BaseModel):
     response: str
     thread_id: str
     flight_results: Optional[dict] = None  # Populated when flights are found
     ancillary_results: Optional[dict] = None  # Populated when ancillaries are found
+    fare_calendar: Optional[dict] = None  # Populated when a date range was searched
 
 class FlightLogRequest(BaseModel):
     flight_code: str
@@ -74,79 +106,117 @@ class ConfirmBookingRequest(BaseModel):
     booking_id: int
     passengers: List[PassengerDetail]
 
+class FlightClassesRequest(BaseModel):
+    # The search the flight came from (a flight_results context / card)
+    from_code: str
+    to_code: str
+    departure_date: str
+    return_date: Optional[str] = None
+    adults: int = 1
+    child: int = 0
+    infant: int = 0
+    flight_code: str
+    direction: Optional[str] = None  # "Outbound" / "Return"
+
+class FareCalendarRequest(BaseModel):
+    from_code: str
+    to_code: str
+    start_date: str                  # YYYY/MM/DD (or natural language)
+    end_date: Optional[str] = None   # inclusive; default a week from start_date
+    adults: int = Field(ge=1)        # required, as in the chat's flight search
+    child: int = 0
+    infant: int = 0
+
 
 # ─────────────────────────────────────────────
 # INTERNAL HELPERS
 # ─────────────────────────────────────────────
 
-def _get_headers() -> dict:
-    return {
-        "Content-Type": "application/json",
-        "auth_id": AUTHID,
-        "auth_password": AUTHPASSSWORD
-    }
+def _to_graph_message(text: str):
+    """Booking triggers ("__booking__: ...") become SystemMessages, everything else HumanMessages."""
+    if text.startswith("__booking__:"):
+        return SystemMessage(content=text[len("__booking__:"):].strip())
+    return HumanMessage(content=text)
+
+
+async def _message_count(config: dict) -> int:
+    """Number of messages already in the thread (so we only scan newly added ones)."""
+    try:
+        state = await graph.aget_state(config)
+        return len(state.values.get("messages", [])) if state and state.values else 0
+    except Exception:
+        return 0
+
+
+def _is_reply_stream(event: dict) -> bool:
+    """Chat-model tokens that belong to the assistant's reply — not the
+    rolling-summary call, which runs inside the same node."""
+    return (event.get("metadata", {}).get("langgraph_node") == "conversation"
+            and SUMMARY_TAG not in event.get("tags", ()))
+
+
+def _sse(event: str, data) -> str:
+    return f"event: {event}\ndata: {serialization.dumps(data)}\n\n"
 
 
-def _extract_last_text(messages: list, new_from_index: int = 0) -> tuple:
+def _message_snippets(messages) -> list:
+    """Type + first 80 chars of each message, for debug logs."""
+    snippets = []
+    for m in messages:
+        raw = getattr(m, "content", "")
+        snippets.append(f"{type(m).__name__}: {raw[:80] if isinstance(raw, str) else str(raw)[:80]}")
+    return snippets
+
+
+def _wire_flight_results(thread_id: str, flight_results: Optional[dict], compact: bool,
+                         take: bool = False) -> Optional[dict]:
+    """flight_results in the shape the client asked for. State keeps them
+    compact; the full payload is the one the tools built this turn (`take`
+    once the reply is final). If that is gone, fail rather than send cards
+    without their class detail."""
+    if not flight_results:
+        return flight_results
+    if compact:
+        return compact_flight_results(flight_results)
+    full = full_flight_results(thread_id, flight_results, take=take)
+    if full is None:
+        log.error("chat.flight_results_unavailable", thread_id=thread_id)
+        raise HTTPException(status_code=503, detail="Flight results are no longer available. Please search again.")
+    return full
+
+
+def _surfaced_ancillaries(ancillary_results: Optional[dict]) -> Optional[dict]:
+    """Only surface ancillary_results to the frontend if there are actual items to show."""
+    if ancillary_results and ancillary_results.get("available"):
+        return ancillary_results
+    return None
+
+
+def _extract_reply(state: dict, new_from_index: int = 0) -> tuple:
     """
     Extract bot text, flight_results, and ancillary_results from THIS invocation only.
+    The tool payloads come straight from the structured state fields that
+    tools_node fills in (reset at the start of every invocation).
     Returns (text_content, flight_results_or_None, ancillary_results_or_None)
     """
-    flight_results = None
-    ancillary_results = None
+    flight_results = state.get("flight_results")
+    ancillary_results = _surfaced_ancillaries(state.get("ancillary_results"))
     text_content = None
 
-    new_messages = messages[new_from_index:]
-
-    for msg in reversed(new_messages):
-        raw = getattr(msg, "content", None)
-        if not raw:
+    # Last AIMessage text
+    for msg in reversed(state.get("messages", [])[new_from_index:]):
+        if not isinstance(msg, AIMessage):
             continue
-
-        content_str = raw if isinstance(raw, str) else json.dumps(raw)
-
-        # Flight results from check_flight_availability ToolMessage
-        if flight_results is None and '"type": "flight_results"' in content_str:
-            try:
-                data = json.loads(content_str) if isinstance(raw, str) else raw
-                if isinstance(data, dict) and data.get("type") == "flight_results":
-                    flight_results = data
-                    continue
-            except Exception:
-                pass
-
-        # Ancillary results from check_ancillaries ToolMessage
-        if ancillary_results is None and "ancillary_results" in content_str:
-            try:
-                data = json.loads(content_str) if isinstance(raw, str) else raw
-                # Handle both direct dict and nested {"type": ...} structure
-                if isinstance(data, dict):
-                    if data.get("type") == "ancillary_results":
-                        ancillary_results = data
-                        continue
-                    # Sometimes ToolMessage wraps the result
-                    if "ancillary_results" in str(data):
-                        for v in data.values():
-                            if isinstance(v, dict) and v.get("type") == "ancillary_results":
-                                ancillary_results = v
-                                break
-                        if ancillary_results:
-                            continue
-            except Exception:
-                pass
-
-        # Last AIMessage text
-        if text_content is None and isinstance(msg, AIMessage):
-            if isinstance(raw, str) and raw.strip():
-                if '"type": "flight_results"' not in raw and '"type": "ancillary_results"' not in raw:
-                    text_content = raw.strip()
-            elif isinstance(raw, list):
-                text = " ".join(
-                    b.get("text", "") for b in raw
-                    if isinstance(b, dict) and b.get("type") == "text"
-                ).strip()
-                if text:
-                    text_content = text
+        raw = msg.content
+        if isinstance(raw, str) and raw.strip():
+            text_content = raw.strip()
+        elif isinstance(raw, list):
+            text_content = " ".join(
+                b.get("text", "") for b in raw
+                if isinstance(b, dict) and b.get("type") == "text"
+            ).strip() or None
+        if text_content:
+            break
 
     if text_content and flight_results:
         lower = text_content.lower()
@@ -156,10 +226,6 @@ def _extract_last_text(messages: list, new_from_index: int = 0) -> tuple:
         ]):
             text_content = "Here are the available flights — pick one and I'll get you booked!"
 
-    # Only surface ancillary_results to frontend if there are actual items to show
-    if ancillary_results and not ancillary_results.get("available"):
-        ancillary_results = None
-
     if text_content and ancillary_results:
         lower = text_content.lower()
         if any(p in lower for p in ["add-ons", "extras", "ancillar", "baggage", "meal", "available"]):
@@ -173,37 +239,67 @@ def _extract_last_text(messages: list, new_from_index: int = 0) -> tuple:
 # ─────────────────────────────────────────────
 
 @app.get("/")
-def read_root():
+async def read_root():
     return {"message": "Flight Bot API is running"}
 
 
+@app.get("/metrics", response_class=PlainTextResponse)
+async def get_metrics():
+    """Latency histograms and token / byte counters in the Prometheus text format."""
+    return metrics.render()
+
+
+@app.get("/stats")
+async def stats():
+    """In-process cache and checkpoint-store counters."""
+    with stats_lock:  # one consistent snapshot of the counters nodes update
+        fast_path = dict(fast_path_stats)
+        context = dict(context_stats)
+        prompt_cache = {phase: dict(s) for phase, s in prompt_cache_stats.items()}
+    return {
+        "destination_catalog": destination_catalog.stats(),
+        "flight_cache": flight_cache.stats(),
+        "fast_path": {
+            **fast_path,
+            "llm_calls_avoided": fast_path["booking_trigger"] + fast_path["restart"],
+        },
+        "context": context,
+        "context_trim": dict(trim_stats),
+        "prompt_cache": {
+            phase: {**s, "cached_ratio": round(s["cached_tokens"] / s["prompt_tokens"], 3) if s["prompt_tokens"] else 0.0}
+            for phase, s in prompt_cache.items()
+        },
+        "checkpoints": graph.checkpointer.stats(),
+    }
+
+
 class ResetRequest(BaseModel):
     thread_id: Optional[str] = "default_thread"
 
 
 @app.post("/reset-chat")
-def reset_chat(request: ResetRequest):
+async def reset_chat(request: ResetRequest):
     """
     Clear the conversation thread so the user can start completely fresh.
-    Recreates the graph to clear MemorySaver state for this thread.
+    Deletes only this thread's checkpoints — other conversations and the
+    compiled graph are left untouched.
     """
-    global graph
     try:
-        # Recreate the graph to clear all in-memory state
-        graph = create_graph()
-        print(f"[RESET] Thread '{request.thread_id}' — graph recreated")
+        # SQLite deletes are blocking I/O; keep them off the event loop
+        removed = await run_in_threadpool(graph.checkpointer.delete_thread, request.thread_id)
+        log.info("chat.reset", thread_id=request.thread_id, checkpoints_removed=removed)
         return {
             "success": True,
             "thread_id": request.thread_id,
             "message": "Conversation reset. Ready for a new search!"
         }
     except Exception as e:
-        print(f"[RESET ERROR] {e}")
+        log.error("chat.reset_error", thread_id=request.thread_id, error=repr(e))
         raise HTTPException(status_code=500, detail=str(e))
 
 
 @app.post("/chat", response_model=ChatResponse)
-def chat_endpoint(request: ChatRequest):
+async def chat_endpoint(request: ChatRequest):
     """
     Main chat endpoint. Send user messages here.
     If message starts with "__booking__:", it is treated as an internal trigger
@@ -214,59 +310,203 @@ def chat_endpoint(request: ChatRequest):
         config = {"configurable": {"thread_id": request.thread_id}}
 
         # Booking trigger — frontend sends this after /book-flight succeeds
-        if request.message.startswith("__booking__:"):
-            msg = SystemMessage(content=request.message[len("__booking__:"):].strip())
-        else:
-            msg = HumanMessage(content=request.message)
+        msg = _to_graph_message(request.message)
 
         # Snapshot count BEFORE invoking so we only scan newly added messages
-        try:
-            state_before = graph.get_state(config)
-            count_before = len(state_before.values.get("messages", [])) if state_before and state_before.values else 0
-        except Exception:
-            count_before = 0
+        count_before = await _message_count(config)
 
-        result = graph.invoke({"messages": [msg]}, config=config)
-        text, flight_results, ancillary_results = _extract_last_text(result["messages"], new_from_index=count_before)
+        with recorder.turn(request.thread_id, request.message, destination_catalog) as turn:
+            result = await graph.ainvoke({"messages": [msg]}, config=config)
+            text, flight_results, ancillary_results = _extract_reply(result, new_from_index=count_before)
+            if turn:
+                turn.add("result", reply=text)
 
-        print(f"[EXTRACT] text={text[:60]!r} | flights={flight_results is not None} | ancillaries={ancillary_results is not None and ancillary_results.get('available')}")
-        # Debug: show raw new messages
-        for i, m in enumerate(result["messages"][count_before:]):
-            mtype = type(m).__name__
-            raw = getattr(m, "content", "")
-            snippet = (raw[:80] if isinstance(raw, str) else str(raw)[:80])
-            print(f"  [{i}] {mtype}: {snippet!r}")
+        log.info("chat.reply", thread_id=request.thread_id, text=text[:60], flights=flight_results is not None,
+                 ancillaries=ancillary_results is not None and ancillary_results.get("available"))
+        log.debug("chat.new_messages", thread_id=request.thread_id,
+                  messages=lazy(_message_snippets, result["messages"][count_before:]))
 
         return ChatResponse(
             response=text,
             thread_id=request.thread_id,
-            flight_results=flight_results,
-            ancillary_results=ancillary_results
+            flight_results=_wire_flight_results(request.thread_id, flight_results, request.compact, take=True),
+            ancillary_results=ancillary_results,
+            fare_calendar=result.get("fare_calendar"),
         )
 
+    except HTTPException:
+        raise
     except Exception as e:
-        import traceback
-        print("[CHAT ERROR]", traceback.format_exc())
+        log.error("chat.error", exc_info=True, thread_id=request.thread_id)
         raise HTTPException(status_code=500, detail=str(e))
 
 
+@app.post("/chat/stream")
+async def chat_stream_endpoint(request: ChatRequest):
+    """
+    Server-Sent Events version of /chat.
+    Emits `token` events as the LLM writes, `flight_results` / `ancillary_results` /
+    `fare_calendar` as soon as the tools node produces them, and a final `done` event with the
+    same shape /chat returns (or `error`).
+    """
+    config = {"configurable": {"thread_id": request.thread_id}}
+    msg = _to_graph_message(request.message)
+
+    async def events():
+        try:
+            with recorder.turn(request.thread_id, request.message, destination_catalog) as turn:
+                count_before = await _message_count(config)
+                sent_payloads = set()
+
+                async for event in graph.astream_events({"messages": [msg]}, config=config, version="v2"):
+                    kind = event["event"]
+
+                    if kind == "on_chat_model_stream" and _is_reply_stream(event):
+                        token = event["data"]["chunk"].content
+                        if isinstance(token, str) and token:
+                            yield _sse("token", {"text": token})
+
+                    elif kind == "on_chain_end" and event["name"] == "tools":
+                        output = event["data"].get("output")
+                        if not isinstance(output, dict):
+                            continue
+                        for key, payload in (
+                            ("flight_results", output.get("flight_results")),
+                            ("ancillary_results", _surfaced_ancillaries(output.get("ancillary_results"))),
+                            ("fare_calendar", output.get("fare_calendar")),
+                        ):
+                            if payload and id(payload) not in sent_payloads:
+                                sent_payloads.add(id(payload))
+                                if key == "flight_results":
+                                    payload = _wire_flight_results(request.thread_id, payload, request.compact)
+                                yield _sse(key, payload)
+
+                state = await graph.aget_state(config)
+                text, flight_results, ancillary_results = _extract_reply(state.values, new_from_index=count_before)
+                if turn:
+                    turn.add("result", reply=text)
+                final = ChatResponse(
+                    response=text,
+                    thread_id=request.thread_id,
+                    flight_results=_wire_flight_results(request.thread_id, flight_results, request.compact, take=True),
+                    ancillary_results=ancillary_results,
+                    fare_calendar=state.values.get("fare_calendar"),
+                )
+                yield _sse("done", final.model_dump())
+
+        except Exception as e:
+            log.error("chat.stream_error", exc_info=True, thread_id=request.thread_id)
+            yield _sse("error", {"detail": str(e)})
+
+    return StreamingResponse(
+        events(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
+
+
+@app.post("/flight-classes")
+async def flight_classes_endpoint(request: FlightClassesRequest):
+    """
+    Full fare-class detail (cabin, baggage, child/infant fares…) of one flight,
+    for clients that take compact flight_results. Served from the flight
+    cache while the search is fresh.
+    """
+    dep_date = normalize_date(request.departure_date) or request.departure_date
+    ret_date = normalize_date(request.return_date) if request.return_date else None
+    try:
+        classes = await run_in_threadpool(
+            flight_classes, request.from_code, request.to_code, dep_date, ret_date,
+            request.adults, request.child, request.infant, request.flight_code, request.direction,
+        )
+    except Exception as e:
+        log.error("flight_classes.error", flight_code=request.flight_code, error=repr(e))
+        raise HTTPException(status_code=502, detail=str(e))
+    if classes is None:
+        raise HTTPException(status_code=404, detail=f"Flight {request.flight_code} is no longer offered on {dep_date}.")
+    return {"flight_code": request.flight_code, "direction": request.direction, "classes": classes}
+
+
+def _fare_calendar_dates(request: FareCalendarRequest) -> list:
+    """The request's days, or 400 for a bad date / 422 for a range over FARE_CALENDAR_MAX_DAYS."""
+    dates, error = fare_calendar_dates(request.start_date, request.end_date, max_days=None)
+    if error:
+        raise HTTPException(status_code=400, detail=error)
+    if len(dates) > FARE_CALENDAR_MAX_DAYS:
+        raise HTTPException(status_code=422, detail=(
+            f"The range {dates[0]} – {dates[-1]} is {len(dates)} days; "
+            f"search at most {FARE_CALENDAR_MAX_DAYS} days at a time."))
+    return dates
+
+
+@app.post("/fare-calendar")
+async def fare_calendar_endpoint(request: FareCalendarRequest):
+    """
+    Cheapest fare per day for one route over a date range (the flexible-dates
+    view). Days are searched concurrently and shared with the chat's flight cache.
+    """
+    dates = _fare_calendar_dates(request)
+
+    def build():
+        cells = list(iter_fare_calendar(request.from_code, request.to_code, dates,
+                                        request.adults, request.child, request.infant))
+        return fare_calendar_payload(request.from_code, request.to_code, cells,
+                                     request.adults, request.child, request.infant)
+
+    calendar = await run_in_threadpool(build)
+    log.info("fare_calendar.served", route=f"{request.from_code}-{request.to_code}", days=len(dates),
+             cheapest=calendar["cheapest"])
+    return calendar
+
+
+@app.post("/fare-calendar/stream")
+async def fare_calendar_stream_endpoint(request: FareCalendarRequest):
+    """
+    Server-Sent Events version of /fare-calendar.
+    Emits a `day` event per date as soon as its search finishes (in completion
+    order, not date order), then `done` with the full grid /fare-calendar returns.
+    """
+    dates = _fare_calendar_dates(request)
+
+    # A plain generator: Starlette iterates it in a worker thread, so the
+    # blocking wait for the next finished day never holds up the event loop
+    def events():
+        cells = []
+        try:
+            for cell in iter_fare_calendar(request.from_code, request.to_code, dates,
+                                           request.adults, request.child, request.infant):
+                cells.append(cell)
+                yield _sse("day", cell)
+            yield _sse("done", fare_calendar_payload(request.from_code, request.to_code, cells,
+                                                     request.adults, request.child, request.infant))
+        except Exception as e:
+            log.error("fare_calendar.stream_error", exc_info=True, route=f"{request.from_code}-{request.to_code}")
+            yield _sse("error", {"detail": str(e)})
+
+    return StreamingResponse(
+        events(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
+
+
 @app.post("/log-flight")
-def log_flight(request: FlightLogRequest):
+async def log_flight(request: FlightLogRequest):
     """Log which flight the user clicked on (for analytics)."""
-    print(f"\n[CLICKED] Flight code: {request.flight_code}\n")
+    log.info("flight.clicked", flight_code=request.flight_code)
     return {"status": "logged", "code": request.flight_code}
 
 
 @app.post("/book-flight")
-def book_flight(request: BookingRequest):
+async def book_flight(request: BookingRequest):
     """
     Called when the user clicks 'Book' on a flight card in the UI.
     Creates the booking via AeroCRS, then injects a system message into
     the bot's conversation thread so the bot knows to check ancillaries
     and collect passenger details.
     """
-    print(f"\n[BOOKING REQUEST] Flight: {request.flight_id} | Fare: {request.fare_id}" +
-          (f" | Return Flight: {request.return_flight_id} | Return Fare: {request.return_fare_id}" if request.return_flight_id else ""))
+    log.info("booking.request", flight_id=request.flight_id, fare_id=request.fare_id,
+             return_flight_id=request.return_flight_id, return_fare_id=request.return_fare_id)
 
     bookflight_list = [
         {
@@ -299,9 +539,11 @@ def book_flight(request: BookingRequest):
     }
 
     try:
-        r = requests.post(f"{BASE_URL}/createBooking", headers=_get_headers(), json=payload)
-        booking_response = r.json()
-        print(f"[BOOKING RESPONSE] {booking_response}")
+        booking_response = await aerocrs.apost("/createBooking", payload)
+        log.debug("booking.response", body=booking_response)
+
+        # Seat counts on this route just changed — don't serve cached availability
+        invalidate_route(request.from_code, request.to_code)
 
         # Check for flight-level errors nested inside a "success" envelope
         try:
@@ -340,17 +582,18 @@ def book_flight(request: BookingRequest):
     except HTTPException:
         raise
     except Exception as e:
-        print(f"[BOOKING ERROR] {e}")
+        log.error("booking.error", error=repr(e))
         raise HTTPException(status_code=500, detail=str(e))
 
 
 @app.post("/add-ancillary")
-def add_ancillary_endpoint(request: AncillaryRequest):
+async def add_ancillary_endpoint(request: AncillaryRequest):
     """
     Add an ancillary extra (baggage, meal, etc.) to a booking.
     Called directly by the frontend — no chat message needed.
     """
-    print(f"\n[ANCILLARY ADD] Booking: {request.booking_id} | Flight: {request.flight_id} | Item: {request.item_id} | Pax: {request.pax_num}")
+    log.info("ancillary.add", booking_id=request.booking_id, flight_id=request.flight_id,
+             item_id=request.item_id, pax_num=request.pax_num)
 
     payload = {
         "aerocrs": {
@@ -368,9 +611,8 @@ def add_ancillary_endpoint(request: AncillaryRequest):
     }
 
     try:
-        r = requests.post(f"{BASE_URL}/createAncillary", headers=_get_headers(), json=payload)
-        result = r.json()
-        print(f"[ANCILLARY RESPONSE] {result}")
+        result = await aerocrs.apost("/createAncillary", payload)
+        log.debug("ancillary.response", body=result)
 
         success = result.get("aerocrs", {}).get("success", False)
         if not success:
@@ -382,22 +624,21 @@ def add_ancillary_endpoint(request: AncillaryRequest):
     except HTTPException:
         raise
     except Exception as e:
-        print(f"[ANCILLARY ERROR] {e}")
+        log.error("ancillary.error", booking_id=request.booking_id, error=repr(e))
         raise HTTPException(status_code=500, detail=str(e))
 
 
 @app.post("/confirm-booking")
-def confirm_booking_endpoint(request: ConfirmBookingRequest):
+async def confirm_booking_endpoint(request: ConfirmBookingRequest):
     """
     Finalize a booking with passenger details for ALL passengers.
     Called by the frontend passenger form.
     """
-    print(f"\n[CONFIRM BOOKING] BookingID: {request.booking_id} | Passengers: {len(request.passengers)}")
+    log.info("booking.confirm", booking_id=request.booking_id, passengers=len(request.passengers))
 
     passenger_list = []
     for pax in request.passengers:
         # Normalize birthdate
-        from bot import normalize_date
         bd = normalize_date(pax.birthdate, allow_past=True) or pax.birthdate
         passenger_list.append({
             "paxtitle": "Mr.",
@@ -426,9 +667,8 @@ def confirm_booking_endpoint(request: ConfirmBookingRequest):
     }
 
     try:
-        r = requests.post(f"{BASE_URL}/confirmBooking", headers=_get_headers(), json=payload)
-        result = r.json()
-        print(f"[CONFIRM RESPONSE] {result}")
+        result = await aerocrs.apost("/confirmBooking", payload)
+        log.debug("booking.confirm_response", body=result)
 
         success = result.get("aerocrs", {}).get("success", False)
         if not success:
@@ -447,7 +687,7 @@ def confirm_booking_endpoint(request: ConfirmBookingRequest):
     except HTTPException:
         raise
     except Exception as e:
-        print(f"[CONFIRM ERROR] {e}")
+        log.error("booking.confirm_error", booking_id=request.booking_id, error=repr(e))
         raise HTTPException(status_code=500, detail=str(e))
 
 
@@ -0,0 +1,124 @@
+"""Lookup latency of AirportIndex vs. the old linear fuzzy scan.
+
+"agree" counts queries where both return the same destination or two
+destinations with the same fuzzy score (ties resolve by candidate order).
+
+    python benchmarks/bench_airport_index.py [--sizes 100,1000,10000,50000]
+"""
+import argparse
+import os
+import random
+import string
+import sys
+import time
+from typing import Optional
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from thefuzz import fuzz  # noqa: E402
+
+from airport_index import AirportIndex, clean_text  # noqa: E402
+
+
+def linear_match(city_name: str, destinations: list) -> Optional[str]:
+    """The linear fuzzy scan bot.py did per lookup before AirportIndex, kept here as the baseline."""
+    city_clean = clean_text(city_name)
+    best_match, best_score = None, 0
+    for dest in destinations:
+        name_clean = clean_text(dest.get("name", ""))
+        code = dest.get("code", "").lower()
+        iata = dest.get("iatacode", "").lower()
+        if city_clean in (code, iata) or city_clean in name_clean:
+            return dest["code"]
+        if all(w in name_clean for w in city_clean.split()):
+            return dest["code"]
+        score = max(
+            fuzz.partial_ratio(city_clean, name_clean),
+            fuzz.partial_ratio(city_clean, name_clean.split()[0] if name_clean else "")
+        )
+        if score > best_score:
+            best_score, best_match = score, dest["code"]
+    return best_match if best_score >= 60 else None
+
+
+def match_score(city_name: str, dest: Optional[dict]) -> Optional[int]:
+    if dest is None:
+        return None
+    city_clean, name_clean = clean_text(city_name), clean_text(dest.get("name", ""))
+    return max(
+        fuzz.partial_ratio(city_clean, name_clean),
+        fuzz.partial_ratio(city_clean, name_clean.split()[0] if name_clean else "")
+    )
+
+
+def make_catalog(size: int, rng: random.Random) -> list:
+    syllables = ["ka", "ru", "sha", "dar", "es", "sa", "lam", "zan", "zi", "bar", "mo", "shi",
+                 "ki", "li", "man", "ja", "ro", "nai", "ro", "bi", "mwan", "za", "to", "ra"]
+    suffixes = ["", " International", " Airport", " Airstrip", " Town"]
+    catalog = []
+    for i in range(size):
+        name = "".join(rng.choice(syllables) for _ in range(rng.randint(2, 4))).title()
+        if rng.random() < 0.3:
+            name += " " + "".join(rng.choice(syllables) for _ in range(2)).title()
+        code = "".join(rng.choice(string.ascii_uppercase) for _ in range(3)) + str(i)
+        catalog.append({"code": code, "iatacode": code, "name": name + rng.choice(suffixes)})
+    return catalog
+
+
+def make_queries(catalog: list, rng: random.Random, n: int = 50) -> list:
+    queries = []
+    for _ in range(n):
+        dest = rng.choice(catalog)
+        kind = rng.random()
+        if kind < 0.25:
+            queries.append(dest["code"])
+        elif kind < 0.5:
+            queries.append(dest["name"].split()[0])
+        else:
+            # misspelling: drop / swap a character
+            word = dest["name"].split()[0].lower()
+            i = rng.randrange(len(word))
+            queries.append(word[:i] + word[i + 1:] if rng.random() < 0.5 else word[:i] + "x" + word[i + 1:])
+    return queries
+
+
+def time_per_call(fn, queries: list, budget: float = 2.0) -> float:
+    start, calls = time.perf_counter(), 0
+    while True:
+        for q in queries:
+            fn(q)
+            calls += 1
+        elapsed = time.perf_counter() - start
+        if elapsed >= budget or calls >= len(queries) * 20:
+            return elapsed / calls
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--sizes", default="100,1000,10000,50000")
+    parser.add_argument("--queries", type=int, default=50)
+    args = parser.parse_args()
+
+    rng = random.Random(42)
+    print(f"{'entries':>8} | {'build ms':>9} | {'linear ms/q':>11} | {'index ms/q':>10} | {'speedup':>7} | agree")
+    for size in (int(s) for s in args.sizes.split(",")):
+        catalog = make_catalog(size, rng)
+        queries = make_queries(catalog, rng, args.queries)
+
+        t0 = time.perf_counter()
+        index = AirportIndex(catalog)
+        build_ms = (time.perf_counter() - t0) * 1000
+
+        by_code = {d["code"]: d for d in catalog}
+        agree = 0
+        for q in queries:
+            expected, got = linear_match(q, catalog), index.match_code(q)
+            agree += expected == got or match_score(q, by_code.get(expected)) == match_score(q, by_code.get(got))
+        linear = time_per_call(lambda q: linear_match(q, catalog), queries[:10] if size > 10000 else queries)
+        indexed = time_per_call(index.match_code, queries)
+        print(f"{size:>8} | {build_ms:>9.1f} | {linear * 1000:>11.3f} | {indexed * 1000:>10.3f} | "
+              f"{linear / indexed:>6.0f}x | {agree}/{len(queries)}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,100 @@
+"""Per-turn context building cost vs. thread length.
+
+"full" is the old path: trim every message in the history, then pick the
+window. "window" is build_context_window: pick the window, then trim only
+those messages through the memoized trim cache.
+
+    python benchmarks/bench_context_trim.py [--lengths 50,100,200,500]
+"""
+import argparse
+import json
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+os.environ.setdefault("OPENAI_API_KEY", "bench")  # bot builds ChatOpenAI clients at import
+
+from langchain_core.messages import AIMessage, HumanMessage, ToolMessage  # noqa: E402
+
+import bot  # noqa: E402
+
+
+def flight_payload(n: int) -> str:
+    return json.dumps({
+        "type": "flight_results",
+        "header": "Flights",
+        "sub_header": "DAR → ZNZ",
+        "data": [{
+            "flight_id": i, "flight_code": f"TL{i:03d}", "direction": "outbound",
+            "departure_time": "08:00", "arrival_time": "09:10", "price": 120 + i,
+            "seats_available": 9, "classes": [{"class": c, "price": 120 + i, "seats": 3} for c in "YMB"],
+        } for i in range(n)],
+    })
+
+
+def make_thread(length: int) -> list:
+    msgs = []
+    i = 0
+    while len(msgs) < length:
+        call_id = f"call_{i}"
+        msgs.append(HumanMessage(content=f"flights from dar to zanzibar on day {i}"))
+        msgs.append(AIMessage(content="", tool_calls=[
+            {"name": "check_flight_availability", "args": {}, "id": call_id}]))
+        msgs.append(ToolMessage(content=flight_payload(12), tool_call_id=call_id,
+                                name="check_flight_availability"))
+        msgs.append(AIMessage(content="Here you go! Pick a flight and fare class from the cards."))
+        i += 1
+    return msgs[:length]
+
+
+def is_complete_window(msgs: list) -> bool:
+    pending_ids = set()
+    for m in msgs:
+        if isinstance(m, AIMessage):
+            pending_ids = {c["id"] for c in m.tool_calls} if m.tool_calls else set()
+        elif isinstance(m, ToolMessage):
+            pending_ids.discard(m.tool_call_id)
+    return not pending_ids
+
+
+def full_trim(messages: list) -> list:
+    """The pre-memoization path: every message is re-trimmed on every turn."""
+    trimmed = [bot._slim_tool_message(m) if isinstance(m, ToolMessage) else m for m in messages]
+    window = trimmed[-bot.MAX_CONTEXT_MESSAGES:]
+    for start in range(len(window)):
+        candidate = window[start:]
+        if isinstance(candidate[0], ToolMessage):
+            continue
+        if isinstance(candidate[0], AIMessage) and candidate[0].tool_calls:
+            continue
+        if is_complete_window(candidate):
+            return candidate
+    return trimmed[-6:]
+
+
+def time_per_turn(fn, messages: list, turns: int = 200) -> float:
+    fn(messages)  # warm the trim cache, as the previous turn would have
+    start = time.perf_counter()
+    for _ in range(turns):
+        fn(messages)
+    return (time.perf_counter() - start) / turns
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--lengths", default="50,100,200,500")
+    parser.add_argument("--turns", type=int, default=200)
+    args = parser.parse_args()
+
+    print(f"{'messages':>8} | {'full ms/turn':>12} | {'window ms/turn':>14} | {'speedup':>7}")
+    for length in (int(n) for n in args.lengths.split(",")):
+        thread = make_thread(length)
+        full = time_per_turn(full_trim, thread, args.turns)
+        window = time_per_turn(bot.build_context_window, thread, args.turns)
+        print(f"{length:>8} | {full * 1000:>12.3f} | {window * 1000:>14.3f} | {full / window:>6.0f}x")
+    print(f"trim cache: {bot.trim_stats}")
+
+
+if __name__ == "__main__":
+    main()
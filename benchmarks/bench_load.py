@@ -0,0 +1,180 @@
+"""Load test for app.py against a local AeroCRS stub and a fake chat model.
+
+Starts the AeroCRS stand-in and the real app (both under uvicorn, on
+loopback ports), then runs scripted booking conversations at the given
+concurrency:
+
+    /chat "fly from Dar es Salaam to Zanzibar"   → 2× search_destinations
+    /chat "<date>, just me, one way"              → check_flight_availability
+    /book-flight                                  → createBooking
+    /chat "__booking__: BookingID … FlightID …"   → router → check_ancillaries
+    /chat "No extras, thanks"
+    /confirm-booking                              → confirmBooking
+
+and reports p50/p95/p99 latency per endpoint plus requests/sec. No OpenAI
+or live AeroCRS traffic is generated.
+
+    python benchmarks/bench_load.py --conversations 200 --concurrency 20 \\
+        --aerocrs-latency-ms 80 --llm-latency-ms 300
+"""
+import argparse
+import asyncio
+import os
+import socket
+import sys
+import threading
+import time
+from datetime import date, timedelta
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+import httpx  # noqa: E402
+import uvicorn  # noqa: E402
+
+from stubs import CITIES, FakeChatModel, make_aerocrs_stub  # noqa: E402
+
+
+def free_port() -> int:
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+def serve(app, port: int) -> uvicorn.Server:
+    """Run an ASGI app under uvicorn in a daemon thread (its own event loop)."""
+    server = uvicorn.Server(uvicorn.Config(app, host="127.0.0.1", port=port, log_level="warning"))
+    threading.Thread(target=server.run, daemon=True).start()
+    while not server.started:
+        time.sleep(0.01)
+    return server
+
+
+def percentile(sorted_values: list, pct: float) -> float:
+    if not sorted_values:
+        return 0.0
+    rank = max(0, min(len(sorted_values) - 1, int(round(pct / 100 * len(sorted_values) + 0.5)) - 1))
+    return sorted_values[rank]
+
+
+# ─────────────────────────────────────────────
+# SCRIPTED CONVERSATION
+# ─────────────────────────────────────────────
+
+async def conversation(client: httpx.AsyncClient, n: int, args, samples: list, errors: list) -> None:
+    thread_id = f"bench-{n}"
+    origin, destination = CITIES[n % len(CITIES)][1], CITIES[(n + 1) % len(CITIES)][1]
+    travel_date = (date.today() + timedelta(days=14 + (n % args.distinct_dates))).strftime("%Y/%m/%d")
+
+    async def call(endpoint: str, payload: dict) -> dict:
+        start = time.perf_counter()
+        try:
+            r = await client.post(endpoint, json=payload)
+            ok = r.status_code == 200
+            body = r.json() if ok else {}
+        except Exception as e:
+            ok, body = False, {}
+            r = e
+        samples.append((endpoint, time.perf_counter() - start, ok))
+        if not ok:
+            errors.append((endpoint, getattr(r, "status_code", None) or repr(r)))
+            raise RuntimeError(endpoint)
+        return body
+
+    try:
+        await call("/chat", {"thread_id": thread_id, "message": f"Hi! I want to fly from {origin} to {destination}"})
+        reply = await call("/chat", {"thread_id": thread_id, "message": f"{travel_date}, just me, one way"})
+        flights = (reply.get("flight_results") or {}).get("data") or []
+        if not flights:
+            errors.append(("/chat", "no flight_results"))
+            return
+        fare = next(iter(flights[0]["classes"].values()))
+        booking = await call("/book-flight", {
+            "thread_id": thread_id, "flight_id": fare["flightid"], "fare_id": fare["fareid"],
+            "from_code": flights[0]["origin_code"], "to_code": flights[0]["destination_code"],
+        })
+        meta = booking["_meta"]
+        await call("/chat", {"thread_id": thread_id,
+                             "message": f"__booking__: BookingID: {meta['booking_id']}. FlightID: {meta['flight_id']}."})
+        await call("/chat", {"thread_id": thread_id, "message": "No extras, thanks"})
+        await call("/confirm-booking", {"booking_id": meta["booking_id"], "passengers": [{
+            "firstname": "Asha", "lastname": "Mushi", "birthdate": "1990/04/12",
+            "phone": "+255700000000", "email": f"asha{n}@example.com",
+        }]})
+    except RuntimeError:
+        pass
+
+
+async def drive(base_url: str, args) -> tuple:
+    samples, errors = [], []
+    limit = asyncio.Semaphore(args.concurrency)
+    limits = httpx.Limits(max_connections=args.concurrency * 2, max_keepalive_connections=args.concurrency * 2)
+
+    async with httpx.AsyncClient(base_url=base_url, timeout=120, limits=limits) as client:
+        async def one(n: int):
+            async with limit:
+                await conversation(client, n, args, samples, errors)
+
+        start = time.perf_counter()
+        await asyncio.gather(*(one(n) for n in range(args.conversations)))
+        elapsed = time.perf_counter() - start
+    return samples, errors, elapsed
+
+
+# ─────────────────────────────────────────────
+# MAIN
+# ─────────────────────────────────────────────
+
+def report(samples: list, errors: list, elapsed: float, args) -> None:
+    print(f"\n{args.conversations} conversations, concurrency {args.concurrency}, "
+          f"AeroCRS {args.aerocrs_latency_ms}±{args.aerocrs_jitter_ms}ms, LLM {args.llm_latency_ms}ms\n")
+    print(f"{'endpoint':<18} | {'count':>6} | {'errors':>6} | {'p50 ms':>8} | {'p95 ms':>8} | {'p99 ms':>8} | {'max ms':>8}")
+    endpoints = sorted({e for e, _, _ in samples})
+    for endpoint in endpoints + ["ALL"]:
+        rows = [s for s in samples if endpoint in ("ALL", s[0])]
+        lat = sorted(s[1] * 1000 for s in rows)
+        bad = sum(1 for s in rows if not s[2])
+        print(f"{endpoint:<18} | {len(rows):>6} | {bad:>6} | {percentile(lat, 50):>8.1f} | "
+              f"{percentile(lat, 95):>8.1f} | {percentile(lat, 99):>8.1f} | {(lat[-1] if lat else 0):>8.1f}")
+    print(f"\nwall {elapsed:.2f}s | {len(samples) / elapsed:.1f} req/s | {args.conversations / elapsed:.2f} conversations/s")
+    if errors:
+        print(f"first errors: {errors[:5]}")
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--conversations", type=int, default=50)
+    parser.add_argument("--concurrency", type=int, default=10)
+    parser.add_argument("--aerocrs-latency-ms", type=float, default=80)
+    parser.add_argument("--aerocrs-jitter-ms", type=float, default=20)
+    parser.add_argument("--llm-latency-ms", type=float, default=300)
+    parser.add_argument("--destinations", type=int, default=500)
+    parser.add_argument("--distinct-dates", type=int, default=30,
+                        help="spread searches over this many dates (lower → more flight-cache hits)")
+    args = parser.parse_args()
+
+    stub_port, app_port = free_port(), free_port()
+    stub = make_aerocrs_stub(args.aerocrs_latency_ms, args.aerocrs_jitter_ms, args.destinations)
+    serve(stub, stub_port)
+
+    # Must be set before aerocrs / app are imported
+    os.environ["AEROCRS_BASE_URL"] = f"http://127.0.0.1:{stub_port}"
+    os.environ.setdefault("OPENAI_API_KEY", "bench")
+    os.environ.setdefault("LOG_LEVEL", "WARNING")
+
+    import app
+    import bot
+
+    fake = FakeChatModel(latency_ms=args.llm_latency_ms)
+    for phase in bot.PHASE_MODEL:
+        bot.PHASE_MODEL[phase] = fake
+    bot.llm_mini = fake
+    serve(app.app, app_port)
+
+    samples, errors, elapsed = asyncio.run(drive(f"http://127.0.0.1:{app_port}", args))
+    report(samples, errors, elapsed, args)
+    print(f"AeroCRS stub calls: {dict(sorted(stub.state.calls.items()))}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,150 @@
+"""Memory held per search turn, before and after models.py.
+
+A search turn leaves two things behind:
+
+- a flight_cache entry, shared by every thread, for FLIGHT_CACHE_TTL_SECONDS
+- the flight_results state field, in each of the thread's checkpoints
+
+"dicts" is the code before models.py. The cache kept the decoded JSON. The
+state kept the full cards, whose classes point into that JSON. "models" is
+the current code. The cache keeps parse_deeplink's Availability, with each
+flight's class dicts built once, by the first card. The state keeps the
+compact form; /chat sends the full payload the tool built, which is held
+in-process only until the reply (bot.full_flight_results).
+
+For each result size this measures, with tracemalloc:
+
+- cached: bytes retained by the cache entry after a turn that built the cards
+- ckpt: msgpack bytes of the flight_results state field, per checkpoint
+- turn peak: peak allocation during a cache-miss turn
+- miss ms: decode, parse, cards, ToolMessage compaction and the /chat payload
+- hit ms: the same turn starting from the cache entry
+
+    python benchmarks/bench_memory.py [--sizes 12x4,36x5,120x6] [--repeat 20]
+"""
+import argparse
+import gc
+import json
+import os
+import sys
+import time
+import tracemalloc
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+os.environ.setdefault("OPENAI_API_KEY", "bench")  # bot builds ChatOpenAI clients at import
+os.environ.setdefault("LOG_LEVEL", "WARNING")
+
+from langgraph.checkpoint.serde.jsonplus import JsonPlusSerializer  # noqa: E402
+
+import bot  # noqa: E402
+from bench_payload import raw_flights  # noqa: E402
+from compact import compact_flight_results  # noqa: E402
+from models import parse_deeplink, parse_time  # noqa: E402
+
+CONTEXT = {"from_code": "DAR", "to_code": "ZNZ", "adults": 1, "child": 0, "infant": 0, "triptype": "OW",
+           "departure_date": "2026/11/20", "return_date": None}
+
+
+def payload(cards: list) -> dict:
+    return {"type": "flight_results", "header": "DAR → ZNZ", "sub_header": "1 Adult",
+            "context": CONTEXT, "data": cards}
+
+
+def dict_cards(data: dict) -> list:
+    """The card building the tools did before models.py: cards point into the raw JSON."""
+    cards = []
+    flights = data["aerocrs"]["flights"]["flight"]
+    for f in [f for f in flights if f["direction"] == "outbound"] + [f for f in flights if f["direction"] == "inbound"]:
+        classes = {k: v for k, v in f.get("classes", {}).items() if isinstance(v, dict)}
+        cheapest = min(classes.values(), key=lambda c: float(c.get("fare", {}).get("adultFare", 99999)))
+        cards.append({
+            "direction": "Outbound" if f.get("direction") == "outbound" else "Return",
+            "flight_code": f.get("flightcode"), "flight_number": f.get("fltnum"),
+            "origin_code": "DAR", "destination_code": "ZNZ",
+            "departure_time": parse_time(f.get("STD", "")), "arrival_time": parse_time(f.get("STA", "")),
+            "via": f.get("via") or None,
+            "price": cheapest["fare"]["adultFare"], "tax": cheapest["fare"]["tax"],
+            "seats_available": cheapest.get("freeseats"), "classes": classes,
+        })
+    return cards
+
+
+# Each turn → (state field, /chat flight_results)
+
+def turn_dicts(data: dict) -> tuple:
+    full = payload(dict_cards(data))
+    compact_flight_results(full)  # the ToolMessage content
+    return full, full
+
+
+def turn_models(availability) -> tuple:
+    full = payload(bot._flight_cards(availability.flights, "DAR", "ZNZ"))
+    state = compact_flight_results(full)  # also the ToolMessage content
+    bot._keep_full_results("bench", state, full)
+    return state, bot.full_flight_results("bench", state, take=True)
+
+
+def miss_dicts(body: bytes) -> tuple:
+    data = json.loads(body)
+    return data, *turn_dicts(data)
+
+
+def miss_models(body: bytes) -> tuple:
+    availability = parse_deeplink(json.loads(body))
+    return availability, *turn_models(availability)
+
+
+def measure(miss, body: bytes) -> tuple:
+    """→ (bytes retained by the cache entry after the turn, peak bytes during it)."""
+    gc.collect()
+    tracemalloc.start()
+    cached, state, response = miss(body)
+    _, peak = tracemalloc.get_traced_memory()
+    del state, response  # the turn is over; the state is serialized into the checkpoint
+    gc.collect()
+    retained, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    del cached
+    return retained, peak
+
+
+def timed(fn, repeat: int) -> float:
+    """Mean milliseconds per call."""
+    start = time.perf_counter()
+    for _ in range(repeat):
+        fn()
+    return (time.perf_counter() - start) / repeat * 1000
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--sizes", default="12x4,36x5,120x6", help="comma-separated FLIGHTSxCLASSES")
+    parser.add_argument("--repeat", type=int, default=20)
+    args = parser.parse_args()
+
+    serde = JsonPlusSerializer()
+    print(f"{'flights×classes':<16} | {'shape':<6} | {'cached KB':>9} | {'ckpt KB':>7} | "
+          f"{'turn peak KB':>12} | {'miss ms':>7} | {'hit ms':>6}")
+    for size in args.sizes.split(","):
+        n_flights, n_classes = (int(x) for x in size.split("x"))
+        body = json.dumps({"aerocrs": {"flights": {"flight": raw_flights(n_flights, n_classes)}}}).encode()
+        assert miss_dicts(body)[2] == miss_models(body)[2]  # /chat sends the same cards
+
+        rows = []
+        for shape, miss, hit in (("dicts", miss_dicts, turn_dicts), ("models", miss_models, turn_models)):
+            retained, peak = measure(miss, body)
+            cached, state, _ = miss(body)
+            ckpt = len(serde.dumps_typed(state)[1])
+            miss_ms = timed(lambda: miss(body), args.repeat)
+            rows.append((shape, retained, ckpt, peak, miss_ms, timed(lambda: hit(cached), args.repeat)))
+
+        for shape, retained, ckpt, peak, miss_ms, hit_ms in rows:
+            print(f"{size:<16} | {shape:<6} | {retained / 1024:>9.1f} | {ckpt / 1024:>7.1f} | "
+                  f"{peak / 1024:>12.1f} | {miss_ms:>7.3f} | {hit_ms:>6.3f}")
+        (_, *before), (_, *after) = rows
+        print(f"{'':<16} | {'ratio':<6} | " + " | ".join(
+            f"{a / b:>{w}.2f}" for a, b, w in zip(after, before, (9, 7, 12, 7, 6))))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,120 @@
+"""flight_results payload: full shape vs. the compact columnar form.
+
+Builds realistic getDeepLink responses (every class carries the fields the
+live API returns: class/cabin names, currency, baggage, adult/child/infant
+fares) and runs them through the same card building as
+check_flight_availability. For each size it reports:
+
+- JSON bytes (raw and gzipped) of what /chat returns
+- bytes of the ToolMessage as the checkpointer serializes it
+- time to encode (compact: compaction + json.dumps) and decode
+- time for the context trim (_slim_tool_message) to parse the ToolMessage
+
+    python benchmarks/bench_payload.py [--sizes 6x3,12x4,36x5] [--repeat 200]
+"""
+import argparse
+import gzip
+import json
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+os.environ.setdefault("OPENAI_API_KEY", "bench")  # bot builds ChatOpenAI clients at import
+os.environ.setdefault("LOG_LEVEL", "WARNING")
+
+from langchain_core.messages import ToolMessage  # noqa: E402
+from langgraph.checkpoint.serde.jsonplus import JsonPlusSerializer  # noqa: E402
+
+import bot  # noqa: E402
+from compact import compact_flight_results, expand_flight_results  # noqa: E402
+from models import parse_deeplink  # noqa: E402
+
+CLASSES = [
+    ("Economy Saver", "Q", "Economy"), ("Economy", "Y", "Economy"), ("Economy Flex", "M", "Economy"),
+    ("Premium", "W", "Premium Economy"), ("Business", "J", "Business"), ("Business Flex", "C", "Business"),
+]
+
+
+def raw_flights(n_flights: int, n_classes: int) -> list:
+    flights = []
+    for i in range(n_flights):
+        direction = "outbound" if i % 2 == 0 else "inbound"
+        flight_id = 4500 + i
+        flights.append({
+            "flightcode": f"TL{100 + i}", "fltnum": str(100 + i), "flighttype": "Direct",
+            "direction": direction,
+            "STD": f"2026-11-20T{6 + i % 12:02d}:00:00", "STA": f"2026-11-20T{7 + i % 12:02d}:15:00",
+            "via": None,
+            "classes": {
+                name: {
+                    "className": name, "classCode": code, "cabinClass": cabin, "currency": "USD",
+                    "baggageAllowance": 20 + 5 * k, "baggageUnit": "KG",
+                    "fare": {"adultFare": f"{95 + 45 * k + 5 * (i % 4):.2f}", "tax": "12.00",
+                             "childFare": f"{70 + 35 * k:.2f}", "infantFare": "15.00"},
+                    "freeseats": 9 - k, "fareid": flight_id * 10 + k, "flightid": flight_id,
+                }
+                for k, (name, code, cabin) in enumerate(CLASSES[:n_classes])
+            },
+        })
+    return flights
+
+
+def flight_results(n_flights: int, n_classes: int) -> dict:
+    availability = parse_deeplink({"aerocrs": {"flights": {"flight": raw_flights(n_flights, n_classes)}}})
+    cards = bot._flight_cards(availability.flights, "DAR", "ZNZ")
+    return {
+        "type": "flight_results", "header": "DAR → ZNZ", "sub_header": "2 Adults, 1 Child",
+        "context": {"from_code": "DAR", "to_code": "ZNZ", "adults": 2, "child": 1, "infant": 0,
+                    "triptype": "RT", "departure_date": "2026/11/20", "return_date": "2026/11/27"},
+        "data": cards,
+    }
+
+
+def timed(fn, repeat: int) -> float:
+    """Mean milliseconds per call."""
+    start = time.perf_counter()
+    for _ in range(repeat):
+        fn()
+    return (time.perf_counter() - start) / repeat * 1000
+
+
+def tool_message_bytes(content: str, serde: JsonPlusSerializer) -> int:
+    return len(serde.dumps_typed(ToolMessage(content=content, name="check_flight_availability",
+                                             tool_call_id="call_bench"))[1])
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--sizes", default="6x3,12x4,36x5", help="comma-separated FLIGHTSxCLASSES")
+    parser.add_argument("--repeat", type=int, default=200)
+    args = parser.parse_args()
+
+    serde = JsonPlusSerializer()
+    print(f"{'flights×classes':<16} | {'shape':<7} | {'JSON B':>8} | {'gzip B':>7} | {'ckpt msg B':>10} | "
+          f"{'encode ms':>9} | {'decode ms':>9} | {'trim ms':>7}")
+    for size in args.sizes.split(","):
+        n_flights, n_classes = (int(x) for x in size.split("x"))
+        full = flight_results(n_flights, n_classes)
+        compact = compact_flight_results(full)
+        assert expand_flight_results(compact)["data"][0]["price"] == full["data"][0]["price"]
+
+        rows = []
+        for shape, payload, encode in (
+            ("full", full, lambda: json.dumps(full, ensure_ascii=False)),
+            ("compact", compact, lambda: json.dumps(compact_flight_results(full), ensure_ascii=False)),
+        ):
+            body = json.dumps(payload, ensure_ascii=False)
+            message = ToolMessage(content=body, name="check_flight_availability", tool_call_id="call_bench")
+            rows.append((shape, len(body.encode()), len(gzip.compress(body.encode())), tool_message_bytes(body, serde),
+                         timed(encode, args.repeat), timed(lambda: json.loads(body), args.repeat),
+                         timed(lambda: bot._slim_tool_message(message), args.repeat)))
+
+        for shape, raw, gz, ckpt, enc, dec, trim in rows:
+            print(f"{size:<16} | {shape:<7} | {raw:>8} | {gz:>7} | {ckpt:>10} | {enc:>9.3f} | {dec:>9.3f} | {trim:>7.3f}")
+        (_, raw_f, gz_f, ckpt_f, *_), (_, raw_c, gz_c, ckpt_c, *_) = rows
+        print(f"{'':<16} | {'ratio':<7} | {raw_c / raw_f:>8.2f} | {gz_c / gz_f:>7.2f} | {ckpt_c / ckpt_f:>10.2f} |")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,116 @@
+"""Per-turn JSON CPU for each serializer backend (see serialization.py).
+
+Runs one search turn's worth of the JSON work through the real code paths,
+once per installed backend:
+
+- tool result → ToolMessage content (bot._tool_content, compact form)
+- dedupe keys for the turn's tool calls
+- context trim parsing the ToolMessage back (bot._slim_tool_message)
+- the /chat response body (app.FastJSONResponse) and the stream's done frame
+- structured log lines (logs.JsonFormatter)
+
+and reports milliseconds per turn plus the CPU saved against the stdlib.
+
+    python benchmarks/bench_serialization.py [--size 36x5] [--log-lines 20] [--repeat 300]
+"""
+import argparse
+import logging
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+os.environ.setdefault("OPENAI_API_KEY", "bench")  # bot builds ChatOpenAI clients at import
+os.environ.setdefault("LOG_LEVEL", "WARNING")
+
+from langchain_core.messages import ToolMessage  # noqa: E402
+
+import app  # noqa: E402
+import bot  # noqa: E402
+import serialization  # noqa: E402
+from bench_payload import flight_results  # noqa: E402
+from logs import JsonFormatter  # noqa: E402
+
+
+def use_backend(name: str) -> bool:
+    """Swap the module-level backend in place; False if it isn't installed."""
+    try:
+        (serialization.BACKEND, serialization._dumps_bytes,
+         serialization._loads, serialization._ENCODE_ERRORS) = serialization._load_backend(name)
+    except ImportError:
+        return False
+    return True
+
+
+def turn_steps(payload: dict, log_lines: int) -> dict:
+    tool_calls = [
+        {"name": "search_destinations", "args": {"query": "Zanzibar"}},
+        {"name": "check_flight_availability",
+         "args": {"from_code": "DAR", "to_code": "ZNZ", "departure_date": "2026/11/20",
+                  "return_date": "2026/11/27", "adults": 2, "children": 1}},
+    ]
+    content = bot._tool_content(payload)
+    message = ToolMessage(content=content, name="check_flight_availability", tool_call_id="call_bench")
+    response = app.ChatResponse(response="Here are the flights I found.", thread_id="bench",
+                                flight_results=payload).model_dump()
+    formatter = JsonFormatter()
+    records = []
+    for i in range(log_lines):
+        record = logging.LogRecord("travellink.bot", logging.INFO, __file__, 0, "tool.done", None, None)
+        record.trace_id = "4f1c0d6e9b2a4c51a7e3d8f0b6c2a914"
+        record.fields = {"tool": "check_flight_availability", "ms": 12.5 + i, "bytes": len(content), "ok": True}
+        records.append(record)
+
+    return {
+        "tool content": lambda: bot._tool_content(payload),
+        "dedupe keys": lambda: [serialization.dumps(c["args"], sort_keys=True, default=str) for c in tool_calls],
+        "trim parse": lambda: bot._slim_tool_message(message),
+        "/chat body": lambda: app.FastJSONResponse(response).body,
+        "stream done": lambda: app._sse("done", response),
+        "log lines": lambda: [formatter.format(r) for r in records],
+    }
+
+
+def timed(fn, repeat: int) -> float:
+    """Mean milliseconds per call."""
+    start = time.perf_counter()
+    for _ in range(repeat):
+        fn()
+    return (time.perf_counter() - start) / repeat * 1000
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--size", default="36x5", help="FLIGHTSxCLASSES of the flight_results payload")
+    parser.add_argument("--log-lines", type=int, default=20, help="structured log lines per turn")
+    parser.add_argument("--repeat", type=int, default=300)
+    args = parser.parse_args()
+
+    n_flights, n_classes = (int(x) for x in args.size.split("x"))
+    payload = flight_results(n_flights, n_classes)
+    selected = serialization.BACKEND
+
+    results = {}
+    for name in ("json", "msgspec", "orjson"):
+        if not use_backend(name):
+            print(f"{name}: not installed, skipped")
+            continue
+        steps = turn_steps(payload, args.log_lines)
+        for fn in steps.values():  # warm up
+            fn()
+        results[name] = {step: timed(fn, args.repeat) for step, fn in steps.items()}
+    use_backend(selected)
+
+    steps = list(next(iter(results.values())))
+    print(f"\n{'step (ms)':<13} | " + " | ".join(f"{name:>8}" for name in results))
+    for step in steps:
+        print(f"{step:<13} | " + " | ".join(f"{results[name][step]:>8.3f}" for name in results))
+    totals = {name: sum(r.values()) for name, r in results.items()}
+    print(f"{'per turn':<13} | " + " | ".join(f"{totals[name]:>8.3f}" for name in results))
+    baseline = totals["json"]
+    print(f"{'saved':<13} | " + " | ".join(f"{(baseline - totals[name]) / baseline:>8.0%}" for name in results))
+    print(f"\n{args.size} flights×classes, {args.log_lines} log lines; default backend here: {selected}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,212 @@
+"""Local stand-ins for the paid/remote dependencies, for benchmarks.
+
+- make_aerocrs_stub(): FastAPI app serving canned AeroCRS v5 responses with
+  configurable latency. Point AEROCRS_BASE_URL at it.
+- FakeChatModel: deterministic chat model that follows a scripted booking
+  conversation (search cities → check availability → offer extras) and
+  reports token usage, with configurable latency.
+"""
+import asyncio
+import itertools
+import json
+import random
+import re
+import time
+import uuid
+import zlib
+from typing import Any, List, Optional
+
+from fastapi import FastAPI, Request
+from langchain_core.language_models.chat_models import BaseChatModel
+from langchain_core.messages import AIMessage, BaseMessage, HumanMessage, ToolMessage
+from langchain_core.outputs import ChatGeneration, ChatResult
+
+
+CITIES = [
+    ("DAR", "Dar es Salaam"), ("ZNZ", "Zanzibar"), ("JRO", "Kilimanjaro"), ("ARK", "Arusha"),
+    ("MBA", "Mombasa"), ("NBO", "Nairobi"), ("EBB", "Entebbe"), ("KGL", "Kigali"),
+    ("MWZ", "Mwanza"), ("SEU", "Seronera"), ("MYW", "Mtwara"), ("TKQ", "Kigoma"),
+]
+
+
+# ─────────────────────────────────────────────
+# AEROCRS STUB
+# ─────────────────────────────────────────────
+
+def _destinations(size: int) -> list:
+    dests = [{"code": c, "iatacode": c, "name": n} for c, n in CITIES]
+    for i in range(len(dests), size):
+        code = f"X{i:03d}"
+        dests.append({"code": code, "iatacode": code, "name": f"Airstrip {i}"})
+    return dests
+
+
+def _flights(from_code: str, to_code: str, start: str, end: Optional[str], per_direction: int = 3) -> list:
+    flights = []
+    legs = [("outbound", start)] + ([("inbound", end)] if end else [])
+    for direction, date in legs:
+        day = date.replace("/", "-")
+        for n in range(per_direction):
+            flight_id = zlib.crc32(f"{from_code}{to_code}{date}{direction}{n}".encode()) % 10**6
+            flights.append({
+                "flightcode": f"TL{100 + n}",
+                "fltnum": str(100 + n),
+                "direction": direction,
+                "STD": f"{day}T{7 + 3 * n:02d}:00:00",
+                "STA": f"{day}T{8 + 3 * n:02d}:10:00",
+                "classes": {
+                    cls: {
+                        "fare": {"adultFare": f"{price + 15 * n:.2f}", "tax": "12.00"},
+                        "freeseats": 9 - n,
+                        "fareid": flight_id * 10 + k,
+                        "flightid": flight_id,
+                    }
+                    for k, (cls, price) in enumerate((("Y", 95), ("M", 140), ("B", 260)))
+                },
+            })
+    return flights
+
+
+def make_aerocrs_stub(latency_ms: float = 50, jitter_ms: float = 20, destinations: int = 200,
+                      seed: int = 7) -> FastAPI:
+    """AeroCRS v5 stand-in. Every endpoint waits latency ± jitter before answering."""
+    stub = FastAPI()
+    rng = random.Random(seed)
+    booking_ids = itertools.count(500000)
+    dest_list = _destinations(destinations)
+    calls = {}
+    stub.state.calls = calls
+
+    async def delay(name: str):
+        calls[name] = calls.get(name, 0) + 1
+        await asyncio.sleep(max(0.0, latency_ms + rng.uniform(-jitter_ms, jitter_ms)) / 1000)
+
+    @stub.get("/getDestinations")
+    async def get_destinations():
+        await delay("getDestinations")
+        return {"aerocrs": {"success": True, "destinations": {"destination": dest_list}}}
+
+    @stub.get("/getDeepLink")
+    async def get_deep_link(request: Request):
+        await delay("getDeepLink")
+        q = request.query_params
+        flights = _flights(q.get("from", ""), q.get("to", ""), q.get("start", ""), q.get("end"))
+        return {"aerocrs": {"success": True, "flights": {"flight": flights}}}
+
+    @stub.post("/createBooking")
+    async def create_booking():
+        await delay("createBooking")
+        return {"aerocrs": {"success": True, "booking": {
+            "bookingid": next(booking_ids), "pnrref": uuid.uuid4().hex[:6].upper(), "items": {"flight": [{}]},
+        }}}
+
+    @stub.post("/getAncillaries")
+    async def get_ancillaries():
+        await delay("getAncillaries")
+        return {"aerocrs": {"success": True, "ancillaries": {"ancillary": [
+            {"name": "CHECKED BAGGAGE", "groupname": "Baggage", "description": "Extra checked bag",
+             "items": [{"itemid": "17501", "itemname": "23kg bag", "fare": {"adult": "30.00"}}]},
+            {"name": "MEAL", "groupname": "Meals", "description": "Hot meal on board",
+             "items": [{"itemid": "17530", "itemname": "Hot meal", "fare": {"adult": "12.00"}}]},
+        ]}}}
+
+    @stub.post("/createAncillary")
+    async def create_ancillary():
+        await delay("createAncillary")
+        return {"aerocrs": {"success": True}}
+
+    @stub.post("/confirmBooking")
+    async def confirm_booking():
+        await delay("confirmBooking")
+        return {"aerocrs": {"success": True, "booking": {"status": "confirmed"}}}
+
+    @stub.post("/cancelBooking")
+    async def cancel_booking():
+        await delay("cancelBooking")
+        return {"aerocrs": {"success": True}}
+
+    return stub
+
+
+# ─────────────────────────────────────────────
+# FAKE CHAT MODEL
+# ─────────────────────────────────────────────
+
+_ROUTE_RE = re.compile(r"from (.+?) to (.+?)(?:[.,!?]|$)", re.IGNORECASE)
+_DATE_RE = re.compile(r"\d{4}/\d{2}/\d{2}")
+
+
+def _call(name: str, args: dict) -> dict:
+    return {"name": name, "args": args, "id": f"call_{uuid.uuid4().hex[:24]}"}
+
+
+class FakeChatModel(BaseChatModel):
+    """Scripted stand-in for ChatOpenAI — no network, same reply for the same input."""
+
+    model_name: str = "fake-chat"
+    latency_ms: float = 0.0
+
+    @property
+    def _llm_type(self) -> str:
+        return "fake-chat"
+
+    def bind_tools(self, tools: Any, **kwargs: Any):
+        return self
+
+    def _reply(self, messages: List[BaseMessage]) -> AIMessage:
+        last = messages[-1]
+        if isinstance(last, ToolMessage):
+            if last.name == "search_destinations":
+                return AIMessage(content="Got it! What date would you like to travel, and how many passengers?")
+            if last.name == "check_flight_availability":
+                return AIMessage(content="Here you go! Pick a flight and fare class from the cards.")
+            if last.name == "check_ancillaries":
+                return AIMessage(content="Want to add checked baggage or a meal? Otherwise I just need "
+                                         "your full name, date of birth, phone number, and email.")
+            return AIMessage(content="Done!")
+
+        text = last.content if isinstance(last, HumanMessage) and isinstance(last.content, str) else ""
+        if text.startswith("Current summary:"):  # rolling-summary request from llm_mini
+            return AIMessage(content="- Trip details discussed earlier in the conversation.")
+        route = _ROUTE_RE.search(text)
+        if route:
+            return AIMessage(content="", tool_calls=[
+                _call("search_destinations", {"query": route.group(1).strip()}),
+                _call("search_destinations", {"query": route.group(2).strip()}),
+            ])
+        date = _DATE_RE.search(text)
+        codes = self._resolved_codes(messages)
+        if date and len(codes) >= 2:
+            return AIMessage(content="", tool_calls=[_call("check_flight_availability", {
+                "from_code": codes[-2], "to_code": codes[-1], "travel_date": date.group(0), "adults": 1,
+            })])
+        return AIMessage(content="Sure — where would you like to fly from, and where to?")
+
+    @staticmethod
+    def _resolved_codes(messages: List[BaseMessage]) -> list:
+        codes = []
+        for m in messages:
+            if isinstance(m, ToolMessage) and m.name == "search_destinations":
+                try:
+                    data = json.loads(m.content)
+                except (TypeError, ValueError):
+                    continue
+                if data.get("found"):
+                    codes.append(data["code"])
+        return codes
+
+    def _generate(self, messages: List[BaseMessage], stop=None, run_manager=None, **kwargs) -> ChatResult:
+        if self.latency_ms:
+            time.sleep(self.latency_ms / 1000)
+        reply = self._reply(messages)
+        prompt_tokens = sum(len(str(m.content)) for m in messages) // 4
+        completion_tokens = len(reply.content) // 4 + 20 * len(reply.tool_calls)
+        reply.usage_metadata = {
+            "input_tokens": prompt_tokens,
+            "output_tokens": completion_tokens,
+            "total_tokens": prompt_tokens + completion_tokens,
+        }
+        usage = {"prompt_tokens": prompt_tokens, "completion_tokens": completion_tokens,
+                 "prompt_tokens_details": {"cached_tokens": 0}}
+        reply.response_metadata = {"token_usage": usage, "model_name": self.model_name}  # as ChatOpenAI sets it
+        return ChatResult(generations=[ChatGeneration(message=reply)], llm_output={"token_usage": usage})
@@ -1,34 +1,76 @@
 import os
-import json
-import requests
 from datetime import datetime, timedelta
-from typing import TypedDict, Annotated, Sequence, Optional
+from typing import TypedDict, Annotated, List, Sequence, Optional
 import operator
+import contextvars
 import re
+import threading
+import time
+import uuid
+from collections import OrderedDict
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
 from langgraph.graph import StateGraph, END
-from langgraph.checkpoint.memory import MemorySaver
-from langgraph.prebuilt import ToolNode, tools_condition
+from langgraph.prebuilt import tools_condition
 from langchain_openai import ChatOpenAI
 from langchain_core.messages import HumanMessage, AIMessage, SystemMessage, ToolMessage
+from langchain_core.runnables import RunnableConfig
 from langchain_core.tools import tool
 from dotenv import load_dotenv
 import dateparser
-from thefuzz import fuzz
+
+from aerocrs import client as aerocrs
+from airport_index import clean_text
+from cache import TTLCache
+from compact import COMPACT_FORMAT, compact_flight_results, flight_rows, is_compact
+from models import Availability, parse_ancillaries, parse_deeplink
+from catalog import DestinationCatalog
+from checkpoint import make_checkpointer
+import replay
+import serialization
+from logs import get_logger, lazy
+from tracing import metrics, span
 
 load_dotenv()
 
+log = get_logger("bot")
 
 
-AUTHID = os.getenv("AUTHID")
-AUTHPASSSWORD = os.getenv("AUTHPASSSWORD")
-BASE_URL = "https://api.aerocrs.com/v5"
 
 # Model tiering — cheap model for simple Q&A, full model for complex phases
 llm_mini = ChatOpenAI(model="gpt-4o-mini", temperature=0.2, max_tokens=500)
 llm_full = ChatOpenAI(model="gpt-4o", temperature=0.2, max_tokens=800)
 
-# Context window size — keep small to save tokens
-MAX_CONTEXT_MESSAGES = 16
+# Context window size — keep small to save tokens. Both caps apply; the
+# token budget is what keeps a larger message cap from blowing up cost
+MAX_CONTEXT_MESSAGES = int(os.getenv("MAX_CONTEXT_MESSAGES", "16"))
+MAX_CONTEXT_TOKENS = int(os.getenv("MAX_CONTEXT_TOKENS", "6000"))
+_TOKENS_PER_MESSAGE = 4  # role / separators the API adds around each message
+
+# Messages that fall out of the window are folded into a rolling summary by
+# llm_mini, in batches of at least this many (until then they stay in the window)
+SUMMARY_BATCH_MESSAGES = int(os.getenv("SUMMARY_BATCH_MESSAGES", "6"))
+
+# Tool calls from one LLM turn run concurrently on a pool shared by all threads
+TOOL_MAX_WORKERS = int(os.getenv("TOOL_MAX_WORKERS", "8"))
+
+# getDeepLink responses are reused for identical searches within this window
+FLIGHT_CACHE_TTL_SECONDS = float(os.getenv("FLIGHT_CACHE_TTL_SECONDS", "120"))
+# … and for a search that came back with no bookable flights (0: not cached)
+FLIGHT_CACHE_EMPTY_TTL_SECONDS = float(os.getenv("FLIGHT_CACHE_EMPTY_TTL_SECONDS", "10"))
+
+# Fare calendar: days searched when no end date is given, the most a single
+# calendar may span, and how many of its days are fetched at once
+FARE_CALENDAR_DEFAULT_DAYS = int(os.getenv("FARE_CALENDAR_DEFAULT_DAYS", "7"))
+FARE_CALENDAR_MAX_DAYS = int(os.getenv("FARE_CALENDAR_MAX_DAYS", "31"))
+FARE_CALENDAR_CONCURRENCY = int(os.getenv("FARE_CALENDAR_CONCURRENCY", "4"))
+
+# Multi-route search: most origin × destination pairs one search may cover,
+# and how many of its getDeepLink calls run at once
+MULTI_ROUTE_MAX_PAIRS = int(os.getenv("MULTI_ROUTE_MAX_PAIRS", "12"))
+MULTI_ROUTE_CONCURRENCY = int(os.getenv("MULTI_ROUTE_CONCURRENCY", "4"))
+
+# Worker threads shared by every fan-out search (fare calendar, multi-route)
+SEARCH_POOL_MAX_WORKERS = int(os.getenv("SEARCH_POOL_MAX_WORKERS", "16"))
 
 
 # ─────────────────────────────────────────────
@@ -37,6 +79,20 @@ MAX_CONTEXT_MESSAGES = 16
 
 class FlightState(TypedDict):
     messages: Annotated[Sequence[HumanMessage | AIMessage | SystemMessage | ToolMessage], operator.add]
+    # Maintained incrementally by router_node / tools_node — never rescanned from history
+    phase: str                    # 'gathering' | 'searching' | 'post_booking'
+    user_intent: str              # 'restart' | 'cancel' | '' — from the latest user message
+    booking_id: Optional[int]     # active booking (from the __booking__ trigger)
+    flight_id: Optional[int]
+    last_search: Optional[dict]   # context of the latest flight_results
+    cancelled: bool               # the active booking was cancelled
+    # Tool payloads produced during the current invocation (reset by router_node)
+    flight_results: Optional[dict]
+    ancillary_results: Optional[dict]
+    fare_calendar: Optional[dict]
+    # Rolling summary of messages[:summarized_upto], which no longer fit the window
+    summary: str
+    summarized_upto: int
 
 
 # ─────────────────────────────────────────────
@@ -66,50 +122,252 @@ def normalize_date(date_text: str, allow_past: bool = False) -> Optional[str]:
     return parsed.strftime("%Y/%m/%d")
 
 
-def _parse_time(dt_str: str) -> str:
-    """Robustly extract HH:MM from any datetime string format."""
-    if not dt_str:
-        return ''
-    for sep in ['T', ' ']:
-        if sep in dt_str:
-            parts = dt_str.split(sep)
-            if len(parts) >= 2:
-                return parts[1][:5]
-    return dt_str[-5:] if len(dt_str) >= 5 else dt_str
+def _fetch_destinations() -> list:
+    return aerocrs.get("/getDestinations")["aerocrs"]["destinations"]["destination"]
+
+
+# Shared by every thread/tool call in this process
+destination_catalog = DestinationCatalog(_fetch_destinations)
+
+
+def _availability_ttl(availability: Availability) -> float:
+    # A route/date with nothing bookable may just be a hiccup upstream; recheck it soon
+    return FLIGHT_CACHE_TTL_SECONDS if availability.flights else FLIGHT_CACHE_EMPTY_TTL_SECONDS
+
+
+# Keyed by (from, to, start, end, adults, child, infant); holds parsed Availability, not the raw JSON.
+# Error responses raise in parse_deeplink and are never cached.
+flight_cache = TTLCache(FLIGHT_CACHE_TTL_SECONDS, ttl_for=_availability_ttl)
 
 
-def clean_text(text: str) -> str:
-    text = text.lower()
-    text = re.sub(r"[^a-z0-9 ]", " ", text)
-    return re.sub(r"\s+", " ", text).strip()
+def invalidate_route(from_code: str, to_code: str) -> int:
+    """Forget cached availability for a route (both directions), e.g. after a booking."""
+    route = {from_code.upper(), to_code.upper()}
+    return flight_cache.invalidate(lambda key: {key[0], key[1]} == route)
+
+
+def _fetch_deeplink(from_code: str, to_code: str, dep_date: str, ret_date: Optional[str],
+                    adults: int, children: int, infants: int) -> Availability:
+    """Parsed getDeepLink for one route/date/passenger mix, through flight_cache."""
+    params = {
+        "from": from_code, "to": to_code,
+        "start": dep_date,
+        "adults": adults, "child": children, "infant": infants
+    }
+    if ret_date:
+        params["end"] = ret_date
+    query = "&".join(f"{k}={v}" for k, v in params.items())
+    cache_key = (from_code.upper(), to_code.upper(), dep_date, ret_date, adults, children, infants)
+    return flight_cache.get_or_load(cache_key, lambda: parse_deeplink(aerocrs.get(f"/getDeepLink?{query}")))
+
+
+def _passenger_label(adults: int, children: int, infants: int) -> str:
+    return (f"{adults} Adult{'' if adults == 1 else 's'}"
+            + (f", {children} Child{'ren' if children != 1 else ''}" if children else "")
+            + (f", {infants} Infant{'' if infants == 1 else 's'}" if infants else ""))
+
+
+def _flight_cards(flights: list, from_code: str, to_code: str) -> list:
+    """flight_results cards: outbound flights first, then return flights."""
+    return ([f.card(from_code, to_code, "Outbound") for f in flights if f.direction == "outbound"]
+            + [f.card(from_code, to_code, "Return") for f in flights if f.direction == "inbound"])
+
+
+# ─────────────────────────────────────────────
+# FAN-OUT SEARCH — many getDeepLink calls for one request
+# ─────────────────────────────────────────────
+
+_search_pool = ThreadPoolExecutor(max_workers=SEARCH_POOL_MAX_WORKERS, thread_name_prefix="search")
 
 
-def _get_headers() -> dict:
+def _iter_bounded(fn, arg_list: list, limit: int):
+    """Run fn(*args) for every args tuple on the shared search pool, with at
+    most `limit` in flight for this caller. Yields results in completion order."""
+    pending = iter(arg_list)
+    running = set()
+
+    def submit_next():
+        args = next(pending, None)
+        if args is not None:
+            # copy_context keeps each call's AeroCRS span inside the request's trace
+            running.add(_search_pool.submit(contextvars.copy_context().run, fn, *args))
+
+    for _ in range(limit):
+        submit_next()
+    try:
+        while running:
+            done, _ = wait(running, return_when=FIRST_COMPLETED)
+            for f in done:
+                running.discard(f)
+                submit_next()
+                yield f.result()
+    finally:
+        for f in running:  # consumer went away (e.g. a closed stream)
+            f.cancel()
+
+
+# ── fare calendar: cheapest fare per day across a date range ──
+
+
+def fare_calendar_dates(start_date: str, end_date: Optional[str] = None,
+                        max_days: Optional[int] = FARE_CALENDAR_MAX_DAYS) -> tuple:
+    """Inclusive list of YYYY/MM/DD days → (dates, error). Cut to the first
+    `max_days` (None: the whole range); the payload's context shows the
+    range actually searched."""
+    start = normalize_date(start_date)
+    if not start or start == "PAST_DATE":
+        return [], "Start date is invalid or in the past. Please provide a future date."
+    first = datetime.strptime(start, "%Y/%m/%d")
+    n_days = FARE_CALENDAR_DEFAULT_DAYS
+    if end_date:
+        end = normalize_date(end_date)
+        if not end or end == "PAST_DATE":
+            return [], "End date is invalid or in the past. Please provide a future date."
+        n_days = (datetime.strptime(end, "%Y/%m/%d") - first).days + 1
+        if n_days < 1:
+            return [], f"End date ({end}) cannot be before start date ({start})."
+    if max_days is not None:
+        n_days = min(n_days, max_days)
+    return [(first + timedelta(days=i)).strftime("%Y/%m/%d") for i in range(n_days)], None
+
+
+def _calendar_day(from_code: str, to_code: str, day: str, adults: int, children: int, infants: int) -> dict:
+    """Cheapest outbound fare on one day. `price` is None when nothing is bookable."""
+    cell = {"date": day, "price": None}
+    try:
+        availability = _fetch_deeplink(from_code, to_code, day, None, adults, children, infants)
+    except Exception as e:
+        cell["error"] = str(e)
+        return cell
+
+    best = None
+    for f in availability.flights:
+        if f.direction in ("outbound", None) and (best is None or f.cheapest.price < best.cheapest.price):
+            best = f
+    if best:
+        cell.update({
+            "price": best.cheapest.adult_fare,
+            "flight_code": best.flight_code,
+            "departure_time": best.departure_time,
+            "seats_available": best.cheapest.free_seats,
+        })
+    return cell
+
+
+def iter_fare_calendar(from_code: str, to_code: str, dates: list,
+                       adults: int, children: int = 0, infants: int = 0):
+    """Yield each day's cell as soon as its search finishes (completion order,
+    not date order). Days already in flight_cache come back immediately."""
+    args = [(from_code, to_code, day, adults, children, infants) for day in dates]
+    return _iter_bounded(_calendar_day, args, FARE_CALENDAR_CONCURRENCY)
+
+
+def fare_calendar_payload(from_code: str, to_code: str, cells: list,
+                          adults: int, children: int = 0, infants: int = 0) -> dict:
+    """Date-ordered grid for the UI / LLM, with the cheapest day picked out."""
+    days = sorted(cells, key=lambda c: c["date"])
+    priced = [c for c in days if c["price"] is not None]
+    cheapest = min(priced, key=lambda c: float(c["price"])) if priced else None
     return {
-        "Content-Type": "application/json",
-        "auth_id": AUTHID,
-        "auth_password": AUTHPASSSWORD
+        "type": "fare_calendar",
+        "header": f"{from_code} → {to_code}",
+        "sub_header": _passenger_label(adults, children, infants),
+        "context": {
+            "from_code": from_code,
+            "to_code": to_code,
+            "adults": adults,
+            "child": children,
+            "infant": infants,
+            "start_date": days[0]["date"] if days else None,
+            "end_date": days[-1]["date"] if days else None,
+        },
+        "cheapest": {"date": cheapest["date"], "price": cheapest["price"]} if cheapest else None,
+        "days": days,
     }
 
 
-def _match_airport_code(city_name: str, destinations: list) -> Optional[str]:
-    city_clean = clean_text(city_name)
-    best_match, best_score = None, 0
-    for dest in destinations:
-        name_clean = clean_text(dest.get("name", ""))
-        code = dest.get("code", "").lower()
-        iata = dest.get("iatacode", "").lower()
-        if city_clean in (code, iata) or city_clean in name_clean:
-            return dest["code"]
-        if all(w in name_clean for w in city_clean.split()):
-            return dest["code"]
-        score = max(
-            fuzz.partial_ratio(city_clean, name_clean),
-            fuzz.partial_ratio(city_clean, name_clean.split()[0] if name_clean else "")
-        )
-        if score > best_score:
-            best_score, best_match = score, dest["code"]
-    return best_match if best_score >= 60 else None
+# ── multi-route: every origin × destination airport pair on one date ──
+
+def route_pairs(from_codes: list, to_codes: list) -> list:
+    """Distinct (from, to) code pairs in input order, without same-airport pairs."""
+    pairs = []
+    for origin in from_codes:
+        for destination in to_codes:
+            pair = (origin.strip().upper(), destination.strip().upper())
+            if pair[0] and pair[1] and pair[0] != pair[1] and pair not in pairs:
+                pairs.append(pair)
+    return pairs
+
+
+def _route_flights(from_code: str, to_code: str, dep_date: str, adults: int, children: int, infants: int) -> tuple:
+    """Outbound flights for one pair → (from_code, to_code, [Flight], error)."""
+    try:
+        availability = _fetch_deeplink(from_code, to_code, dep_date, None, adults, children, infants)
+    except Exception as e:
+        return from_code, to_code, [], str(e)
+    return from_code, to_code, [f for f in availability.flights if f.direction in ("outbound", None)], None
+
+
+def multi_route_flights(pairs: list, dep_date: str, adults: int, children: int = 0, infants: int = 0) -> list:
+    """Search every pair concurrently, at most MULTI_ROUTE_CONCURRENCY getDeepLink calls at once."""
+    args = [(o, d, dep_date, adults, children, infants) for o, d in pairs]
+    return list(_iter_bounded(_route_flights, args, MULTI_ROUTE_CONCURRENCY))
+
+
+def multi_route_payload(from_codes: list, to_codes: list, results: list, dep_date: str,
+                        adults: int, children: int = 0, infants: int = 0) -> dict:
+    """One flight_results payload for all pairs, cheapest first, then earliest
+    (ties keep the pairs' input order, not the order the searches finished in)."""
+    order = {pair: i for i, pair in enumerate(route_pairs(from_codes, to_codes))}
+    results = sorted(results, key=lambda r: order.get((r[0], r[1]), len(order)))
+    ranked = [(f, o, d) for o, d, flights, _ in results for f in flights]
+    ranked.sort(key=lambda r: (r[0].cheapest.price, r[0].departure_time))
+    flights = [f.card(o, d, "Outbound") for f, o, d in ranked]
+    routes = [
+        {"from": o, "to": d, **({"error": error} if error else {"flights": len(route_flights)})}
+        for o, d, route_flights, error in results
+    ]
+    best = flights[0] if flights else {}
+    return {
+        "type": "flight_results",
+        "header": f"{'/'.join(from_codes)} → {'/'.join(to_codes)}",
+        "sub_header": _passenger_label(adults, children, infants),
+        "context": {
+            # The cheapest flight's route; every card also carries its own codes
+            "from_code": best.get("origin_code", from_codes[0]),
+            "to_code": best.get("destination_code", to_codes[0]),
+            "from_codes": from_codes,
+            "to_codes": to_codes,
+            "adults": adults,
+            "child": children,
+            "infant": infants,
+            "triptype": "OW",
+            "departure_date": dep_date,
+            "return_date": None
+        },
+        "routes": routes,
+        "data": flights
+    }
+
+
+# ── fare classes on demand (compact flight_results leave the raw detail out) ──
+
+_DIRECTIONS = {"Outbound": "outbound", "Return": "inbound"}
+
+
+def flight_classes(from_code: str, to_code: str, dep_date: str, ret_date: Optional[str],
+                   adults: int, children: int, infants: int,
+                   flight_code: str, direction: Optional[str] = None) -> Optional[dict]:
+    """Raw AeroCRS classes of one flight from a search, by flight code — from
+    flight_cache while the search is fresh, else a new getDeepLink. None if
+    the flight is no longer offered."""
+    raw_direction = _DIRECTIONS.get(direction, direction)
+    availability = _fetch_deeplink(from_code, to_code, dep_date, ret_date, adults, children, infants)
+    for f in availability.flights:
+        if f.flight_code == flight_code and (not raw_direction or f.direction == raw_direction):
+            return f.classes_dict()
+    return None
+
 
 
 # ─────────────────────────────────────────────
@@ -123,28 +381,26 @@ def search_destinations(query: str) -> dict:
     Args:
         query: City or airport name to look up (e.g. "Arusha", "Dar es Salaam")
     Returns:
-        dict with 'found' bool, 'code' (IATA), 'name', and 'similar' alternatives if not found.
+        dict with 'found' bool, 'code' (IATA), 'name', 'airports' when the city has several,
+        and 'similar' alternatives if not found.
     """
     try:
-        r = requests.get(f"{BASE_URL}/getDestinations", headers=_get_headers())
-        dest_list = r.json()["aerocrs"]["destinations"]["destination"]
+        index = destination_catalog.index()
     except Exception as e:
         return {"found": False, "error": str(e)}
 
-    code = _match_airport_code(query, dest_list)
-    if code:
-        matched = next((d for d in dest_list if d["code"] == code), {})
-        return {"found": True, "code": code, "name": matched.get("name", query)}
+    with span("airport_index.match", query=query, size=len(index)):
+        matched = index.match(query)
+    if matched:
+        result = {"found": True, "code": matched["code"], "name": matched.get("name", query)}
+        # Other airports serving the same city, for check_multi_route_availability
+        group = index.group(query)
+        if len(group) > 1:
+            result["airports"] = [{"code": d["code"], "name": d.get("name")} for d in group]
+        return result
 
     # Return similar options to help clarify
-    query_clean = clean_text(query)
-    similar = []
-    for dest in dest_list:
-        score = fuzz.partial_ratio(query_clean, clean_text(dest.get("name", "")))
-        if score >= 40:
-            similar.append({"name": dest.get("name"), "code": dest.get("code"), "score": score})
-    similar = sorted(similar, key=lambda x: -x["score"])[:5]
-    return {"found": False, "query": query, "similar_destinations": similar}
+    return {"found": False, "query": query, "similar_destinations": index.similar(query)}
 
 
 @tool
@@ -178,6 +434,7 @@ def check_flight_availability(
         return {"error": "Departure date is invalid or in the past. Please provide a future date."}
 
     # Validate return date for round trips
+    ret_date = None
     if round_trip and return_date:
         ret_date = normalize_date(return_date)
         if not ret_date or ret_date == "PAST_DATE":
@@ -187,93 +444,19 @@ def check_flight_availability(
 
     # Fetch flights directly via deeplink API
     try:
-        params = {
-            "from": from_code, "to": to_code,
-            "start": dep_date,
-            "adults": adults, "child": children, "infant": infants
-        }
-        if round_trip and return_date:
-            ret_date = normalize_date(return_date)
-            if ret_date and ret_date != "PAST_DATE":
-                params["end"] = ret_date
-
-        query = "&".join(f"{k}={v}" for k, v in params.items())
-        dl_r = requests.get(f"{BASE_URL}/getDeepLink?{query}", headers=_get_headers())
-        data = dl_r.json()
-        print(f"[DEEPLINK] Response keys: {list(data.get('aerocrs', {}).get('flights', {}).keys())}")
-
-        flights_raw = data.get("aerocrs", {}).get("flights", {})
-        flight_list = flights_raw.get("flight", [])
-
-        # API sometimes returns a string message like "No flights available"
-        if isinstance(flight_list, str):
-            print(f"[DEEPLINK] API returned string instead of flights: {flight_list[:100]}")
-            return {"error": f"No flights found from {from_code} to {to_code} on {dep_date}. Try different dates."}
-
-        # Handle single flight (dict) vs list
-        if isinstance(flight_list, dict):
-            flight_list = [flight_list]
-
-        if not flight_list:
-            return {"error": f"No flights found from {from_code} to {to_code} on {dep_date}. Try different dates."}
-
-        flights = flight_list
+        availability = _fetch_deeplink(from_code, to_code, dep_date, ret_date, adults, children, infants)
     except Exception as e:
         return {"error": f"Could not retrieve flight details: {e}"}
 
-    # Debug: log raw structure of first flight
-    if flights:
-        sample = flights[0]
-        if isinstance(sample, dict):
-            print(f"[DEEPLINK] Sample flight keys: {list(sample.keys())}")
-            classes_sample = sample.get("classes")
-            print(f"[DEEPLINK] Classes type: {type(classes_sample).__name__}, value preview: {str(classes_sample)[:200]}")
-        else:
-            print(f"[DEEPLINK] WARNING: flight entry is {type(sample).__name__}, not dict: {str(sample)[:200]}")
-
-    # Filter out non-dict entries (API sometimes returns strings)
-    flights = [f for f in flights if isinstance(f, dict)]
-    if not flights:
-        return {"error": f"No valid flight data from {from_code} to {to_code} on {dep_date}. Try different dates."}
+    # API sometimes returns a string message like "No flights available"
+    if availability.message is not None:
+        log.info("deeplink.no_flights", route=f"{from_code}-{to_code}", date=dep_date, message=availability.message[:100])
+    if not availability.entries:
+        return {"error": f"No flights found from {from_code} to {to_code} on {dep_date}. Try different dates."}
+    log.debug("deeplink.parsed", entries=availability.entries, flights=len(availability.flights))
 
     # Format results
-    outbound = [f for f in flights if f.get("direction") == "outbound"]
-    inbound = [f for f in flights if f.get("direction") == "inbound"]
-    structured = []
-
-    def process(flight_list, direction_label):
-        for f in flight_list:
-            try:
-                classes = f.get("classes", {})
-                if not isinstance(classes, dict):
-                    print(f"[DEEPLINK] Skipping flight — classes is {type(classes).__name__}: {str(classes)[:100]}")
-                    continue
-                # Filter to only dict class entries (skip string/int values)
-                valid_classes = {k: v for k, v in classes.items() if isinstance(v, dict)}
-                if not valid_classes:
-                    print(f"[DEEPLINK] Skipping flight — no valid class entries in: {list(classes.keys())}")
-                    continue
-                cheapest = min(valid_classes.values(), key=lambda c: float(c.get("fare", {}).get("adultFare", 99999)))
-                structured.append({
-                    "direction": direction_label,
-                    "flight_code": f.get("flightcode"),
-                    "flight_number": f.get("fltnum"),
-                    "origin_code": from_code,
-                    "destination_code": to_code,
-                    "departure_time": _parse_time(f.get("STD", "")),
-                    "arrival_time": _parse_time(f.get("STA", "")),
-                    "via": f.get("via") or None,
-                    "price": cheapest["fare"]["adultFare"],
-                    "tax": cheapest["fare"]["tax"],
-                    "seats_available": cheapest.get("freeseats"),
-                    "classes": valid_classes
-                })
-            except Exception as exc:
-                print(f"[DEEPLINK] Error processing flight: {exc}")
-                continue
-
-    process(outbound, "Outbound")
-    process(inbound, "Return")
+    structured = _flight_cards(availability.flights, from_code, to_code)
 
     if not structured:
         return {"error": f"Flights exist but could not be parsed for {from_code} → {to_code} on {dep_date}. This may be a temporary issue."}
@@ -281,7 +464,7 @@ def check_flight_availability(
     return {
         "type": "flight_results",
         "header": f"{from_code} → {to_code}",
-        "sub_header": f"{adults} Adult{'' if adults == 1 else 's'}" + (f", {children} Child{'ren' if children != 1 else ''}" if children else "") + (f", {infants} Infant{'' if infants == 1 else 's'}" if infants else ""),
+        "sub_header": _passenger_label(adults, children, infants),
         "context": {
             "from_code": from_code,
             "to_code": to_code,
@@ -290,12 +473,93 @@ def check_flight_availability(
             "infant": infants,
             "triptype": "RT" if round_trip else "OW",
             "departure_date": dep_date,
-            "return_date": params.get("end")
+            "return_date": ret_date
         },
         "data": structured
     }
 
 
+@tool
+def check_multi_route_availability(
+    from_codes: List[str],
+    to_codes: List[str],
+    travel_date: str,
+    adults: int,
+    children: int = 0,
+    infants: int = 0
+) -> dict:
+    """Search one-way flights between SEVERAL departure and/or arrival airports at once,
+    ranked by price across all routes.
+    Use this instead of calling check_flight_availability once per airport pair — when
+    search_destinations lists several 'airports' for a city, or the user is happy with any
+    of a few nearby airports. Only use codes returned by search_destinations.
+    Args:
+        from_codes: Departure IATA codes (e.g. ["DAR"])
+        to_codes: Arrival IATA codes (e.g. ["JRO", "ARK"])
+        travel_date: Departure date in YYYY/MM/DD format
+        adults: Number of adult passengers (>=1)
+        children: Number of child passengers
+        infants: Number of infant passengers
+    Returns:
+        Structured flight results JSON for the UI (each flight has its own origin/destination),
+        or an error message.
+    """
+    dep_date = normalize_date(travel_date)
+    if not dep_date or dep_date == "PAST_DATE":
+        return {"error": "Departure date is invalid or in the past. Please provide a future date."}
+    pairs = route_pairs(from_codes, to_codes)
+    if not pairs:
+        return {"error": "Give at least one departure and one different arrival airport code."}
+    if len(pairs) > MULTI_ROUTE_MAX_PAIRS:
+        return {"error": f"That is {len(pairs)} airport combinations; narrow it down to at most {MULTI_ROUTE_MAX_PAIRS}."}
+
+    from_codes = list(dict.fromkeys(o for o, _ in pairs))
+    to_codes = list(dict.fromkeys(d for _, d in pairs))
+    results = multi_route_flights(pairs, dep_date, adults, children, infants)
+    payload = multi_route_payload(from_codes, to_codes, results, dep_date, adults, children, infants)
+    log.info("multi_route.searched", pairs=len(pairs), flights=len(payload["data"]),
+             errors=sum(1 for r in results if r[3]))
+    if not payload["data"]:
+        return {"error": f"No flights found between {'/'.join(from_codes)} and {'/'.join(to_codes)} on {dep_date}. Try different dates.",
+                "routes": payload["routes"]}
+    return payload
+
+
+@tool
+def search_fare_calendar(
+    from_code: str,
+    to_code: str,
+    start_date: str,
+    end_date: str = None,
+    adults: int = 1,
+    children: int = 0,
+    infants: int = 0
+) -> dict:
+    """Find the cheapest one-way fare for every day in a date range.
+    Use this when the user is flexible on dates ("cheapest day next week") instead of
+    calling check_flight_availability once per day. Then call check_flight_availability
+    for the day the user picks.
+    Args:
+        from_code: Departure IATA code (e.g. "JRO")
+        to_code: Arrival IATA code (e.g. "DAR")
+        start_date: First day of the range in YYYY/MM/DD format
+        end_date: Last day of the range in YYYY/MM/DD (default: a week from start_date)
+        adults: Number of adult passengers (>=1)
+        children: Number of child passengers
+        infants: Number of infant passengers
+    Returns:
+        dict with 'cheapest' day and a per-day 'days' grid (price None = no flights), or an error message.
+    """
+    dates, error = fare_calendar_dates(start_date, end_date)
+    if error:
+        return {"error": error}
+    cells = list(iter_fare_calendar(from_code, to_code, dates, adults, children, infants))
+    calendar = fare_calendar_payload(from_code, to_code, cells, adults, children, infants)
+    if calendar["cheapest"] is None:
+        return {"error": f"No flights found from {from_code} to {to_code} between {dates[0]} and {dates[-1]}. Try different dates."}
+    return calendar
+
+
 @tool
 def check_ancillaries(booking_id: int, flight_id: int) -> dict:
     """Check available add-ons (baggage, meals, seats) for a booking.
@@ -316,87 +580,27 @@ def check_ancillaries(booking_id: int, flight_id: int) -> dict:
                 }
             }
         }
-        r = requests.post(f"{BASE_URL}/getAncillaries", headers=_get_headers(), json=payload)
-        raw_json = r.json()
-        print(f"[ANCILLARIES RAW] booking={booking_id} flight={flight_id} → {json.dumps(raw_json)[:1500]}")
-
-        aerocrs = raw_json.get("aerocrs", {})
-
-        # Real API shape:
-        # {"aerocrs": {"ancillaries": {"ancillary": [
-        #   {"name": "WHEELCHAIR SERVICE", "description": "...", "groupname": "...",
-        #    "items": [{"itemid": "17520", "itemname": "Wheelchair service charge",
-        #               "fare": {"adult": "25.00"}, ...}]}
-        # ]}}}
-        ancillaries_block = aerocrs.get("ancillaries") or {}
-        if isinstance(ancillaries_block, list):
-            groups = ancillaries_block
-        elif isinstance(ancillaries_block, dict):
-            raw_anc = ancillaries_block.get("ancillary") or []
-            groups = raw_anc if isinstance(raw_anc, list) else [raw_anc]
-        else:
-            groups = []
-
-        normalised = []
-        for group in groups:
-            if not isinstance(group, dict):
-                continue
-            group_name = group.get("groupname") or group.get("name") or "Add-on"
-            group_desc = group.get("name") or group.get("description") or ""
-
-            # Each group has sub-items with itemid + fare
-            sub_items = group.get("items") or []
-            if isinstance(sub_items, dict):
-                sub_items = [sub_items]
-
-            if sub_items:
-                for sub in sub_items:
-                    if not isinstance(sub, dict):
-                        continue
-                    fare = sub.get("fare") or {}
-                    if isinstance(fare, str):
-                        price = fare or "0"
-                    else:
-                        price = fare.get("adult") or fare.get("adultFare") or sub.get("price") or "0"
-                    normalised.append({
-                        "itemid": sub.get("itemid") or sub.get("id"),
-                        "name": sub.get("itemname") or sub.get("name") or group_desc or "Extra",
-                        "category": group_name,
-                        "price": str(price),
-                        "currency": "USD",
-                        "description": group.get("description") or group_desc or "",
-                    })
-            else:
-                # Group itself is the purchasable item
-                fare = group.get("fare") or {}
-                if isinstance(fare, str):
-                    price = fare or "0"
-                else:
-                    price = fare.get("adult") or fare.get("adultFare") or group.get("price") or "0"
-                normalised.append({
-                    "itemid": group.get("itemid") or group.get("id"),
-                    "name": group_desc or group_name,
-                    "category": group_name,
-                    "price": str(price),
-                    "currency": "USD",
-                    "description": group.get("description") or "",
-                })
-
-        if not normalised:
-            print(f"[ANCILLARIES] No items parsed for booking={booking_id}")
+        raw_json = aerocrs.post("/getAncillaries", payload)
+        log.debug("ancillaries.raw", booking_id=booking_id, flight_id=flight_id,
+                  body=lazy(lambda: serialization.dumps(raw_json)[:1500]))
+
+        items = parse_ancillaries(raw_json)
+
+        if not items:
+            log.info("ancillaries.none", booking_id=booking_id)
             return {"type": "ancillary_results", "available": False, "available_count": 0, "items": []}
 
-        print(f"[ANCILLARIES] {len(normalised)} items found")
+        log.info("ancillaries.found", booking_id=booking_id, items=len(items))
         return {
             "type": "ancillary_results",
             "available": True,
-            "available_count": len(normalised),
-            "items": normalised,
+            "available_count": len(items),
+            "items": [item.to_dict() for item in items],
             "booking_id": booking_id,
             "flight_id": flight_id
         }
     except Exception as e:
-        print(f"[ANCILLARIES ERROR] {e}")
+        log.error("ancillaries.error", booking_id=booking_id, error=repr(e))
         return {"type": "ancillary_results", "available": False, "available_count": 0, "error": str(e)}
 
 
@@ -427,8 +631,7 @@ def add_ancillary(booking_id: int, flight_id: int, item_id: int, pax_num: int =
                 }
             }
         }
-        r = requests.post(f"{BASE_URL}/createAncillary", headers=_get_headers(), json=payload)
-        return r.json()
+        return aerocrs.post("/createAncillary", payload)
     except Exception as e:
         return {"error": str(e)}
 
@@ -481,9 +684,8 @@ def confirm_booking(
                 }
             }
         }
-        r = requests.post(f"{BASE_URL}/confirmBooking", headers=_get_headers(), json=payload)
-        result = r.json()
-        print(f"[CONFIRM RESPONSE] {result}")
+        result = aerocrs.post("/confirmBooking", payload)
+        log.debug("confirm.response", booking_id=booking_id, body=result)
         return result
     except Exception as e:
         return {"error": str(e)}
@@ -506,9 +708,8 @@ def cancel_booking(booking_id: int) -> dict:
                 }
             }
         }
-        r = requests.post(f"{BASE_URL}/cancelBooking", headers=_get_headers(), json=payload)
-        result = r.json()
-        print(f"[CANCEL RESPONSE] {result}")
+        result = aerocrs.post("/cancelBooking", payload)
+        log.debug("cancel.response", booking_id=booking_id, body=result)
         success = result.get("aerocrs", {}).get("success", False)
         if success:
             return {"cancelled": True, "booking_id": booking_id, "message": "Booking cancelled successfully."}
@@ -516,13 +717,16 @@ def cancel_booking(booking_id: int) -> dict:
             detail = result.get("aerocrs", {}).get("details", "Unknown error")
             return {"cancelled": False, "booking_id": booking_id, "error": str(detail)}
     except Exception as e:
-        print(f"[CANCEL ERROR] {e}")
+        log.error("cancel.error", booking_id=booking_id, error=repr(e))
         return {"cancelled": False, "booking_id": booking_id, "error": str(e),
                 "message": "Cancellation request could not be processed. The booking may need to be cancelled manually."}
 
 
 
-ALL_TOOLS = [search_destinations, check_flight_availability, check_ancillaries, add_ancillary, confirm_booking, cancel_booking]
+# Tools whose payload is a flight_results card list
+FLIGHT_RESULT_TOOLS = ("check_flight_availability", "check_multi_route_availability")
+
+ALL_TOOLS = [search_destinations, check_flight_availability, check_multi_route_availability, search_fare_calendar, check_ancillaries, add_ancillary, confirm_booking, cancel_booking]
 
 
 # All tools available in every phase — prompts guide usage
@@ -551,87 +755,123 @@ _CANCEL_KEYWORDS = [
     "revoke", "void", "abort",
 ]
 
+# Restart phrases that only ever mean "drop the whole trip" (unlike "never
+# mind", which may just drop the last question)
+_HARD_RESTART_KEYWORDS = [
+    "start over", "start again", "restart", "reset", "begin again", "fresh start", "from scratch", "new search",
+]
+
+
+def _keyword_re(keywords: list) -> re.Pattern:
+    """Any of `keywords` as whole words, in clean_text() form ("preset" is not "reset")."""
+    phrases = sorted({clean_text(kw) for kw in keywords}, key=len, reverse=True)
+    return re.compile(r"\b(?:" + "|".join(re.escape(p) for p in phrases) + r")\b")
+
 
-def _get_latest_user_text(messages: list) -> str:
-    """Return the latest user/human message text, lowercased."""
-    for msg in reversed(messages[-10:]):
-        if isinstance(msg, HumanMessage):
-            content = getattr(msg, "content", "")
-            if isinstance(content, str):
-                return content.lower().strip()
+_RESTART_RE = _keyword_re(_RESTART_KEYWORDS)
+_HARD_RESTART_RE = _keyword_re(_HARD_RESTART_KEYWORDS)
+_CANCEL_RE = _keyword_re(_CANCEL_KEYWORDS)
+
+# Booking trigger injected by /chat after /book-flight ("... BookingID: 123. FlightID: 456. ...")
+_BOOKING_IDS_RE = re.compile(r"bookingid:?\s*(\d+).*?flightid:?\s*(\d+)", re.IGNORECASE | re.DOTALL)
+
+
+def _user_intent(text: str) -> str:
+    """Classify a user message as 'restart', 'cancel' or ''."""
+    text = clean_text(text)
+    if _RESTART_RE.search(text):
+        return "restart"
+    if _CANCEL_RE.search(text):
+        return "cancel"
     return ""
 
 
-def detect_phase(messages: list) -> str:
-    """Intent-aware phase detection.
-    
-    Checks the latest user message for restart/cancel signals FIRST,
-    then falls back to history-based detection.
-    If the most recent booking was cancelled, resets to gathering.
-    
+def derive_phase(state: dict) -> str:
+    """Intent-aware phase from the structured state fields — O(1).
+
+    A restart/cancel signal in the latest user message wins, then the booking
+    state (a cancelled booking resets to gathering), then whether flights were
+    already shown.
+
     Returns one of: 'gathering', 'searching', 'post_booking'
     """
-    latest_text = _get_latest_user_text(messages)
-    
-    # ── Intent override: user wants to start over or search again ──
-    if any(kw in latest_text for kw in _RESTART_KEYWORDS):
-        print(f"[PHASE] Restart intent detected: {latest_text[:60]!r}")
+    intent = state.get("user_intent")
+    if intent == "restart":
         return "gathering"
-    
-    # ── Intent override: user wants to cancel ──
     # Still route to post_booking so the LLM has context + cancel_booking tool
-    if any(kw in latest_text for kw in _CANCEL_KEYWORDS):
-        print(f"[PHASE] Cancel intent detected: {latest_text[:60]!r}")
-        return "post_booking"
-    
-    # ── Default: history-based detection ──
-    # Track positions of key signals to determine latest state
-    last_booking_idx = -1
-    last_cancel_idx = -1
-    has_flight_results = False
-    
-    scan = messages[-20:]
-    for i, msg in enumerate(scan):
-        content = getattr(msg, "content", "")
-        if isinstance(content, dict):
-            content = json.dumps(content)
-        if not isinstance(content, str):
-            content = str(content)
-        
-        content_lower = content.lower()
-        
-        if isinstance(msg, SystemMessage) and "bookingid" in content_lower:
-            last_booking_idx = i
-        
-        # Detect successful cancellation
-        if isinstance(msg, ToolMessage) and '"cancelled": true' in content_lower:
-            last_cancel_idx = i
-        
-        if '"type": "flight_results"' in content:
-            has_flight_results = True
-    
-    # If booking was cancelled after it was created, reset to gathering
-    if last_booking_idx >= 0 and last_cancel_idx > last_booking_idx:
-        print("[PHASE] Booking was cancelled — resetting to gathering")
-        return "gathering"
-    
-    if last_booking_idx >= 0:
+    if intent == "cancel":
         return "post_booking"
-    if has_flight_results:
+    if state.get("booking_id") is not None:
+        return "gathering" if state.get("cancelled") else "post_booking"
+    if state.get("last_search"):
         return "searching"
-    
     return "gathering"
 
 
+def _ingest_message(state: dict, msg) -> dict:
+    """State field updates implied by a new input message."""
+    updates = {"flight_results": None, "ancillary_results": None, "fare_calendar": None}
+    if isinstance(msg, HumanMessage) and isinstance(msg.content, str):
+        # The intent only steers this turn's phase…
+        updates["user_intent"] = _user_intent(msg.content)
+        if updates["user_intent"] == "restart" and _is_explicit_restart(msg.content):
+            # …an explicit restart also drops the old booking/search context,
+            # and never summarizes the abandoned trip back into the prompt
+            updates.update({
+                "booking_id": None, "flight_id": None, "last_search": None, "cancelled": False,
+                "summary": "", "summarized_upto": len(state["messages"]) - 1,
+            })
+            log.info("phase.restart", text=msg.content[:60])
+    elif isinstance(msg, SystemMessage) and isinstance(msg.content, str):
+        ids = _BOOKING_IDS_RE.search(msg.content)
+        if ids:
+            updates.update({
+                "user_intent": "",
+                "booking_id": int(ids.group(1)),
+                "flight_id": int(ids.group(2)),
+                "cancelled": False,
+            })
+    updates["phase"] = derive_phase({**state, **updates})
+    return updates
+
+
+def _ingest_tool_outputs(state: dict, outputs: list) -> dict:
+    """State field updates implied by freshly returned tool outputs.
+
+    `outputs` is [(tool name, return value)]. Payloads are published as
+    structured fields straight from the tool's return value, so readers (the
+    API, phase lookup) never parse ToolMessage JSON. flight_results arrive
+    compact (see _run_tool): every checkpoint of the thread holds the state,
+    so it keeps the small form. The API gets the full payload from
+    full_flight_results.
+    """
+    updates = {}
+    for name, data in outputs:
+        if not isinstance(data, dict):
+            continue
+        if name in FLIGHT_RESULT_TOOLS and data.get("type") == "flight_results":
+            updates["flight_results"] = data
+            updates["last_search"] = data.get("context")
+        elif name == "check_ancillaries" and data.get("type") == "ancillary_results":
+            updates["ancillary_results"] = data
+        elif name == "search_fare_calendar" and data.get("type") == "fare_calendar":
+            updates["fare_calendar"] = data
+        elif name == "cancel_booking" and data.get("cancelled"):
+            updates["cancelled"] = True
+            log.info("phase.booking_cancelled")
+    if "last_search" in updates or "cancelled" in updates:
+        updates["phase"] = derive_phase({**state, **updates})
+    return updates
+
+
 
 # ─────────────────────────────────────────────
 # SYSTEM PROMPTS — phase-specific, compressed
 # ─────────────────────────────────────────────
 
-_TODAY = datetime.today().strftime("%A, %B %d, %Y")
-
-_PROMPT_PREAMBLE = f"""You are a warm and natural flight booking assistant. Conversational, clear, friendly. No bullet lists unless necessary. Never robotic.
-Today: {_TODAY}
+# Static text only — today's date and the rolling summary go in a separate
+# suffix message (see _dynamic_context) so this prefix stays byte-identical
+_PROMPT_PREAMBLE = """You are a warm and natural flight booking assistant. Conversational, clear, friendly. No bullet lists unless necessary. Never robotic.
 CRITICAL: Be warm and brief. Ask ONE clarifying question at a time. Never make up airport codes. NEVER ask the user for an airport code. You MUST ALWAYS use the `search_destinations` tool to find the airport code yourself based on the city name the user provides."""
 
 _TRANSITION_INSTRUCTIONS = """
@@ -649,6 +889,8 @@ Your job now: collect flight details — departure city, arrival city, travel da
 - If user says "one" for passengers, ask: "Just one adult, or do you have kids or infants too?"
 - Never assume adults=1 unless they explicitly said "just me" / "solo" / "1 adult".
 - If the user gives an ambiguous date (just a number like "29", or a day without a month like "the 5th"), ask once to confirm the month before proceeding. Do not guess.
+- If `search_destinations` lists several `airports` for a city, or the user is happy with any of a few nearby airports, keep all those codes and search them together with `check_multi_route_availability` — never one pair at a time.
+- If the user is flexible on dates ("cheapest day next week", "sometime in March"), call `search_fare_calendar` ONCE for the whole range and let them pick a day from it — never check dates one by one.
 - If round trip, also ask for return date. The return date MUST be on or after the departure date — if the user gives a return date before the outbound date, politely tell them and ask for a valid return date.
 - Once you have ALL details, confirm them with the user before proceeding.""",
 
@@ -656,6 +898,8 @@ Your job now: collect flight details — departure city, arrival city, travel da
 
 You have all flight details. Call `check_flight_availability` to fetch flights.
 - If a city needs re-validation, use `search_destinations`.
+- If there are several candidate airports on either side, call `check_multi_route_availability` once with all the codes.
+- If the user wants the cheapest day in a range, call `search_fare_calendar` once, then `check_flight_availability` for the day they choose.
 - IMPORTANT: Flight results render as interactive cards in the UI — do NOT list or describe flights in text.
 - After calling the tool, say ONLY something brief like: "Here you go! Pick a flight and fare class from the cards."
 - Do NOT ask for passenger details yet — wait for a BookingID.""",
@@ -679,100 +923,560 @@ If ANY detail is missing, ask for it — do NOT guess or fill in defaults.""",
 }
 
 
+# ─────────────────────────────────────────────
+# PROMPT CACHING — stable prefix, per-phase bound models
+# ─────────────────────────────────────────────
+#
+# Provider-side prompt caches match on the longest identical prefix
+# (tools → system prompt → history). Every phase binds the same tools in
+# the same order, and each phase prompt starts with the shared preamble,
+# so only the tail of the system prompt differs between phases. Anything
+# that changes between calls comes after it.
+
+PHASE_SYSTEM_MESSAGES = {phase: SystemMessage(content=prompt) for phase, prompt in PHASE_PROMPTS.items()}
+
+# Guards the /stats counters below (prompt_cache_stats, fast_path_stats,
+# context_stats): nodes and tools update them from worker threads
+stats_lock = threading.Lock()
+
+# Prompt tokens the provider reported as served from its cache, by phase
+prompt_cache_stats = {phase: {"calls": 0, "prompt_tokens": 0, "cached_tokens": 0} for phase in PHASE_PROMPTS}
+
+
+def _meter_prompt_cache(phase: str, response) -> None:
+    """Add one call's prompt / cached-prompt token counts to prompt_cache_stats."""
+    usage = response.response_metadata.get("token_usage")
+    if usage:
+        prompt, cached = usage.get("prompt_tokens"), (usage.get("prompt_tokens_details") or {}).get("cached_tokens")
+    else:  # streamed replies carry usage_metadata instead
+        usage = response.usage_metadata or {}
+        prompt, cached = usage.get("input_tokens"), (usage.get("input_token_details") or {}).get("cache_read")
+    with stats_lock:
+        stats = prompt_cache_stats[phase]
+        stats["calls"] += 1
+        stats["prompt_tokens"] += prompt or 0
+        stats["cached_tokens"] += cached or 0
+
+
+_phase_runnables = {}  # phase → (model, model bound to ALL_TOOLS)
+
+
+def phase_runnable(phase: str):
+    """The tool-bound model for a phase — bound once, rebound only if PHASE_MODEL changes."""
+    model = PHASE_MODEL.get(phase, llm_full)
+    bound = _phase_runnables.get(phase)
+    if bound is None or bound[0] is not model:
+        bound = _phase_runnables[phase] = (model, model.bind_tools(ALL_TOOLS))
+    return bound[1]
+
+
+for _phase in PHASE_PROMPTS:
+    phase_runnable(_phase)
+
+
+def _dynamic_context(summary: str) -> SystemMessage:
+    """Small per-call suffix after the cached prefix: today's date (read on
+    every call, so long-running workers roll over at midnight) and the
+    rolling summary."""
+    content = f"Today: {datetime.today().strftime('%A, %B %d, %Y')}"
+    if summary:
+        content += f"\n\nEARLIER IN THIS CONVERSATION (summary — trust it, don't re-ask):\n{summary}"
+    return SystemMessage(content=content)
+
+
 # ─────────────────────────────────────────────
 # NODES
 # ─────────────────────────────────────────────
 
+# Words that may surround a restart phrase without adding any new request
+_RESTART_FILLER = {
+    "ok", "okay", "yes", "yeah", "no", "hey", "hi", "so", "um", "actually", "just", "please",
+    "let", "lets", "s", "i", "we", "want", "to", "can", "could", "you", "a", "the", "and", "my", "me",
+}
+
+_RESTART_REPLY = "No problem — let's start fresh! Where would you like to fly from, and where to?"
 
-def conversation_node(state: FlightState) -> FlightState:
-    """Main LLM node — detects phase, binds only relevant tools, picks model."""
+# How many turns skipped the LLM, by reason
+fast_path_stats = {"booking_trigger": 0, "restart": 0, "llm": 0}
 
-    def trim_message(m):
-        """Trim heavy ToolMessage payloads to save tokens. Never removes messages."""
-        try:
-            if isinstance(m, ToolMessage):
-                content = m.content if isinstance(m.content, str) else json.dumps(m.content)
-                if '"type": "flight_results"' in content:
-                    try:
-                        data = json.loads(content)
-                        data["data"] = [{
-                            "flight_code": f.get("flight_code"),
-                            "direction": f.get("direction"),
-                            "departure_time": f.get("departure_time"),
-                            "arrival_time": f.get("arrival_time"),
-                            "price": f.get("price"),
-                        } for f in data.get("data", [])[:4]]
-                        data["_trimmed"] = True
-                        return ToolMessage(content=json.dumps(data), tool_call_id=m.tool_call_id)
-                    except Exception:
-                        pass
-                if '"type": "ancillary_results"' in content:
-                    try:
-                        data = json.loads(content)
-                        slim = {
-                            "type": "ancillary_results",
-                            "available": data.get("available"),
-                            "available_count": data.get("available_count"),
-                            "booking_id": data.get("booking_id"),
-                            "flight_id": data.get("flight_id"),
-                            "items": [
-                                {"itemid": i.get("itemid"), "name": i.get("name"),
-                                 "price": i.get("price"), "category": i.get("category")}
-                                for i in data.get("items", [])[:6]
-                            ],
-                        }
-                        return ToolMessage(content=json.dumps(slim), tool_call_id=m.tool_call_id)
-                    except Exception:
-                        pass
-        except Exception:
-            pass
-        return m
 
+def _is_bare_restart(text: str) -> bool:
+    """True if the message is only a restart request (no new trip details to act on)."""
+    text = clean_text(text)
+    if not _RESTART_RE.search(text):
+        return False
+    return all(w in _RESTART_FILLER for w in _RESTART_RE.sub(" ", text).split())
 
 
-    all_msgs = list(state["messages"])
-    trimmed = [trim_message(m) for m in all_msgs]
+def _is_explicit_restart(text: str) -> bool:
+    """True if the message unambiguously abandons the trip: a bare restart
+    request, or one that opens with a hard restart phrase ("ok, start over
+    — Arusha to Zanzibar"). "Never mind the baggage" is neither."""
+    if _is_bare_restart(text):
+        return True
+    words = clean_text(text).split()
+    while words and words[0] in _RESTART_FILLER:
+        words.pop(0)
+    return bool(_HARD_RESTART_RE.match(" ".join(words)))
 
-    def is_complete_window(msgs):
-        """Return True if msgs has no broken tool_call groups."""
-        pending_ids = set()
-        for m in msgs:
-            if isinstance(m, AIMessage):
-                tc = getattr(m, "tool_calls", [])
-                if tc:
-                    pending_ids = {c["id"] for c in tc}
-                else:
-                    pending_ids = set()
-            elif isinstance(m, ToolMessage):
-                pending_ids.discard(m.tool_call_id)
-        return len(pending_ids) == 0
 
-    window = trimmed[-MAX_CONTEXT_MESSAGES:]
+def router_node(state: FlightState) -> FlightState:
+    """Entry node — updates the structured state fields from the new input
+    message, then answers deterministic turns without a model round-trip.
 
-    # Advance start past any incomplete leading tool group
-    for start in range(len(window)):
-        candidate = window[start:]
-        if isinstance(candidate[0], ToolMessage):
+    - booking trigger (SystemMessage with BookingID/FlightID) → call check_ancillaries directly
+    - bare restart request ("start over", "never mind") → templated reply
+    Anything else falls through to conversation_node.
+    """
+    last = state["messages"][-1]
+    updates = _ingest_message(state, last)
+
+    if isinstance(last, SystemMessage) and updates.get("booking_id") is not None:
+        with stats_lock:
+            fast_path_stats["booking_trigger"] += 1
+        call = {
+            "name": "check_ancillaries",
+            "args": {"booking_id": updates["booking_id"], "flight_id": updates["flight_id"]},
+            "id": f"call_{uuid.uuid4().hex[:24]}",
+        }
+        log.info("router.booking_trigger", **call["args"])
+        return {**updates, "messages": [AIMessage(content="", tool_calls=[call])]}
+
+    if isinstance(last, HumanMessage) and isinstance(last.content, str) and _is_bare_restart(last.content):
+        with stats_lock:
+            fast_path_stats["restart"] += 1
+        log.info("router.restart")
+        return {**updates, "messages": [AIMessage(content=_RESTART_REPLY)]}
+
+    with stats_lock:
+        fast_path_stats["llm"] += 1
+    return {**updates, "messages": []}
+
+
+_TOOLS_BY_NAME = {t.name: t for t in ALL_TOOLS}
+
+# Tools that only read. Consecutive calls to them run concurrently, and
+# identical ones run once. Every other call (add_ancillary, confirm_booking,
+# cancel_booking) changes a booking, so it runs alone and in call order.
+READ_ONLY_TOOLS = frozenset({
+    "search_destinations", "check_flight_availability", "check_multi_route_availability",
+    "search_fare_calendar", "check_ancillaries",
+})
+
+_tool_pool = ThreadPoolExecutor(max_workers=TOOL_MAX_WORKERS, thread_name_prefix="tool")
+
+
+def _tool_content(output) -> str:
+    """ToolMessage content for a tool's return value. flight_results are kept
+    in the compact form: the message lives in the checkpointed history for
+    the rest of the thread, and the raw fare classes are fetched on demand."""
+    if isinstance(output, str):
+        return output
+    if isinstance(output, dict) and output.get("type") == "flight_results":
+        output = compact_flight_results(output)
+    try:
+        return serialization.dumps(output)
+    except Exception:
+        return str(output)
+
+
+def _run_tool(call: dict, config: RunnableConfig) -> tuple:
+    """Run one tool call → (ToolMessage content, return value, seconds, full payload).
+    Errors go back to the model as text (with a None return value). A
+    flight_results return value is compacted here, once; the full payload
+    it came from is returned alongside (None for every other tool)."""
+    tool_ = _TOOLS_BY_NAME.get(call["name"])
+    output = full = None
+    with span(f"tool.{call['name']}", tool_call_id=call["id"]) as s:
+        if tool_ is None:
+            content = f"Error: {call['name']} is not a valid tool, try one of [{', '.join(_TOOLS_BY_NAME)}]."
+        else:
+            try:
+                output = tool_.invoke(call["args"], config)
+                if isinstance(output, dict) and output.get("type") == "flight_results":
+                    # The ToolMessage and the state field both keep the compact form
+                    full, output = output, compact_flight_results(output)
+                content = _tool_content(output)
+            except Exception as e:
+                content = f"Error: {e!r}\n Please fix your mistakes."
+        s.set(ok=not content.startswith("Error: "), bytes=len(content))
+    return content, output, s.duration, full
+
+
+def _run_read_only(calls: list, config: RunnableConfig) -> list:
+    """Run read-only calls → their _run_tool results in call order.
+    Identical calls (same tool, same args) run once and share the result;
+    distinct ones run concurrently on the bounded tool pool."""
+    keys = [(call["name"], serialization.dumps(call["args"], sort_keys=True, default=str)) for call in calls]
+    unique = {}
+    for key, call in zip(keys, calls):
+        unique.setdefault(key, call)
+
+    if len(unique) <= 1:
+        results = {key: _run_tool(call, config) for key, call in unique.items()}
+    else:
+        # copy_context keeps the worker's tool spans inside this request's trace
+        futures = {
+            key: _tool_pool.submit(contextvars.copy_context().run, _run_tool, call, config)
+            for key, call in unique.items()
+        }
+        results = {key: f.result() for key, f in futures.items()}
+    return [results[key] for key in keys]
+
+
+def _execute_tool_calls(tool_calls: list, config: RunnableConfig) -> list:
+    """Run the tool calls of one AIMessage → [(ToolMessage, return value, full payload)] in call order.
+
+    Runs of consecutive READ_ONLY_TOOLS calls go through _run_read_only.
+    Any other call waits for the calls before it, and runs on its own
+    (never deduplicated: two identical add_ancillary calls add two extras).
+    """
+    start = time.perf_counter()
+    results, batch = [], []
+    for call in tool_calls:
+        if call["name"] in READ_ONLY_TOOLS:
+            batch.append(call)
             continue
-        if isinstance(candidate[0], AIMessage) and getattr(candidate[0], "tool_calls", []):
+        results += _run_read_only(batch, config)
+        batch = []
+        results.append(_run_tool(call, config))
+    results += _run_read_only(batch, config)
+
+    log.info(
+        "tools.executed", calls=len(tool_calls),
+        total_ms=round((time.perf_counter() - start) * 1000),
+        timings_ms=[[call["name"], round(seconds * 1000)] for call, (_, _, seconds, _) in zip(tool_calls, results)],
+    )
+    return [
+        (ToolMessage(content=content, name=call["name"], tool_call_id=call["id"]), output, full)
+        for call, (content, output, _, full) in zip(tool_calls, results)
+    ]
+
+
+# Full flight_results of each thread's latest search, kept in-process for the
+# API response only — thread state keeps the compact form. /chat takes the
+# entry once it has replied; the cap only matters for abandoned turns.
+FULL_RESULTS_MAX_ENTRIES = int(os.getenv("FULL_RESULTS_MAX_ENTRIES", "1024"))
+_full_results: OrderedDict = OrderedDict()  # thread_id → (compact payload, full payload)
+_full_results_lock = threading.Lock()
+
+
+def _keep_full_results(thread_id: str, compact: dict, full: dict) -> None:
+    with _full_results_lock:
+        _full_results[thread_id] = (compact, full)
+        _full_results.move_to_end(thread_id)
+        while len(_full_results) > FULL_RESULTS_MAX_ENTRIES:
+            _full_results.popitem(last=False)
+
+
+def full_flight_results(thread_id: str, compact: Optional[dict], take: bool = False) -> Optional[dict]:
+    """The full payload the tools built for `compact` (a thread's
+    flight_results state), or None if it is no longer held. `take` drops it."""
+    if not is_compact(compact):
+        return compact
+    with _full_results_lock:
+        entry = _full_results.get(thread_id)
+        if entry is None or not (entry[0] is compact or entry[0] == compact):
+            return None
+        if take:
+            del _full_results[thread_id]
+    return entry[1]
+
+
+def tools_node(state: FlightState, config: RunnableConfig) -> FlightState:
+    """Run the requested tools, then fold their results into the state fields."""
+    with span("node.tools"):
+        results = _execute_tool_calls(state["messages"][-1].tool_calls, config)
+    updates = _ingest_tool_outputs(state, [(m.name, output) for m, output, _ in results])
+    compact = updates.get("flight_results")
+    if compact is not None:
+        full = next(full for _, output, full in results if output is compact)
+        _keep_full_results(config["configurable"].get("thread_id"), compact, full)
+    return {"messages": [m for m, _, _ in results], **updates}
+
+
+def route_after_router(state: FlightState) -> str:
+    last = state["messages"][-1]
+    if isinstance(last, AIMessage):
+        return "tools" if last.tool_calls else END
+    return "conversation"
+
+
+# Trimmed ToolMessages, keyed by message id / tool_call_id — a payload is
+# slimmed once, not on every LLM turn that still has it in the window
+TRIM_CACHE_MAX_ENTRIES = 4096
+_trim_cache: OrderedDict = OrderedDict()
+_trim_lock = threading.Lock()
+trim_stats = {"hits": 0, "misses": 0}
+
+
+def _slim_tool_message(m: ToolMessage) -> ToolMessage:
+    """Trim a heavy flight / ancillary / fare-calendar payload to save tokens."""
+    content = m.content if isinstance(m.content, str) else serialization.dumps(m.content)
+    if m.name not in (*FLIGHT_RESULT_TOOLS, "check_ancillaries", "search_fare_calendar") or not content.startswith("{"):
+        return m
+    try:
+        data = serialization.loads(content)
+    except Exception:
+        return m
+    if data.get("type") == "flight_results":
+        if data.get("format") == COMPACT_FORMAT:
+            flights = flight_rows(data, limit=4)
+            data = {k: v for k, v in data.items() if k not in ("format", "count", "strings", "flights", "fares")}
+        else:  # stored before the compact form existed
+            flights = data.get("data", [])[:4]
+        multi_route = "routes" in data  # cards span several routes; keep each one's
+        data["data"] = [{
+            "flight_code": f.get("flight_code"),
+            "direction": f.get("direction"),
+            **({"route": f"{f.get('origin_code')}-{f.get('destination_code')}"} if multi_route else {}),
+            "departure_time": f.get("departure_time"),
+            "arrival_time": f.get("arrival_time"),
+            "price": f.get("price"),
+        } for f in flights]
+        data["_trimmed"] = True
+    elif data.get("type") == "ancillary_results":
+        data = {
+            "type": "ancillary_results",
+            "available": data.get("available"),
+            "available_count": data.get("available_count"),
+            "booking_id": data.get("booking_id"),
+            "flight_id": data.get("flight_id"),
+            "items": [
+                {"itemid": i.get("itemid"), "name": i.get("name"),
+                 "price": i.get("price"), "category": i.get("category")}
+                for i in data.get("items", [])[:6]
+            ],
+        }
+    elif data.get("type") == "fare_calendar":
+        # The model only needs the price per day to talk about the range
+        data = {
+            "type": "fare_calendar",
+            "header": data.get("header"),
+            "cheapest": data.get("cheapest"),
+            "days": [[d.get("date"), d.get("price")] for d in data.get("days", [])],
+            "_trimmed": True,
+        }
+    else:
+        return m
+    return ToolMessage(content=serialization.dumps(data), tool_call_id=m.tool_call_id, name=m.name, id=m.id)
+
+
+def trim_message(m):
+    """Trimmed form of a message (memoized for ToolMessages). Never removes messages."""
+    if not isinstance(m, ToolMessage):
+        return m
+    key = m.id or m.tool_call_id
+    with _trim_lock:
+        cached = _trim_cache.get(key)
+        if cached is not None:
+            _trim_cache.move_to_end(key)
+            trim_stats["hits"] += 1
+            return cached
+    slim = _slim_tool_message(m)
+    with _trim_lock:
+        trim_stats["misses"] += 1
+        _trim_cache[key] = slim
+        while len(_trim_cache) > TRIM_CACHE_MAX_ENTRIES:
+            _trim_cache.popitem(last=False)
+    return slim
+
+
+_encoding = None
+_encoding_lock = threading.Lock()
+
+
+def _token_encoding():
+    """tiktoken encoding for the chat models, or False if it can't be loaded
+    (tiktoken downloads the BPE table on first use)."""
+    global _encoding
+    if _encoding is None:
+        with _encoding_lock:  # one load attempt, not one per concurrent turn
+            if _encoding is None:
+                try:
+                    import tiktoken
+                    _encoding = tiktoken.get_encoding("o200k_base")
+                except Exception as e:
+                    log.warning("context.tiktoken_unavailable", error=repr(e))
+                    _encoding = False
+    return _encoding
+
+
+def count_tokens(m) -> int:
+    """Approximate prompt tokens for one message (content + tool calls + framing)."""
+    text = m.content if isinstance(m.content, str) else serialization.dumps(m.content)
+    if isinstance(m, AIMessage) and m.tool_calls:
+        text += serialization.dumps([{"name": c["name"], "args": c["args"]} for c in m.tool_calls])
+    enc = _token_encoding()
+    n = len(enc.encode(text)) if enc else len(text) // 4 + 1
+    return n + _TOKENS_PER_MESSAGE
+
+
+def _window_start(window: list) -> Optional[int]:
+    """Earliest start that leaves no orphan ToolMessage or dangling tool_call.
+
+    A single forward pass finds the last AIMessage that requested tools and
+    whether every one of its calls got a result inside the window. Starting
+    at or before that message is only valid if the group is complete; the
+    start itself may not be a ToolMessage or a tool-calling AIMessage.
+    """
+    last_call_pos, pending = -1, set()
+    for pos, m in enumerate(window):
+        if isinstance(m, AIMessage):
+            pending = {c["id"] for c in m.tool_calls} if m.tool_calls else set()
+            if pending:
+                last_call_pos = pos
+        elif isinstance(m, ToolMessage):
+            pending.discard(m.tool_call_id)
+    earliest = last_call_pos + 1 if pending else 0
+
+    for pos in range(earliest, len(window)):
+        m = window[pos]
+        if isinstance(m, ToolMessage) or (isinstance(m, AIMessage) and m.tool_calls):
             continue
-        if is_complete_window(candidate):
-            window = candidate
+        return pos
+    return None
+
+
+def build_context_window(messages) -> list:
+    """Pick the tail of the history sent to the model, then trim only that.
+
+    The tail is capped at MAX_CONTEXT_MESSAGES and MAX_CONTEXT_TOKENS
+    (counted on the trimmed form); the newest message is always kept.
+    """
+    all_msgs = list(messages)
+    window, budget = [], MAX_CONTEXT_TOKENS
+    for m in reversed(all_msgs[-MAX_CONTEXT_MESSAGES:]):
+        slim = trim_message(m)
+        budget -= count_tokens(slim)
+        if budget < 0 and window:
             break
-    else:
-        window = trimmed[-6:]
+        window.append(slim)
+    window.reverse()
+
+    start = _window_start(window)
+    if start is None:
+        return [trim_message(m) for m in all_msgs[-6:]]
+    return window[start:]
+
+
+# Tags the summarizer's LLM run, so streaming clients can tell it from the reply
+SUMMARY_TAG = "summary"
+
+_SUMMARY_PROMPT = """You maintain the running summary of a flight-booking chat between a user and TravelLink's assistant.
+Merge the new messages into the current summary. Keep every concrete detail the assistant may need later: cities and airport codes, travel dates, trip type, passenger counts, flights or fare classes shown or chosen, BookingID / FlightID, extras added, and stated preferences. Drop greetings and chit-chat.
+Reply with the updated summary only, as short bullet points, under 120 words."""
+
+# Per-process prompt-size accounting (see /stats)
+context_stats = {
+    "turns": 0,
+    "window_tokens": 0,           # sent as conversation messages
+    "summary_tokens": 0,          # sent as the summary block
+    "summarized_messages": 0,
+    "summarized_tokens": 0,       # what those messages would have cost in the window
+    "summary_calls": 0,
+    "summary_errors": 0,
+    "summarizer_input_tokens": 0,
+    "summarizer_output_tokens": 0,
+}
+
 
-    # ── Phase-aware model selection — ALL tools in every phase ──
-    phase = detect_phase(all_msgs)
-    phase_model = PHASE_MODEL.get(phase, llm_full)
-    phase_prompt = PHASE_PROMPTS.get(phase, PHASE_PROMPTS["gathering"])
+def _transcript(msgs) -> str:
+    lines = []
+    for m in map(trim_message, msgs):
+        text = m.content if isinstance(m.content, str) else serialization.dumps(m.content)
+        if isinstance(m, HumanMessage):
+            lines.append(f"User: {text}")
+        elif isinstance(m, ToolMessage):
+            lines.append(f"Tool {m.name}: {text[:600]}")
+        elif isinstance(m, AIMessage):
+            calls = ", ".join(f"{c['name']}({serialization.dumps(c['args'])})" for c in m.tool_calls)
+            lines.append(f"Assistant: {text}" + (f" [calls: {calls}]" if calls else ""))
+        else:
+            lines.append(f"System: {text}")
+    return "\n".join(lines)
+
+
+def _invoke_llm(runnable, model, messages: list, config: Optional[RunnableConfig] = None, **attrs):
+    """Invoke a chat model inside an llm.<model> span, recording token usage."""
+    with span(f"llm.{model.model_name}", model=model.model_name, **attrs) as s:
+        response = runnable.invoke(messages, config)
+        usage = getattr(response, "usage_metadata", None) or {}
+        s.set(prompt_tokens=usage.get("input_tokens"), completion_tokens=usage.get("output_tokens"))
+    replay.record("llm", model=model.model_name, content=response.content, tool_calls=response.tool_calls)
+    if usage:
+        metrics.inc("travellink_llm_tokens_total", usage.get("input_tokens", 0), model=model.model_name, kind="prompt")
+        metrics.inc("travellink_llm_tokens_total", usage.get("output_tokens", 0), model=model.model_name, kind="completion")
+    return response
+
+
+def _fold_summary(state: FlightState, dropped: int) -> tuple:
+    """Fold messages that fell out of the window into the rolling summary.
+
+    `dropped` is how many leading messages the window left out. Returns the
+    state updates and the not-yet-summarized messages that must stay in
+    front of the window (fewer than SUMMARY_BATCH_MESSAGES). If summarizing
+    fails, nothing is carried: the plain window keeps the prompt within its
+    budget, and the same messages are retried on the next turn.
+    """
+    upto = state.get("summarized_upto") or 0
+    summary = state.get("summary") or ""
+    if dropped <= upto:
+        return {}, []
+    pending = [trim_message(m) for m in state["messages"][upto:dropped]]
+    if len(pending) < SUMMARY_BATCH_MESSAGES:
+        return {}, pending
 
-    llm_with_tools = phase_model.bind_tools(ALL_TOOLS)
+    try:
+        result = _invoke_llm(llm_mini, llm_mini, [
+            SystemMessage(content=_SUMMARY_PROMPT),
+            HumanMessage(content=f"Current summary:\n{summary or '(none)'}\n\nNew messages:\n{_transcript(pending)}"),
+        ], config={"tags": [SUMMARY_TAG]}, purpose="summary")
+    except Exception as e:
+        with stats_lock:
+            context_stats["summary_errors"] += 1
+        log.error("context.summary_failed", pending=len(pending), error=repr(e))
+        return {}, []
+
+    usage = getattr(result, "usage_metadata", None) or {}
+    summarized_tokens = sum(count_tokens(m) for m in pending)
+    with stats_lock:
+        context_stats["summary_calls"] += 1
+        context_stats["summarized_messages"] += len(pending)
+        context_stats["summarized_tokens"] += summarized_tokens
+        context_stats["summarizer_input_tokens"] += usage.get("input_tokens", 0)
+        context_stats["summarizer_output_tokens"] += usage.get("output_tokens", 0)
+    log.info("context.summarized", first=upto, last=dropped - 1, model=llm_mini.model_name)
+    return {"summary": str(result.content).strip(), "summarized_upto": dropped}, []
 
-    print(f"[PHASE] {phase} | tools={[t.name for t in ALL_TOOLS]} | model={phase_model.model_name}")
 
-    response = llm_with_tools.invoke([SystemMessage(content=phase_prompt)] + window)
-    return {"messages": [response]}
+def conversation_node(state: FlightState) -> FlightState:
+    """Main LLM node — detects phase, binds only relevant tools, picks model."""
+    with span("node.conversation", phase=state.get("phase"), messages=len(state["messages"])):
+        window = build_context_window(state["messages"])
+        updates, carried = _fold_summary(state, len(state["messages"]) - len(window))
+        window = carried + window
+        summary = updates.get("summary", state.get("summary") or "")
+
+        # ── Phase-aware model selection — ALL tools in every phase ──
+        phase = state.get("phase") or "gathering"
+        if phase not in PHASE_SYSTEM_MESSAGES:
+            phase = "gathering"
+        phase_model = PHASE_MODEL.get(phase, llm_full)
+
+        window_tokens = sum(count_tokens(m) for m in window)
+        summary_tokens = count_tokens(SystemMessage(content=summary)) if summary else 0
+        with stats_lock:
+            context_stats["turns"] += 1
+            context_stats["window_tokens"] += window_tokens
+            context_stats["summary_tokens"] += summary_tokens
+        log.info("conversation.turn", phase=phase, model=phase_model.model_name, window_messages=len(window),
+                 window_tokens=window_tokens, summary_tokens=summary_tokens)
+
+        prompt = [PHASE_SYSTEM_MESSAGES[phase], _dynamic_context(summary)] + window
+        response = _invoke_llm(phase_runnable(phase), phase_model, prompt, phase=phase)
+        _meter_prompt_cache(phase, response)
+        return {**updates, "messages": [response]}
 
 
 # ─────────────────────────────────────────────
@@ -782,10 +1486,18 @@ def conversation_node(state: FlightState) -> FlightState:
 def create_graph():
     workflow = StateGraph(FlightState)
 
+    workflow.add_node("router", router_node)
     workflow.add_node("conversation", conversation_node)
-    workflow.add_node("tools", ToolNode(ALL_TOOLS))  # ToolNode keeps ALL tools to execute any call
+    workflow.add_node("tools", tools_node)
+
+    workflow.set_entry_point("router")
 
-    workflow.set_entry_point("conversation")
+    # Router: deterministic turns skip the LLM (tool call or templated reply)
+    workflow.add_conditional_edges(
+        "router",
+        route_after_router,
+        {"tools": "tools", "conversation": "conversation", END: END}
+    )
 
     # After conversation: if tool called → go to tools, else END
     workflow.add_conditional_edges(
@@ -797,8 +1509,7 @@ def create_graph():
     # After tools: always return to conversation for follow-up
     workflow.add_edge("tools", "conversation")
 
-    memory = MemorySaver()
-    return workflow.compile(checkpointer=memory)
+    return workflow.compile(checkpointer=make_checkpointer())
 
 
 # ─────────────────────────────────────────────
@@ -827,19 +1538,23 @@ def main():
         last = result["messages"][-1]
         content = last.content if hasattr(last, "content") else str(last)
 
-        # Pretty-print flight results JSON if present
-        if isinstance(content, str) and '"type": "flight_results"' in content:
-            try:
-                data = json.loads(content)
-                print(f"\nAssistant: {data.get('header', '')} | {data.get('sub_header', '')}")
-                for f in data.get("data", []):
-                    print(f"  [{f['direction']}] Flight {f['flight_code']} | "
-                          f"{f['departure_time']} → {f['arrival_time']} | "
-                          f"From ${f['price']} | {f['seats_available']} seats left")
-                print()
-                continue
-            except Exception:
-                pass
+        # Pretty-print flight results if this turn produced any
+        data = result.get("flight_results")
+        if data:
+            print(f"\nAssistant: {data.get('header', '')} | {data.get('sub_header', '')}")
+            for f in flight_rows(data):
+                print(f"  [{f['direction']}] Flight {f['flight_code']} | "
+                      f"{f['departure_time']} → {f['arrival_time']} | "
+                      f"From ${f['price']} | {f['seats_available']} seats left")
+            print()
+
+        calendar = result.get("fare_calendar")
+        if calendar:
+            print(f"\nAssistant: {calendar.get('header', '')} | {calendar.get('sub_header', '')}")
+            for d in calendar.get("days", []):
+                price = f"From ${d['price']} ({d['flight_code']} {d['departure_time']})" if d["price"] else "No flights"
+                print(f"  {d['date']} | {price}")
+            print()
 
         if content:
             print(f"Assistant: {content}\n")
@@ -0,0 +1,114 @@
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Callable, Hashable, Optional
+
+
+# ─────────────────────────────────────────────
+# TTL CACHE — with single-flight loads
+# ─────────────────────────────────────────────
+
+class _Flight:
+    """One in-progress load that concurrent callers wait on."""
+
+    def __init__(self):
+        self.done = threading.Event()
+        self.value = None
+        self.error = None
+        self.seconds = 0.0
+
+
+class TTLCache:
+    """Small thread-safe TTL cache for upstream API responses.
+
+    Concurrent misses for the same key share a single load (single-flight):
+    one caller runs the loader, the rest wait for its result. Failed loads
+    are never cached. `ttl_for(value)`, if given, picks the TTL per loaded
+    value (e.g. shorter for empty results; 0 keeps it out of the cache).
+    `saved_seconds` adds up the upstream latency each hit or coalesced wait
+    avoided.
+    """
+
+    def __init__(self, ttl_seconds: float, max_entries: int = 1024,
+                 ttl_for: Optional[Callable[[Any], float]] = None):
+        self.ttl_seconds = ttl_seconds
+        self.max_entries = max_entries
+        self.ttl_for = ttl_for
+        self._entries: OrderedDict = OrderedDict()  # key → (expires_at, value, load_seconds)
+        self._inflight: dict = {}
+        self._lock = threading.Lock()
+        self._stats = {
+            "hits": 0,
+            "misses": 0,
+            "coalesced": 0,
+            "invalidated": 0,
+            "load_errors": 0,
+            "saved_seconds": 0.0,
+        }
+
+    def get_or_load(self, key: Hashable, loader: Callable[[], Any]) -> Any:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry and entry[0] > time.monotonic():
+                self._entries.move_to_end(key)
+                self._stats["hits"] += 1
+                self._stats["saved_seconds"] += entry[2]
+                return entry[1]
+            flight = self._inflight.get(key)
+            leader = flight is None
+            if leader:
+                flight = self._inflight[key] = _Flight()
+                self._stats["misses"] += 1
+            else:
+                self._stats["coalesced"] += 1
+
+        if not leader:
+            flight.done.wait()
+            if flight.error is not None:
+                raise flight.error
+            with self._lock:
+                self._stats["saved_seconds"] += flight.seconds
+            return flight.value
+
+        start = time.monotonic()
+        try:
+            flight.value = loader()
+        except Exception as e:
+            flight.error = e
+            with self._lock:
+                self._stats["load_errors"] += 1
+            raise
+        else:
+            flight.seconds = time.monotonic() - start
+            ttl = self.ttl_seconds if self.ttl_for is None else self.ttl_for(flight.value)
+            if ttl > 0:
+                with self._lock:
+                    self._entries[key] = (time.monotonic() + ttl, flight.value, flight.seconds)
+                    self._entries.move_to_end(key)
+                    while len(self._entries) > self.max_entries:
+                        self._entries.popitem(last=False)
+            return flight.value
+        finally:
+            with self._lock:
+                self._inflight.pop(key, None)
+            flight.done.set()
+
+    def invalidate(self, predicate: Callable[[Hashable], bool]) -> int:
+        """Drop every entry whose key matches `predicate`. Returns how many."""
+        with self._lock:
+            stale = [k for k in self._entries if predicate(k)]
+            for k in stale:
+                del self._entries[k]
+            self._stats["invalidated"] += len(stale)
+        return len(stale)
+
+    def stats(self) -> dict:
+        with self._lock:
+            stats = dict(self._stats)
+            size = len(self._entries)
+        lookups = stats["hits"] + stats["misses"] + stats["coalesced"]
+        stats["saved_seconds"] = round(stats["saved_seconds"], 3)
+        stats["hit_rate"] = round((stats["hits"] + stats["coalesced"]) / lookups, 3) if lookups else 0.0
+        stats["size"] = size
+        stats["ttl_seconds"] = self.ttl_seconds
+        return stats
@@ -0,0 +1,126 @@
+import os
+import threading
+import time
+from typing import Callable, Optional
+
+from airport_index import AirportIndex
+from logs import get_logger
+
+log = get_logger("catalog")
+
+
+# How long a downloaded destination list is considered fresh
+DESTINATIONS_TTL_SECONDS = float(os.getenv("DESTINATIONS_TTL_SECONDS", "3600"))
+
+
+# ─────────────────────────────────────────────
+# DESTINATION CATALOG — one copy per process
+# ─────────────────────────────────────────────
+
+class DestinationCatalog:
+    """In-memory copy of the AeroCRS destination list.
+
+    The first lookup loads the list (callers wait on that single load). After
+    that every lookup is served from memory. Once the TTL expires the stale list
+    is still returned while one background thread refreshes it. The
+    AirportIndex is rebuilt alongside each refresh, off the request path.
+    """
+
+    def __init__(self, loader: Callable[[], list], ttl_seconds: float = DESTINATIONS_TTL_SECONDS):
+        self._loader = loader
+        self.ttl_seconds = ttl_seconds
+        self._destinations: Optional[list] = None
+        self._index: Optional[AirportIndex] = None
+        self._loaded_at = 0.0
+        self._load_lock = threading.Lock()
+        self._state_lock = threading.Lock()
+        self._refreshing = False
+        self._stats = {
+            "hits": 0,
+            "stale_hits": 0,
+            "misses": 0,
+            "refreshes": 0,
+            "refresh_errors": 0,
+        }
+
+    def _count(self, key: str) -> None:
+        with self._state_lock:
+            self._stats[key] += 1
+
+    def get(self) -> list:
+        """Return the destination list, loading it on first use."""
+        destinations = self._destinations
+        if destinations is None:
+            return self._load_blocking()
+
+        if time.monotonic() - self._loaded_at >= self.ttl_seconds:
+            self._count("stale_hits")
+            self._refresh_in_background()
+        else:
+            self._count("hits")
+        return destinations
+
+    def peek(self) -> Optional[list]:
+        """The current list if one is loaded — never loads or counts a lookup."""
+        return self._destinations
+
+    def index(self) -> AirportIndex:
+        """Return the lookup index for the current destination list."""
+        self.get()
+        return self._index
+
+    def _load_blocking(self) -> list:
+        with self._load_lock:
+            # Another caller may have finished the load while we waited
+            if self._destinations is not None:
+                self._count("hits")
+                return self._destinations
+            self._count("misses")
+            self._store(self._loader())
+            return self._destinations
+
+    def _store(self, destinations: list) -> None:
+        self._index = AirportIndex(destinations)
+        self._destinations = destinations
+        self._loaded_at = time.monotonic()
+        self._count("refreshes")
+
+    def _refresh_in_background(self) -> None:
+        with self._state_lock:
+            if self._refreshing:
+                return
+            self._refreshing = True
+        threading.Thread(target=self._refresh_worker, name="destination-refresh", daemon=True).start()
+
+    def _refresh_worker(self) -> None:
+        try:
+            self.refresh()
+        except Exception as e:
+            # Keep serving the stale copy; the next stale hit retries
+            self._count("refresh_errors")
+            log.warning("catalog.refresh_failed", error=repr(e), serving_stale=self._destinations is not None)
+        finally:
+            with self._state_lock:
+                self._refreshing = False
+
+    def refresh(self) -> None:
+        """Reload the destination list now (blocking)."""
+        with self._load_lock:
+            self._store(self._loader())
+
+    def warm(self) -> None:
+        """Start loading the list in the background (e.g. at app startup)."""
+        if self._destinations is None:
+            self._refresh_in_background()
+
+    def stats(self) -> dict:
+        with self._state_lock:
+            stats = dict(self._stats)
+        loaded = self._destinations is not None
+        stats.update({
+            "loaded": loaded,
+            "size": len(self._destinations) if loaded else 0,
+            "age_seconds": round(time.monotonic() - self._loaded_at, 1) if loaded else None,
+            "ttl_seconds": self.ttl_seconds,
+        })
+        return stats
@@ -0,0 +1,504 @@
+import asyncio
+import os
+import sqlite3
+import threading
+import time
+import zlib
+from collections import OrderedDict
+from typing import Any, AsyncIterator, Iterator, Optional, Sequence, Tuple
+
+from langchain_core.runnables import RunnableConfig
+from langgraph.checkpoint.base import (
+    WRITES_IDX_MAP,
+    BaseCheckpointSaver,
+    ChannelVersions,
+    Checkpoint,
+    CheckpointMetadata,
+    CheckpointTuple,
+    get_checkpoint_id,
+)
+from langgraph.checkpoint.memory import MemorySaver
+from langgraph.checkpoint.serde.types import TASKS
+
+
+# "memory" (per-process) or "sqlite" (shared by every worker on the host)
+CHECKPOINTER = os.getenv("CHECKPOINTER", "memory")
+CHECKPOINT_DB_PATH = os.getenv("CHECKPOINT_DB_PATH", "checkpoints.sqlite")
+
+# Bounds for the conversation store
+CHECKPOINT_MAX_THREADS = int(os.getenv("CHECKPOINT_MAX_THREADS", "1000"))
+CHECKPOINT_MAX_PER_THREAD = int(os.getenv("CHECKPOINT_MAX_PER_THREAD", "3"))
+CHECKPOINT_IDLE_TTL_SECONDS = float(os.getenv("CHECKPOINT_IDLE_TTL_SECONDS", str(6 * 3600)))
+
+# Serialized blobs above this size are zlib-compressed before hitting disk
+CHECKPOINT_COMPRESS_MIN_BYTES = int(os.getenv("CHECKPOINT_COMPRESS_MIN_BYTES", "512"))
+
+
+# ─────────────────────────────────────────────
+# CHECKPOINTERS
+# ─────────────────────────────────────────────
+
+class ThreadMemorySaver(MemorySaver):
+    """MemorySaver that can forget a single conversation thread."""
+
+    def delete_thread(self, thread_id: str) -> int:
+        """Drop every checkpoint and pending write for `thread_id`.
+
+        Touches only that thread's entries. Returns the number of checkpoints removed.
+        """
+        namespaces = self.storage.pop(thread_id, None)
+        if not namespaces:
+            return 0
+        removed = 0
+        for checkpoint_ns, checkpoints in namespaces.items():
+            for checkpoint_id in checkpoints:
+                self.writes.pop((thread_id, checkpoint_ns, checkpoint_id), None)
+            removed += len(checkpoints)
+        return removed
+
+
+class BoundedMemorySaver(ThreadMemorySaver):
+    """ThreadMemorySaver with a hard cap on what it keeps in RAM.
+
+    - at most `max_threads` live threads; the least recently used is evicted
+    - threads idle for longer than `idle_ttl_seconds` are evicted
+    - only the latest `max_checkpoints_per_thread` checkpoints are kept per
+      thread (older ones and their pending writes are pruned on every put)
+    """
+
+    def __init__(
+        self,
+        max_threads: int = CHECKPOINT_MAX_THREADS,
+        max_checkpoints_per_thread: int = CHECKPOINT_MAX_PER_THREAD,
+        idle_ttl_seconds: float = CHECKPOINT_IDLE_TTL_SECONDS,
+        **kwargs,
+    ):
+        super().__init__(**kwargs)
+        self.max_threads = max_threads
+        # The latest checkpoint reads its parent's writes, so keep at least two
+        self.max_checkpoints_per_thread = max(2, max_checkpoints_per_thread)
+        self.idle_ttl_seconds = idle_ttl_seconds
+        self._last_used: OrderedDict = OrderedDict()  # thread_id → monotonic time, LRU first
+        self._lock = threading.RLock()
+        self._stats = {
+            "evicted_lru": 0,
+            "evicted_idle": 0,
+            "pruned_checkpoints": 0,
+        }
+
+    def _touch(self, thread_id: str) -> None:
+        self._last_used[thread_id] = time.monotonic()
+        self._last_used.move_to_end(thread_id)
+
+    def _evict(self) -> None:
+        now = time.monotonic()
+        while self._last_used:
+            thread_id, last_used = next(iter(self._last_used.items()))
+            if now - last_used > self.idle_ttl_seconds:
+                reason = "evicted_idle"
+            elif len(self._last_used) > self.max_threads:
+                reason = "evicted_lru"
+            else:
+                break
+            self.delete_thread(thread_id)
+            self._stats[reason] += 1
+
+    def _prune(self, thread_id: str, checkpoint_ns: str) -> None:
+        checkpoints = self.storage[thread_id][checkpoint_ns]
+        excess = len(checkpoints) - self.max_checkpoints_per_thread
+        if excess <= 0:
+            return
+        # Checkpoint IDs are time-ordered, so the smallest are the oldest
+        for checkpoint_id in sorted(checkpoints)[:excess]:
+            del checkpoints[checkpoint_id]
+            self.writes.pop((thread_id, checkpoint_ns, checkpoint_id), None)
+        self._stats["pruned_checkpoints"] += excess
+
+    def delete_thread(self, thread_id: str) -> int:
+        with self._lock:
+            self._last_used.pop(thread_id, None)
+            return super().delete_thread(thread_id)
+
+    def get_tuple(self, config: RunnableConfig) -> Optional[CheckpointTuple]:
+        thread_id = config["configurable"]["thread_id"]
+        with self._lock:
+            # Don't let lookups of unknown threads create empty entries
+            if thread_id not in self.storage:
+                return None
+            self._touch(thread_id)
+            return super().get_tuple(config)
+
+    def list(self, config: Optional[RunnableConfig], **kwargs) -> Iterator[CheckpointTuple]:
+        # Collected under the lock (eviction and pruning mutate the same
+        # dicts), then yielded, so a slow consumer never holds the lock
+        with self._lock:
+            if config and config["configurable"]["thread_id"] not in self.storage:
+                return
+            saved = list(super().list(config, **kwargs))
+        yield from saved
+
+    def put(self, config, checkpoint, metadata, new_versions) -> RunnableConfig:
+        thread_id = config["configurable"]["thread_id"]
+        with self._lock:
+            saved = super().put(config, checkpoint, metadata, new_versions)
+            self._touch(thread_id)
+            self._prune(thread_id, config["configurable"]["checkpoint_ns"])
+            self._evict()
+            return saved
+
+    def put_writes(self, config, writes, task_id) -> None:
+        with self._lock:
+            super().put_writes(config, writes, task_id)
+
+    def stats(self) -> dict:
+        """Live size, approximate serialized footprint and eviction counters."""
+        with self._lock:
+            checkpoints = 0
+            size = 0
+            for namespaces in self.storage.values():
+                for saved in namespaces.values():
+                    checkpoints += len(saved)
+                    for checkpoint, metadata, _ in saved.values():
+                        size += len(checkpoint[1]) + len(metadata[1])
+            for writes in self.writes.values():
+                for _, _, value in writes.values():
+                    size += len(value[1])
+            return {
+                "backend": "memory",
+                "threads": len(self._last_used),
+                "checkpoints": checkpoints,
+                "approx_bytes": size,
+                "max_threads": self.max_threads,
+                "max_checkpoints_per_thread": self.max_checkpoints_per_thread,
+                "idle_ttl_seconds": self.idle_ttl_seconds,
+                **self._stats,
+            }
+
+
+class SQLiteSaver(BaseCheckpointSaver):
+    """Durable checkpointer backed by a local SQLite file.
+
+    Every uvicorn worker on the host opens the same file, so a thread's next
+    /chat can land on any process (and survives restarts). The database runs
+    in WAL mode so readers never block the writer. Pending writes are buffered
+    and committed in the same transaction as the step's checkpoint (or before
+    the next read), and large blobs — mostly FlightState.messages — are
+    zlib-compressed.
+    """
+
+    _SCHEMA = """
+        CREATE TABLE IF NOT EXISTS checkpoints (
+            thread_id TEXT NOT NULL,
+            checkpoint_ns TEXT NOT NULL DEFAULT '',
+            checkpoint_id TEXT NOT NULL,
+            parent_checkpoint_id TEXT,
+            type TEXT,
+            checkpoint BLOB,
+            metadata_type TEXT,
+            metadata BLOB,
+            updated_at REAL,
+            PRIMARY KEY (thread_id, checkpoint_ns, checkpoint_id)
+        );
+        CREATE TABLE IF NOT EXISTS writes (
+            thread_id TEXT NOT NULL,
+            checkpoint_ns TEXT NOT NULL DEFAULT '',
+            checkpoint_id TEXT NOT NULL,
+            task_id TEXT NOT NULL,
+            idx INTEGER NOT NULL,
+            channel TEXT NOT NULL,
+            type TEXT,
+            value BLOB,
+            PRIMARY KEY (thread_id, checkpoint_ns, checkpoint_id, task_id, idx)
+        );
+    """
+
+    def __init__(
+        self,
+        path: str = CHECKPOINT_DB_PATH,
+        max_checkpoints_per_thread: int = CHECKPOINT_MAX_PER_THREAD,
+        compress_min_bytes: int = CHECKPOINT_COMPRESS_MIN_BYTES,
+        **kwargs,
+    ):
+        super().__init__(**kwargs)
+        self.path = path
+        self.max_checkpoints_per_thread = max(2, max_checkpoints_per_thread)
+        self.compress_min_bytes = compress_min_bytes
+        self._conn = sqlite3.connect(path, check_same_thread=False, timeout=30, isolation_level=None)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.executescript(self._SCHEMA)
+        self._lock = threading.RLock()
+        self._pending_writes: list = []
+        self._stats = {"checkpoints_written": 0, "writes_buffered": 0, "flushes": 0, "pruned_checkpoints": 0}
+
+    # ── serialization ──
+
+    def _dump(self, obj: Any) -> Tuple[str, bytes]:
+        type_, data = self.serde.dumps_typed(obj)
+        if len(data) >= self.compress_min_bytes:
+            return f"{type_}+zlib", zlib.compress(data, 6)
+        return type_, data
+
+    def _load(self, type_: str, data: bytes) -> Any:
+        if type_.endswith("+zlib"):
+            type_, data = type_[:-len("+zlib")], zlib.decompress(data)
+        return self.serde.loads_typed((type_, data))
+
+    # ── write path ──
+
+    def _flush(self) -> None:
+        """Commit buffered pending writes (caller holds the lock, no open transaction)."""
+        if not self._pending_writes:
+            return
+        rows, self._pending_writes = self._pending_writes, []
+        with self._conn:
+            self._conn.execute("BEGIN IMMEDIATE")
+            self._insert_writes(rows)
+        self._stats["flushes"] += 1
+
+    def _insert_writes(self, rows: list) -> None:
+        self._conn.executemany(
+            "INSERT OR REPLACE INTO writes VALUES (?, ?, ?, ?, ?, ?, ?, ?)", rows
+        )
+
+    def put(
+        self,
+        config: RunnableConfig,
+        checkpoint: Checkpoint,
+        metadata: CheckpointMetadata,
+        new_versions: ChannelVersions,
+    ) -> RunnableConfig:
+        c = checkpoint.copy()
+        c.pop("pending_sends", None)
+        thread_id = config["configurable"]["thread_id"]
+        checkpoint_ns = config["configurable"].get("checkpoint_ns", "")
+        parent_id = config["configurable"].get("checkpoint_id")
+        type_, blob = self._dump(c)
+        metadata_type, metadata_blob = self._dump(metadata)
+
+        with self._lock:
+            rows, self._pending_writes = self._pending_writes, []
+            with self._conn:
+                self._conn.execute("BEGIN IMMEDIATE")
+                self._insert_writes(rows)
+                self._conn.execute(
+                    "INSERT OR REPLACE INTO checkpoints VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                    (thread_id, checkpoint_ns, checkpoint["id"], parent_id,
+                     type_, blob, metadata_type, metadata_blob, time.time()),
+                )
+                self._prune(thread_id, checkpoint_ns)
+            self._stats["checkpoints_written"] += 1
+            if rows:
+                self._stats["flushes"] += 1
+
+        return {
+            "configurable": {
+                "thread_id": thread_id,
+                "checkpoint_ns": checkpoint_ns,
+                "checkpoint_id": checkpoint["id"],
+            }
+        }
+
+    def _prune(self, thread_id: str, checkpoint_ns: str) -> None:
+        stale = self._conn.execute(
+            "SELECT checkpoint_id FROM checkpoints WHERE thread_id = ? AND checkpoint_ns = ? "
+            "ORDER BY checkpoint_id DESC LIMIT -1 OFFSET ?",
+            (thread_id, checkpoint_ns, self.max_checkpoints_per_thread),
+        ).fetchall()
+        for (checkpoint_id,) in stale:
+            key = (thread_id, checkpoint_ns, checkpoint_id)
+            self._conn.execute(
+                "DELETE FROM checkpoints WHERE thread_id = ? AND checkpoint_ns = ? AND checkpoint_id = ?", key
+            )
+            self._conn.execute(
+                "DELETE FROM writes WHERE thread_id = ? AND checkpoint_ns = ? AND checkpoint_id = ?", key
+            )
+        self._stats["pruned_checkpoints"] += len(stale)
+
+    def put_writes(self, config: RunnableConfig, writes: Sequence[Tuple[str, Any]], task_id: str) -> None:
+        thread_id = config["configurable"]["thread_id"]
+        checkpoint_ns = config["configurable"].get("checkpoint_ns", "")
+        checkpoint_id = config["configurable"]["checkpoint_id"]
+        rows = []
+        for idx, (channel, value) in enumerate(writes):
+            type_, blob = self._dump(value)
+            rows.append((thread_id, checkpoint_ns, checkpoint_id, task_id,
+                         WRITES_IDX_MAP.get(channel, idx), channel, type_, blob))
+        with self._lock:
+            self._pending_writes.extend(rows)
+            self._stats["writes_buffered"] += len(rows)
+
+    def flush(self) -> None:
+        with self._lock:
+            self._flush()
+
+    # ── read path ──
+
+    def _writes_for(self, thread_id: str, checkpoint_ns: str, checkpoint_id: str) -> list:
+        return self._conn.execute(
+            "SELECT task_id, channel, type, value FROM writes "
+            "WHERE thread_id = ? AND checkpoint_ns = ? AND checkpoint_id = ? ORDER BY task_id, idx",
+            (thread_id, checkpoint_ns, checkpoint_id),
+        ).fetchall()
+
+    def _to_tuple(self, row: tuple) -> CheckpointTuple:
+        thread_id, checkpoint_ns, checkpoint_id, parent_id, type_, blob, metadata_type, metadata_blob = row
+        writes = self._writes_for(thread_id, checkpoint_ns, checkpoint_id)
+        sends = []
+        if parent_id:
+            sends = [
+                self._load(t, v)
+                for _, channel, t, v in self._writes_for(thread_id, checkpoint_ns, parent_id)
+                if channel == TASKS
+            ]
+        return CheckpointTuple(
+            config={
+                "configurable": {
+                    "thread_id": thread_id,
+                    "checkpoint_ns": checkpoint_ns,
+                    "checkpoint_id": checkpoint_id,
+                }
+            },
+            checkpoint={**self._load(type_, blob), "pending_sends": sends},
+            metadata=self._load(metadata_type, metadata_blob),
+            pending_writes=[(task_id, channel, self._load(t, v)) for task_id, channel, t, v in writes],
+            parent_config={
+                "configurable": {
+                    "thread_id": thread_id,
+                    "checkpoint_ns": checkpoint_ns,
+                    "checkpoint_id": parent_id,
+                }
+            }
+            if parent_id
+            else None,
+        )
+
+    _COLUMNS = "thread_id, checkpoint_ns, checkpoint_id, parent_checkpoint_id, type, checkpoint, metadata_type, metadata"
+
+    def get_tuple(self, config: RunnableConfig) -> Optional[CheckpointTuple]:
+        thread_id = config["configurable"]["thread_id"]
+        checkpoint_ns = config["configurable"].get("checkpoint_ns", "")
+        with self._lock:
+            self._flush()
+            if checkpoint_id := get_checkpoint_id(config):
+                row = self._conn.execute(
+                    f"SELECT {self._COLUMNS} FROM checkpoints "
+                    "WHERE thread_id = ? AND checkpoint_ns = ? AND checkpoint_id = ?",
+                    (thread_id, checkpoint_ns, checkpoint_id),
+                ).fetchone()
+            else:
+                row = self._conn.execute(
+                    f"SELECT {self._COLUMNS} FROM checkpoints "
+                    "WHERE thread_id = ? AND checkpoint_ns = ? ORDER BY checkpoint_id DESC LIMIT 1",
+                    (thread_id, checkpoint_ns),
+                ).fetchone()
+            return self._to_tuple(row) if row else None
+
+    def list(
+        self,
+        config: Optional[RunnableConfig],
+        *,
+        filter: Optional[dict] = None,
+        before: Optional[RunnableConfig] = None,
+        limit: Optional[int] = None,
+    ) -> Iterator[CheckpointTuple]:
+        where, params = [], []
+        if config:
+            where.append("thread_id = ?")
+            params.append(config["configurable"]["thread_id"])
+            if (checkpoint_ns := config["configurable"].get("checkpoint_ns")) is not None:
+                where.append("checkpoint_ns = ?")
+                params.append(checkpoint_ns)
+            if checkpoint_id := get_checkpoint_id(config):
+                where.append("checkpoint_id = ?")
+                params.append(checkpoint_id)
+        if before and (before_id := get_checkpoint_id(before)):
+            where.append("checkpoint_id < ?")
+            params.append(before_id)
+        query = f"SELECT {self._COLUMNS} FROM checkpoints"
+        if where:
+            query += " WHERE " + " AND ".join(where)
+        query += " ORDER BY checkpoint_id DESC"
+
+        with self._lock:
+            self._flush()
+            rows = self._conn.execute(query, params).fetchall()
+            results = []
+            for row in rows:
+                if limit is not None and len(results) >= limit:
+                    break
+                item = self._to_tuple(row)
+                if filter and not all(item.metadata.get(k) == v for k, v in filter.items()):
+                    continue
+                results.append(item)
+        yield from results
+
+    # ── maintenance ──
+
+    def delete_thread(self, thread_id: str) -> int:
+        with self._lock:
+            self._pending_writes = [r for r in self._pending_writes if r[0] != thread_id]
+            with self._conn:
+                self._conn.execute("BEGIN IMMEDIATE")
+                removed = self._conn.execute("DELETE FROM checkpoints WHERE thread_id = ?", (thread_id,)).rowcount
+                self._conn.execute("DELETE FROM writes WHERE thread_id = ?", (thread_id,))
+            return removed
+
+    def stats(self) -> dict:
+        with self._lock:
+            threads, checkpoints, size = self._conn.execute(
+                "SELECT COUNT(DISTINCT thread_id), COUNT(*), COALESCE(SUM(LENGTH(checkpoint) + LENGTH(metadata)), 0) "
+                "FROM checkpoints"
+            ).fetchone()
+            return {
+                "backend": "sqlite",
+                "path": self.path,
+                "threads": threads,
+                "checkpoints": checkpoints,
+                "approx_bytes": size,
+                "buffered_writes": len(self._pending_writes),
+                "max_checkpoints_per_thread": self.max_checkpoints_per_thread,
+                **self._stats,
+            }
+
+    # ── async (sqlite3 is blocking, so run in the default executor) ──
+
+    async def aget_tuple(self, config: RunnableConfig) -> Optional[CheckpointTuple]:
+        return await asyncio.get_running_loop().run_in_executor(None, self.get_tuple, config)
+
+    async def alist(
+        self,
+        config: Optional[RunnableConfig],
+        *,
+        filter: Optional[dict] = None,
+        before: Optional[RunnableConfig] = None,
+        limit: Optional[int] = None,
+    ) -> AsyncIterator[CheckpointTuple]:
+        items = await asyncio.get_running_loop().run_in_executor(
+            None, lambda: list(self.list(config, filter=filter, before=before, limit=limit))
+        )
+        for item in items:
+            yield item
+
+    async def aput(
+        self,
+        config: RunnableConfig,
+        checkpoint: Checkpoint,
+        metadata: CheckpointMetadata,
+        new_versions: ChannelVersions,
+    ) -> RunnableConfig:
+        return await asyncio.get_running_loop().run_in_executor(
+            None, self.put, config, checkpoint, metadata, new_versions
+        )
+
+    async def aput_writes(self, config: RunnableConfig, writes: Sequence[Tuple[str, Any]], task_id: str) -> None:
+        return await asyncio.get_running_loop().run_in_executor(None, self.put_writes, config, writes, task_id)
+
+
+def make_checkpointer() -> BaseCheckpointSaver:
+    """Build the checkpointer selected by CHECKPOINTER ("memory" or "sqlite")."""
+    if CHECKPOINTER == "sqlite":
+        return SQLiteSaver()
+    if CHECKPOINTER != "memory":
+        raise ValueError(f"Unknown CHECKPOINTER {CHECKPOINTER!r} (expected 'memory' or 'sqlite')")
+    return BoundedMemorySaver()
@@ -0,0 +1,153 @@
+"""Compact, columnar encoding of flight_results payloads.
+
+The full payload repeats every field name per flight and embeds each
+flight's raw AeroCRS `classes` dict. The compact form:
+
+- keeps the header / sub_header / context (and routes) as they are
+- interns repeated strings: text columns hold indices into `strings`
+  (null stays null; the odd non-string value is interned the same way)
+- stores flight fields column-wise in `flights` (one list per field)
+- stores the bookable per-class fares in `fares` as parallel arrays,
+  one inner list per flight (class name, adult fare, tax, seats, fare id,
+  flight id — enough to show prices and book)
+- leaves out the raw class detail (cabin, baggage, child/infant fares…),
+  which clients fetch on demand by flight code (POST /flight-classes)
+
+    {"type": "flight_results", "format": "compact-v1", "count": 2,
+     "strings": ["Outbound", "TL100", "DAR", "ZNZ", "07:00", ...],
+     "flights": {"direction": [0, 0], "flight_code": [1, 9], ..., "seats_available": [9, 8]},
+     "fares": {"class": [[5, 6], [5, 6]], "adult_fare": [[7, 8], [10, 11]], ...}}
+"""
+
+COMPACT_FORMAT = "compact-v1"
+
+# Per-flight columns, in card order; the interned ones hold indices into `strings`
+FLIGHT_FIELDS = (
+    "direction", "flight_code", "flight_number", "origin_code", "destination_code",
+    "departure_time", "arrival_time", "via", "price", "tax", "seats_available",
+)
+_INTERNED_FLIGHT_FIELDS = frozenset(FLIGHT_FIELDS) - {"seats_available"}
+
+# Per-class columns → where the value lives in a raw AeroCRS class dict
+FARE_FIELDS = {
+    "class": None,  # the classes dict key
+    "adult_fare": ("fare", "adultFare"),
+    "tax": ("fare", "tax"),
+    "free_seats": ("freeseats",),
+    "fare_id": ("fareid",),
+    "flight_id": ("flightid",),
+}
+_INTERNED_FARE_FIELDS = frozenset({"class", "adult_fare", "tax"})
+
+# Top-level keys that only exist in one of the two shapes
+_FULL_ONLY = frozenset({"data"})
+_COMPACT_ONLY = frozenset({"format", "count", "strings", "flights", "fares"})
+
+
+class _Interner:
+    def __init__(self):
+        self.strings = []
+        self._index = {}
+
+    def __call__(self, value):
+        if value is None:
+            return None  # e.g. no via
+        try:
+            key = (type(value), value)  # keeps 1 and "1" (and True) apart
+            i = self._index.get(key)
+        except TypeError:  # unhashable — stored, just not shared
+            key, i = None, None
+        if i is None:
+            i = len(self.strings)
+            self.strings.append(value)
+            if key is not None:
+                self._index[key] = i
+        return i
+
+
+def _dig(d, path):
+    for key in path:
+        if not isinstance(d, dict):
+            return None
+        d = d.get(key)
+    return d
+
+
+def is_compact(payload) -> bool:
+    return isinstance(payload, dict) and payload.get("format") == COMPACT_FORMAT
+
+
+def compact_flight_results(payload: dict) -> dict:
+    """Full flight_results payload → compact form. Compact input is returned as is."""
+    if is_compact(payload):
+        return payload
+    intern = _Interner()
+    flights = payload.get("data") or []
+
+    columns = {
+        field: [intern(f.get(field)) if field in _INTERNED_FLIGHT_FIELDS else f.get(field) for f in flights]
+        for field in FLIGHT_FIELDS
+    }
+    fares = {field: [] for field in FARE_FIELDS}
+    for f in flights:
+        classes = f.get("classes") or {}
+        for field, path in FARE_FIELDS.items():
+            values = list(classes) if path is None else [_dig(c, path) for c in classes.values()]
+            if field in _INTERNED_FARE_FIELDS:
+                values = [intern(v) for v in values]
+            fares[field].append(values)
+
+    compact = {k: v for k, v in payload.items() if k not in _FULL_ONLY}
+    compact.update({
+        "format": COMPACT_FORMAT,
+        "count": len(flights),
+        "strings": intern.strings,
+        "flights": columns,
+        "fares": fares,
+    })
+    return compact
+
+
+def _lookup(strings: list, value):
+    return None if value is None else strings[value]
+
+
+def flight_rows(compact: dict, limit: int = None) -> list:
+    """The cards of a compact payload as dicts of FLIGHT_FIELDS (no classes)."""
+    strings = compact["strings"]
+    columns = compact["flights"]
+    n = compact["count"] if limit is None else min(limit, compact["count"])
+    return [
+        {
+            field: _lookup(strings, columns[field][i]) if field in _INTERNED_FLIGHT_FIELDS else columns[field][i]
+            for field in FLIGHT_FIELDS
+        }
+        for i in range(n)
+    ]
+
+
+def expand_flight_results(compact: dict) -> dict:
+    """Compact payload → full shape. Each card's `classes` holds the bookable
+    fields only (fare.adultFare / fare.tax, freeseats, fareid, flightid)."""
+    if not is_compact(compact):
+        return compact
+    strings = compact["strings"]
+    fares = compact["fares"]
+    data = flight_rows(compact)
+    for i, card in enumerate(data):
+        classes = {}
+        for j, name in enumerate(fares["class"][i]):
+            classes[_lookup(strings, name)] = {
+                "fare": {
+                    "adultFare": _lookup(strings, fares["adult_fare"][i][j]),
+                    "tax": _lookup(strings, fares["tax"][i][j]),
+                },
+                "freeseats": fares["free_seats"][i][j],
+                "fareid": fares["fare_id"][i][j],
+                "flightid": fares["flight_id"][i][j],
+            }
+        card["classes"] = classes
+
+    full = {k: v for k, v in compact.items() if k not in _COMPACT_ONLY}
+    full["data"] = data
+    return full
@@ -1250,8 +1250,9 @@ export default function Home() {
     const bookingPayload: Record<string, unknown> = {
       flight_id: isRT && outboundSelection ? outboundSelection.cls.flightid : cls.flightid,
       fare_id: isRT && outboundSelection ? outboundSelection.cls.fareid : cls.fareid,
-      from_code: flightContext.from_code,
-      to_code: flightContext.to_code,
+      // Multi-route results mix airports — book the route of the chosen flight
+      from_code: (outboundSelection?.flight ?? selectedFlight).origin_code || flightContext.from_code,
+      to_code: (outboundSelection?.flight ?? selectedFlight).destination_code || flightContext.to_code,
       trip_type: flightContext.triptype || "OW",
       adults: flightContext.adults,
       child: flightContext.child,
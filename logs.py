@@ -0,0 +1,160 @@
+import atexit
+import logging
+import logging.handlers
+import os
+import queue
+import random
+import sys
+import time
+
+import serialization
+from tracing import current_trace_id
+
+
+# INFO in production; DEBUG adds raw API payloads and per-turn context dumps
+LOG_LEVEL = os.getenv("LOG_LEVEL", "INFO").upper()
+# "json" (one object per line) or "text" (readable, for local runs)
+LOG_FORMAT = os.getenv("LOG_FORMAT", "json")
+# Fraction of DEBUG records kept — the verbose ones are only needed as samples
+LOG_DEBUG_SAMPLE_RATE = float(os.getenv("LOG_DEBUG_SAMPLE_RATE", "1.0"))
+
+
+# ─────────────────────────────────────────────
+# LAZY PAYLOADS
+# ─────────────────────────────────────────────
+
+class lazy:
+    """A field value computed only when the record is actually written.
+
+    Records below the level never get this far, so e.g.
+    `log.debug("raw", body=lazy(json.dumps, data))` costs nothing unless
+    DEBUG is on. The value is computed on the writer thread.
+    """
+    __slots__ = ("fn", "args")
+
+    def __init__(self, fn, *args):
+        self.fn = fn
+        self.args = args
+
+    def resolve(self):
+        try:
+            return self.fn(*self.args)
+        except Exception as e:
+            return f"<unavailable: {e!r}>"
+
+
+def _resolve_fields(fields: dict) -> dict:
+    return {k: v.resolve() if isinstance(v, lazy) else v for k, v in fields.items()}
+
+
+# ─────────────────────────────────────────────
+# FORMATTERS / FILTERS
+# ─────────────────────────────────────────────
+
+class JsonFormatter(logging.Formatter):
+    def format(self, record: logging.LogRecord) -> str:
+        entry = {
+            "ts": round(record.created, 3),
+            "level": record.levelname,
+            "logger": record.name,
+            "event": record.getMessage(),
+        }
+        if getattr(record, "trace_id", None):
+            entry["trace_id"] = record.trace_id
+        entry.update(_resolve_fields(getattr(record, "fields", {})))
+        if record.exc_info:
+            entry["exc"] = self.formatException(record.exc_info)
+        return serialization.dumps(entry, default=str)
+
+
+class TextFormatter(logging.Formatter):
+    def format(self, record: logging.LogRecord) -> str:
+        fields = _resolve_fields(getattr(record, "fields", {}))
+        line = f"{time.strftime('%H:%M:%S', time.localtime(record.created))} {record.levelname:<7} " \
+               f"{record.name} {record.getMessage()}"
+        if fields:
+            line += " | " + " ".join(f"{k}={v}" for k, v in fields.items())
+        if record.exc_info:
+            line += "\n" + self.formatException(record.exc_info)
+        return line
+
+
+class _DebugSampler(logging.Filter):
+    def filter(self, record: logging.LogRecord) -> bool:
+        return record.levelno > logging.DEBUG or random.random() < LOG_DEBUG_SAMPLE_RATE
+
+
+class _TraceContext(logging.Filter):
+    """Stamps the request's trace id while still on the calling thread."""
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        record.trace_id = current_trace_id()
+        return True
+
+
+class _QueueHandler(logging.handlers.QueueHandler):
+    # The stock prepare() formats the record on the calling thread; here the
+    # record is queued as-is so formatting and lazy fields run on the writer
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        return record
+
+
+# ─────────────────────────────────────────────
+# LOGGER
+# ─────────────────────────────────────────────
+
+class Logger:
+    """Structured logger: `log.info("event.name", key=value, ...)`."""
+
+    def __init__(self, name: str):
+        self._logger = logging.getLogger(f"travellink.{name}")
+
+    def _log(self, level: int, event: str, exc_info, fields: dict) -> None:
+        if self._logger.isEnabledFor(level):
+            self._logger._log(level, event, (), exc_info=exc_info, extra={"fields": fields})
+
+    def debug(self, event: str, **fields) -> None:
+        self._log(logging.DEBUG, event, None, fields)
+
+    def info(self, event: str, **fields) -> None:
+        self._log(logging.INFO, event, None, fields)
+
+    def warning(self, event: str, **fields) -> None:
+        self._log(logging.WARNING, event, None, fields)
+
+    def error(self, event: str, exc_info: bool = False, **fields) -> None:
+        self._log(logging.ERROR, event, exc_info, fields)
+
+    def is_debug(self) -> bool:
+        return self._logger.isEnabledFor(logging.DEBUG)
+
+
+_listener = None
+
+
+def setup_logging() -> None:
+    """Route `travellink.*` records through a queue to one stdout writer thread."""
+    global _listener
+    if _listener is not None:
+        return
+    root = logging.getLogger("travellink")
+    root.setLevel(LOG_LEVEL)
+    root.propagate = False
+
+    stream = logging.StreamHandler(sys.stdout)
+    stream.setFormatter(JsonFormatter() if LOG_FORMAT == "json" else TextFormatter())
+
+    records = queue.SimpleQueue()
+    handler = _QueueHandler(records)
+    handler.addFilter(_DebugSampler())
+    handler.addFilter(_TraceContext())
+    root.addHandler(handler)
+
+    _listener = logging.handlers.QueueListener(records, stream, respect_handler_level=True)
+    _listener.start()
+    atexit.register(_listener.stop)  # flush what's queued on shutdown
+
+
+def get_logger(name: str) -> Logger:
+    setup_logging()
+    return Logger(name)
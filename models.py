@@ -0,0 +1,312 @@
+"""Slotted models for the AeroCRS payloads the tools normalize.
+
+getDeepLink and getAncillaries return nested JSON with a dict per flight,
+per class and per fare. parse_deeplink / parse_ancillaries walk a response
+once into these objects, so the raw response can be dropped as soon as it
+is parsed. flight_cache keeps the parsed Availability, not the JSON.
+
+- FareClass keeps every field of an AeroCRS class as a slot. Fares stay as
+  the text AeroCRS sent (what the UI shows). The adult fare is also parsed
+  to a number once, as `price`, for ranking. Fields this module doesn't
+  know about are kept in `extra`, so to_dict() gives back what came in.
+- Flight holds its bookable classes and the cheapest one, which prices the
+  flight_results card. The class dicts are built the first time a card
+  needs them and then reused, so a cache hit doesn't rebuild them.
+- AncillaryItem is one purchasable add-on.
+"""
+from typing import Optional
+
+from logs import get_logger, lazy
+
+log = get_logger("models")
+
+
+def parse_time(dt_str: str) -> str:
+    """Robustly extract HH:MM from any datetime string format."""
+    if not dt_str:
+        return ''
+    for sep in ['T', ' ']:
+        if sep in dt_str:
+            parts = dt_str.split(sep)
+            if len(parts) >= 2:
+                return parts[1][:5]
+    return dt_str[-5:] if len(dt_str) >= 5 else dt_str
+
+
+def _number(value) -> Optional[float]:
+    try:
+        return float(value)
+    except (TypeError, ValueError):
+        return None
+
+
+# ─────────────────────────────────────────────
+# FLIGHTS
+# ─────────────────────────────────────────────
+
+class DeeplinkError(ValueError):
+    """getDeepLink answered with an error instead of availability."""
+
+
+# AeroCRS class field → FareClass attribute
+_CLASS_FIELDS = {
+    "className": "class_name", "classCode": "class_code", "cabinClass": "cabin", "currency": "currency",
+    "baggageAllowance": "baggage_allowance", "baggageUnit": "baggage_unit",
+    "freeseats": "free_seats", "fareid": "fare_id", "flightid": "flight_id",
+}
+# AeroCRS class["fare"] field → FareClass attribute
+_FARE_FIELDS = {"adultFare": "adult_fare", "childFare": "child_fare", "infantFare": "infant_fare", "tax": "tax"}
+_CLASS_KEYS = frozenset(_CLASS_FIELDS) | {"fare"}
+_FARE_KEYS = frozenset(_FARE_FIELDS)
+
+
+class FareClass:
+    """One class of a flight, keyed as in the AeroCRS `classes` dict."""
+
+    __slots__ = ("key", *_CLASS_FIELDS.values(), *_FARE_FIELDS.values(), "price", "extra", "fare_extra")
+
+    def __init__(self, key: str, raw: dict):
+        get = raw.get
+        raw_fare = get("fare")
+        fare = raw_fare if isinstance(raw_fare, dict) else {}
+        self.key = key
+        self.class_name = get("className")
+        self.class_code = get("classCode")
+        self.cabin = get("cabinClass")
+        self.currency = get("currency")
+        self.baggage_allowance = get("baggageAllowance")
+        self.baggage_unit = get("baggageUnit")
+        self.free_seats = get("freeseats")
+        self.fare_id = get("fareid")
+        self.flight_id = get("flightid")
+        self.adult_fare = fare.get("adultFare")
+        self.child_fare = fare.get("childFare")
+        self.infant_fare = fare.get("infantFare")
+        self.tax = fare.get("tax")
+        self.price = _number(self.adult_fare)
+        # Usually empty: only fields AeroCRS added beyond the known ones
+        self.extra = (None if fare is raw_fare and raw.keys() <= _CLASS_KEYS else
+                      {k: v for k, v in raw.items() if k not in _CLASS_FIELDS and v is not fare} or None)
+        self.fare_extra = (None if fare.keys() <= _FARE_KEYS else
+                           {k: v for k, v in fare.items() if k not in _FARE_FIELDS})
+
+    def to_dict(self) -> dict:
+        """The AeroCRS class dict (null fields left out)."""
+        d = {
+            "className": self.class_name, "classCode": self.class_code, "cabinClass": self.cabin,
+            "currency": self.currency, "baggageAllowance": self.baggage_allowance,
+            "baggageUnit": self.baggage_unit, "freeseats": self.free_seats,
+            "fareid": self.fare_id, "flightid": self.flight_id,
+            "fare": {"adultFare": self.adult_fare, "childFare": self.child_fare,
+                     "infantFare": self.infant_fare, "tax": self.tax},
+        }
+        fare = d["fare"]
+        if None in fare.values():
+            fare = d["fare"] = {k: v for k, v in fare.items() if v is not None}
+        if self.fare_extra:
+            fare.update(self.fare_extra)
+        if None in d.values():
+            d = {k: v for k, v in d.items() if v is not None}
+        if not fare:
+            del d["fare"]
+        if self.extra:
+            d.update(self.extra)
+        return d
+
+
+class Flight:
+    """One getDeepLink flight with at least one priced class."""
+
+    __slots__ = ("direction", "flight_code", "flight_number", "departure_time", "arrival_time",
+                 "via", "classes", "cheapest", "_classes_dict")
+
+    def __init__(self, raw: dict, classes: tuple, cheapest: FareClass):
+        self.direction = raw.get("direction")  # "outbound" / "inbound"; None if AeroCRS left it out
+        self.flight_code = raw.get("flightcode")
+        self.flight_number = raw.get("fltnum")
+        self.departure_time = parse_time(raw.get("STD", ""))
+        self.arrival_time = parse_time(raw.get("STA", ""))
+        self.via = raw.get("via") or None
+        self.classes = classes
+        self.cheapest = cheapest
+        self._classes_dict = None
+
+    def classes_dict(self) -> dict:
+        """The AeroCRS classes dict, built once. Shared by every card built
+        from this flight, so treat it as read-only."""
+        if self._classes_dict is None:
+            self._classes_dict = {c.key: c.to_dict() for c in self.classes}
+        return self._classes_dict
+
+    def card(self, from_code: str, to_code: str, direction_label: str) -> dict:
+        """flight_results card, priced by the cheapest class."""
+        cheapest = self.cheapest
+        return {
+            "direction": direction_label,
+            "flight_code": self.flight_code,
+            "flight_number": self.flight_number,
+            "origin_code": from_code,
+            "destination_code": to_code,
+            "departure_time": self.departure_time,
+            "arrival_time": self.arrival_time,
+            "via": self.via,
+            "price": cheapest.adult_fare,
+            "tax": cheapest.tax,
+            "seats_available": cheapest.free_seats,
+            "classes": self.classes_dict(),
+        }
+
+
+class Availability:
+    """A parsed getDeepLink response: the usable flights in API order,
+    AeroCRS's message when it sent one instead of flights, and how many
+    flight entries the response had (parsed or not)."""
+
+    __slots__ = ("flights", "message", "entries")
+
+    def __init__(self, flights: list, message: Optional[str] = None, entries: int = 0):
+        self.flights = flights
+        self.message = message
+        self.entries = entries
+
+
+def _parse_flight(f: dict) -> Optional[Flight]:
+    classes = f.get("classes", {})
+    if not isinstance(classes, dict):
+        log.warning("deeplink.skip_flight", reason="classes not a dict", type=type(classes).__name__)
+        return None
+    fare_classes = []
+    cheapest = None
+    for key, raw in classes.items():
+        if not isinstance(raw, dict):  # skip string/int entries
+            continue
+        c = FareClass(key, raw)
+        fare_classes.append(c)
+        if c.price is not None and (cheapest is None or c.price < cheapest.price):
+            cheapest = c
+    if not fare_classes:
+        log.warning("deeplink.skip_flight", reason="no valid class entries", classes=lazy(list, classes))
+        return None
+    if cheapest is None:
+        log.warning("deeplink.skip_flight", reason="no numeric adult fare", flight_code=f.get("flightcode"))
+        return None
+    return Flight(f, tuple(fare_classes), cheapest)
+
+
+def parse_deeplink(data: dict) -> Availability:
+    """getDeepLink response → Availability, in one pass over the flights.
+    Raises DeeplinkError for an error envelope, so it is never mistaken
+    for (and cached as) "no flights"."""
+    envelope = data.get("aerocrs") if isinstance(data, dict) else None
+    if not isinstance(envelope, dict):
+        raise DeeplinkError(f"unexpected getDeepLink response: {str(data)[:200]}")
+    if "flights" not in envelope and (envelope.get("success") is False
+                                      or envelope.get("error") or envelope.get("errors")):
+        detail = envelope.get("error") or envelope.get("errors") or envelope.get("message") or "success=false"
+        raise DeeplinkError(f"AeroCRS error: {str(detail)[:200]}")
+    entries = envelope.get("flights", {}).get("flight", [])
+    # AeroCRS sends a string like "No flights available" instead of a list
+    if isinstance(entries, str):
+        return Availability([], message=entries)
+    # … and a bare dict for a single flight
+    if isinstance(entries, dict):
+        entries = [entries]
+    if not isinstance(entries, list):
+        return Availability([])
+
+    flights = []
+    for f in entries:
+        if not isinstance(f, dict):
+            log.warning("deeplink.bad_flight_entry", type=type(f).__name__, preview=lazy(lambda: str(f)[:200]))
+            continue
+        try:
+            flight = _parse_flight(f)
+        except Exception as exc:
+            log.warning("deeplink.flight_error", error=repr(exc))
+            continue
+        if flight is not None:
+            flights.append(flight)
+    return Availability(flights, entries=len(entries))
+
+
+# ─────────────────────────────────────────────
+# ANCILLARIES
+# ─────────────────────────────────────────────
+
+class AncillaryItem:
+    """One purchasable add-on from getAncillaries."""
+
+    __slots__ = ("itemid", "name", "category", "price", "currency", "description")
+
+    def __init__(self, itemid, name: str, category: str, price: str, description: str, currency: str = "USD"):
+        self.itemid = itemid
+        self.name = name
+        self.category = category
+        self.price = price
+        self.currency = currency
+        self.description = description
+
+    def to_dict(self) -> dict:
+        return {attr: getattr(self, attr) for attr in self.__slots__}
+
+
+def _ancillary_price(fare, fallback) -> str:
+    if isinstance(fare, str):
+        return fare or "0"
+    return str(fare.get("adult") or fare.get("adultFare") or fallback or "0")
+
+
+def parse_ancillaries(data: dict) -> list:
+    """getAncillaries response → [AncillaryItem].
+
+    Real API shape:
+    {"aerocrs": {"ancillaries": {"ancillary": [
+      {"name": "WHEELCHAIR SERVICE", "description": "...", "groupname": "...",
+       "items": [{"itemid": "17520", "itemname": "Wheelchair service charge",
+                  "fare": {"adult": "25.00"}, ...}]}
+    ]}}}
+    """
+    block = data.get("aerocrs", {}).get("ancillaries") or {}
+    if isinstance(block, list):
+        groups = block
+    elif isinstance(block, dict):
+        groups = block.get("ancillary") or []
+        if not isinstance(groups, list):
+            groups = [groups]
+    else:
+        groups = []
+
+    items = []
+    for group in groups:
+        if not isinstance(group, dict):
+            continue
+        group_name = group.get("groupname") or group.get("name") or "Add-on"
+        group_desc = group.get("name") or group.get("description") or ""
+
+        # Each group has sub-items with itemid + fare
+        sub_items = group.get("items") or []
+        if isinstance(sub_items, dict):
+            sub_items = [sub_items]
+
+        if sub_items:
+            description = group.get("description") or group_desc or ""
+            for sub in sub_items:
+                if not isinstance(sub, dict):
+                    continue
+                items.append(AncillaryItem(
+                    itemid=sub.get("itemid") or sub.get("id"),
+                    name=sub.get("itemname") or sub.get("name") or group_desc or "Extra",
+                    category=group_name,
+                    price=_ancillary_price(sub.get("fare") or {}, sub.get("price")),
+                    description=description,
+                ))
+        else:
+            # Group itself is the purchasable item
+            items.append(AncillaryItem(
+                itemid=group.get("itemid") or group.get("id"),
+                name=group_desc or group_name,
+                category=group_name,
+                price=_ancillary_price(group.get("fare") or {}, group.get("price")),
+                description=group.get("description") or "",
+            ))
+    return items
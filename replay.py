@@ -0,0 +1,272 @@
+"""Record chat sessions and replay them offline.
+
+Recording (opt-in): set REPLAY_RECORD_DIR. Every /chat and /chat/stream turn
+appends to <dir>/<thread_id>.jsonl the input message, every LLM reply and
+every AeroCRS response the turn saw, and the final reply with its latency.
+The destination list a turn matched against is written once per version to
+<dir>/destinations-<sha>.json.
+
+Replaying: `python replay.py <dir>/<thread_id>.jsonl` re-drives a fresh
+create_graph() with the recorded LLM replies and AeroCRS responses (no
+network), reports per-turn latency next to the recorded one, and flags
+turns whose reply differs.
+"""
+import argparse
+import contextvars
+import hashlib
+import json
+import os
+import re
+import threading
+import time
+from collections import defaultdict, deque
+from contextlib import contextmanager
+
+import serialization
+
+
+REPLAY_RECORD_DIR = os.getenv("REPLAY_RECORD_DIR", "")
+
+
+def _dumps(obj) -> str:
+    return serialization.dumps(obj, default=str)
+
+
+def http_key(method: str, url) -> str:
+    """'GET /getDeepLink?from=…' — AeroCRS endpoints are one path segment, so
+    the key doesn't depend on which base URL served them."""
+    query = url.query.decode() if isinstance(url.query, bytes) else url.query
+    return f"{method} /{url.path.rsplit('/', 1)[-1]}" + (f"?{query}" if query else "")
+
+
+# ─────────────────────────────────────────────
+# RECORDER
+# ─────────────────────────────────────────────
+
+_current_turn: contextvars.ContextVar = contextvars.ContextVar("replay_turn", default=None)
+
+
+class _Turn:
+    def __init__(self, thread_id: str, message: str):
+        self.thread_id = thread_id
+        self.events = [{"t": "turn", "ts": round(time.time(), 3), "message": message, "catalog": None}]
+
+    def add(self, kind: str, **data) -> None:
+        self.events.append({"t": kind, **data})  # list.append is atomic; tools run on worker threads
+
+
+class ReplayRecorder:
+    """Append-only per-thread session logs. Inactive unless given a directory."""
+
+    def __init__(self, directory: str = REPLAY_RECORD_DIR):
+        self.directory = directory
+        self._lock = threading.Lock()
+        self._written_catalogs = set()
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+
+    @property
+    def enabled(self) -> bool:
+        return bool(self.directory)
+
+    def _snapshot_catalog(self, destinations: list) -> str:
+        body = _dumps(destinations)
+        sha = hashlib.sha1(body.encode()).hexdigest()[:12]
+        with self._lock:
+            if sha not in self._written_catalogs:
+                path = os.path.join(self.directory, f"destinations-{sha}.json")
+                if not os.path.exists(path):
+                    with open(path, "w", encoding="utf-8") as f:
+                        f.write(body)
+                self._written_catalogs.add(sha)
+        return sha
+
+    @contextmanager
+    def turn(self, thread_id: str, message: str, catalog=None):
+        """Record one graph invocation. Yields the turn (or None when disabled);
+        call `turn.add("result", reply=...)` before leaving the block."""
+        if not self.enabled:
+            yield None
+            return
+        t = _Turn(thread_id, message)
+        token = _current_turn.set(t)
+        start = time.perf_counter()
+        try:
+            yield t
+        except BaseException as e:
+            t.add("error", error=repr(e))
+            raise
+        finally:
+            _current_turn.reset(token)
+            t.add("end", ms=round((time.perf_counter() - start) * 1000, 1))
+            # Taken after the turn, which may have triggered the first load
+            destinations = catalog.peek() if catalog is not None else None
+            if destinations is not None:
+                t.events[0]["catalog"] = self._snapshot_catalog(destinations)
+                # The snapshot file already holds the list; don't log it per thread
+                t.events = [e for e in t.events if e.get("key") != "GET /getDestinations"]
+            self._append(t)
+
+    def _append(self, t: _Turn) -> None:
+        safe_id = re.sub(r"[^A-Za-z0-9_.-]", "_", t.thread_id) or "_"
+        lines = "".join(_dumps(e) + "\n" for e in t.events)
+        with self._lock:
+            with open(os.path.join(self.directory, f"{safe_id}.jsonl"), "a", encoding="utf-8") as f:
+                f.write(lines)
+
+
+def record(kind: str, **data) -> None:
+    """Add an event to the turn being recorded, if any (cheap no-op otherwise)."""
+    t = _current_turn.get()
+    if t is not None:
+        t.add(kind, **data)
+
+
+def recording() -> bool:
+    return _current_turn.get() is not None
+
+
+recorder = ReplayRecorder()
+
+
+# ─────────────────────────────────────────────
+# REPLAYER
+# ─────────────────────────────────────────────
+
+def load_session(path: str) -> list:
+    """Split a session log into turns (lists of events)."""
+    turns = []
+    with open(path, encoding="utf-8") as f:
+        for line in f:
+            if not line.strip():
+                continue
+            event = serialization.loads(line)
+            if event["t"] == "turn":
+                turns.append([event])
+            elif turns:
+                turns[-1].append(event)
+    return turns
+
+
+def replay_session(path: str, quiet: bool = False) -> list:
+    """Re-drive a recorded session through a fresh graph. Returns per-turn results."""
+    import httpx
+    from langchain_core.language_models.chat_models import BaseChatModel
+    from langchain_core.messages import AIMessage
+    from langchain_core.outputs import ChatGeneration, ChatResult
+
+    import checkpoint
+    checkpoint.CHECKPOINTER = "memory"  # never touch a real checkpoint store
+    import bot
+    from aerocrs import client as aerocrs
+    from app import _extract_reply, _to_graph_message
+
+    turns = load_session(path)
+    directory = os.path.dirname(os.path.abspath(path))
+
+    llm_replies = deque()
+    http_responses = defaultdict(deque)
+    last_response = {}
+    unrecorded = []
+
+    class RecordedChatModel(BaseChatModel):
+        model_name: str = "replay"
+
+        @property
+        def _llm_type(self) -> str:
+            return "replay"
+
+        def bind_tools(self, tools, **kwargs):
+            return self
+
+        def _generate(self, messages, stop=None, run_manager=None, **kwargs):
+            if not llm_replies:
+                raise RuntimeError("replay: the graph made more LLM calls than were recorded")
+            e = llm_replies.popleft()
+            msg = AIMessage(content=e.get("content", ""), tool_calls=e.get("tool_calls") or [])
+            return ChatResult(generations=[ChatGeneration(message=msg)])
+
+    def handler(request: httpx.Request) -> httpx.Response:
+        key = http_key(request.method, request.url)
+        queue = http_responses.get(key)
+        if queue:
+            last_response[key] = queue.popleft()
+        elif key not in last_response:  # served from a cache when recorded, and never fetched
+            unrecorded.append(key)
+            return httpx.Response(599, json={"error": f"replay: no recorded response for {key}"})
+        status, body = last_response[key]
+        return httpx.Response(status, json=body)
+
+    model = RecordedChatModel()
+    for phase in bot.PHASE_MODEL:
+        bot.PHASE_MODEL[phase] = model
+    bot.llm_mini = model
+    aerocrs.close()
+    aerocrs._transport = httpx.MockTransport(handler)
+    bot.flight_cache.invalidate(lambda key: True)
+    graph = bot.create_graph()
+
+    results = []
+    for n, events in enumerate(turns):
+        head = events[0]
+        if head.get("catalog"):
+            with open(os.path.join(directory, f"destinations-{head['catalog']}.json"), encoding="utf-8") as f:
+                bot.destination_catalog._store(json.load(f))
+        llm_replies.clear()
+        llm_replies.extend(e for e in events if e["t"] == "llm")
+        http_responses.clear()
+        for e in events:
+            if e["t"] == "aerocrs":
+                http_responses[e["key"]].append((e["status"], e["body"]))
+
+        config = {"configurable": {"thread_id": "replay"}}
+        count_before = len(graph.get_state(config).values.get("messages", []))
+        start = time.perf_counter()
+        error = None
+        try:
+            state = graph.invoke({"messages": [_to_graph_message(head["message"])]}, config=config)
+            reply = _extract_reply(state, new_from_index=count_before)[0]
+        except Exception as e:
+            reply, error = None, repr(e)
+        ms = (time.perf_counter() - start) * 1000
+
+        recorded = next((e for e in events if e["t"] == "result"), {})
+        end = next((e for e in events if e["t"] == "end"), {})
+        row = {
+            "turn": n,
+            "message": head["message"][:60],
+            "recorded_ms": end.get("ms"),
+            "replayed_ms": round(ms, 1),
+            "match": error is None and reply == recorded.get("reply"),
+            "leftover_llm": len(llm_replies),
+            "error": error,
+        }
+        results.append(row)
+        if not quiet:
+            flag = "ok  " if row["match"] else "DIFF"
+            print(f"{flag} turn {n:>3} | recorded {row['recorded_ms'] or 0:>8.1f}ms | replayed {ms:>8.1f}ms | "
+                  f"{row['message']!r}" + (f" | {error}" if error else ""))
+    if unrecorded and not quiet:
+        print(f"unrecorded AeroCRS calls: {sorted(set(unrecorded))}")
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Replay a recorded chat session offline.")
+    parser.add_argument("session", help="path to a <thread_id>.jsonl session log")
+    parser.add_argument("--repeat", type=int, default=1, help="replay N times and report the fastest run")
+    args = parser.parse_args()
+
+    os.environ.setdefault("OPENAI_API_KEY", "replay")
+    os.environ.setdefault("LOG_LEVEL", "WARNING")
+
+    runs = [replay_session(args.session, quiet=i > 0) for i in range(args.repeat)]
+    totals = [sum(r["replayed_ms"] for r in run) for run in runs]
+    recorded = sum(r["recorded_ms"] or 0 for r in runs[0])
+    matched = sum(r["match"] for r in runs[0])
+    print(f"\n{len(runs[0])} turns, {matched} matching | recorded {recorded:.1f}ms | "
+          f"replayed best {min(totals):.1f}ms over {args.repeat} run(s)")
+
+
+if __name__ == "__main__":
+    main()
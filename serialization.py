@@ -0,0 +1,123 @@
+"""JSON encoding with a pluggable backend.
+
+Every turn encodes and decodes the same payloads several times: tool
+results into ToolMessage content, the context trim parsing them back,
+/chat responses, SSE frames, log lines. This module picks the backend once
+at import:
+
+- orjson, when installed
+- msgspec, when installed
+- the stdlib json module
+
+JSON_BACKEND forces one ("orjson", "msgspec" or "json"). The default,
+"auto", takes the first that imports.
+
+All backends write compact UTF-8 JSON (no ASCII escaping, no spaces after
+separators) and keep dict order. Values a fast backend rejects (ints beyond
+64 bits, lone surrogates, NaN on decode) go through the stdlib instead, so
+callers see the stdlib's results and errors: decode errors are always
+json.JSONDecodeError (a ValueError).
+"""
+import json
+import os
+from typing import Any, Callable, Optional
+
+# "auto" | "orjson" | "msgspec" | "json"
+JSON_BACKEND = os.getenv("JSON_BACKEND", "auto")
+
+_BACKENDS = ("orjson", "msgspec", "json")
+
+
+def _stdlib_dumps(obj: Any, default: Optional[Callable] = None, sort_keys: bool = False) -> str:
+    return json.dumps(obj, ensure_ascii=False, separators=(",", ":"), default=default, sort_keys=sort_keys)
+
+
+def _load_backend(name: str):
+    """→ (name, dumps_bytes(obj, default, sort_keys), loads(data), encode errors).
+    Raises ImportError if the library isn't installed."""
+    if name == "orjson":
+        import orjson
+
+        def dumps_bytes(obj, default=None, sort_keys=False):
+            option = orjson.OPT_NON_STR_KEYS | (orjson.OPT_SORT_KEYS if sort_keys else 0)
+            return orjson.dumps(obj, default=default, option=option)
+
+        return name, dumps_bytes, orjson.loads, (TypeError,)
+
+    if name == "msgspec":
+        import msgspec
+
+        encoders = {}
+
+        def dumps_bytes(obj, default=None, sort_keys=False):
+            key = (default, sort_keys)
+            encoder = encoders.get(key)
+            if encoder is None:
+                encoder = encoders[key] = msgspec.json.Encoder(
+                    enc_hook=default, order="sorted" if sort_keys else None)
+            return encoder.encode(obj)
+
+        decoder = msgspec.json.Decoder()
+
+        def loads(data):
+            try:
+                return decoder.decode(data)
+            except msgspec.DecodeError as e:
+                raise ValueError(str(e)) from e
+
+        return name, dumps_bytes, loads, (TypeError, ValueError, msgspec.EncodeError)
+
+    if name == "json":
+        def dumps_bytes(obj, default=None, sort_keys=False):
+            return _stdlib_dumps(obj, default, sort_keys).encode()
+
+        return name, dumps_bytes, json.loads, ()
+
+    raise ValueError(f"Unknown JSON_BACKEND {name!r} (expected 'auto' or one of {', '.join(_BACKENDS)})")
+
+
+def _select_backend(name: str):
+    if name != "auto":
+        return _load_backend(name)
+    for candidate in _BACKENDS:
+        try:
+            return _load_backend(candidate)
+        except ImportError:
+            continue
+
+
+BACKEND, _dumps_bytes, _loads, _ENCODE_ERRORS = _select_backend(JSON_BACKEND)
+
+
+# ─────────────────────────────────────────────
+# API
+# ─────────────────────────────────────────────
+
+def dumps_bytes(obj: Any, *, default: Optional[Callable] = None, sort_keys: bool = False) -> bytes:
+    """obj → UTF-8 JSON bytes (what HTTP responses want)."""
+    try:
+        return _dumps_bytes(obj, default, sort_keys)
+    except _ENCODE_ERRORS:
+        return _stdlib_dumps(obj, default, sort_keys).encode()
+
+
+def dumps(obj: Any, *, default: Optional[Callable] = None, sort_keys: bool = False) -> str:
+    """obj → JSON text."""
+    if BACKEND == "json":
+        return _stdlib_dumps(obj, default, sort_keys)
+    try:
+        return _dumps_bytes(obj, default, sort_keys).decode()
+    except _ENCODE_ERRORS:
+        return _stdlib_dumps(obj, default, sort_keys)
+
+
+def loads(data):
+    """JSON text or bytes → obj."""
+    try:
+        return _loads(data)
+    except ValueError:
+        if BACKEND == "json":
+            raise
+        # orjson / msgspec are stricter (NaN, surrogates); the stdlib has the
+        # final say and raises the usual JSONDecodeError for invalid input
+        return json.loads(data)
@@ -0,0 +1,68 @@
+"""flight_cache keeps real availability for the full TTL, empty results
+only briefly, and AeroCRS errors not at all."""
+import os
+import sys
+
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from cache import TTLCache  # noqa: E402
+from models import DeeplinkError, parse_deeplink  # noqa: E402
+
+
+def _loader(*values):
+    calls = []
+    values = iter(values)
+
+    def load():
+        calls.append(1)
+        value = next(values)
+        if isinstance(value, Exception):
+            raise value
+        return value
+    return load, calls
+
+
+def test_ttl_for_picks_the_ttl_per_value(monkeypatch):
+    now = [1000.0]
+    monkeypatch.setattr("cache.time.monotonic", lambda: now[0])
+    cache = TTLCache(120, ttl_for=lambda v: 120 if v else 10)
+
+    load, calls = _loader([], [], ["TL100"], ["TL999"])
+    assert cache.get_or_load("k", load) == []
+    now[0] += 5
+    assert cache.get_or_load("k", load) == []          # empty result, still fresh
+    now[0] += 10
+    assert cache.get_or_load("k", load) == []          # expired after 10s: reloaded
+    now[0] += 11
+    assert cache.get_or_load("k", load) == ["TL100"]
+    now[0] += 100
+    assert cache.get_or_load("k", load) == ["TL100"]   # a real result keeps the full TTL
+    assert len(calls) == 3
+
+
+def test_zero_ttl_and_errors_are_not_cached():
+    cache = TTLCache(120, ttl_for=lambda v: 0 if v is None else 120)
+    load, calls = _loader(DeeplinkError("AeroCRS error: down"), None, "ok")
+    with pytest.raises(DeeplinkError):
+        cache.get_or_load("k", load)
+    assert cache.get_or_load("k", load) is None
+    assert cache.get_or_load("k", load) == "ok"
+    assert cache.get_or_load("k", load) == "ok"
+    assert len(calls) == 3
+
+
+@pytest.mark.parametrize("data", [
+    {"aerocrs": {"success": False, "error": "Temporary failure"}},
+    {"aerocrs": {"errors": [{"message": "Rate limited"}]}},
+    {"message": "Internal Server Error"},
+])
+def test_error_envelopes_raise(data):
+    with pytest.raises(DeeplinkError):
+        parse_deeplink(data)
+
+
+def test_no_flights_message_is_not_an_error():
+    availability = parse_deeplink({"aerocrs": {"success": True, "flights": {"flight": "No flights available"}}})
+    assert availability.flights == [] and availability.message == "No flights available"
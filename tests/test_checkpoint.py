@@ -0,0 +1,103 @@
+"""Resetting one conversation (/reset-chat → delete_thread) must leave every
+other thread's checkpoints, pending writes and history untouched."""
+import os
+import sys
+from typing import Annotated, TypedDict
+
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from langchain_core.messages import AIMessage, HumanMessage  # noqa: E402
+from langgraph.graph import END, StateGraph  # noqa: E402
+from langgraph.graph.message import add_messages  # noqa: E402
+
+from checkpoint import BoundedMemorySaver, SQLiteSaver  # noqa: E402
+
+
+class State(TypedDict):
+    messages: Annotated[list, add_messages]
+
+
+def _echo(state: State) -> dict:
+    return {"messages": [AIMessage(content=f"echo: {state['messages'][-1].content}")]}
+
+
+def _graph(saver):
+    g = StateGraph(State)
+    g.add_node("echo", _echo)
+    g.set_entry_point("echo")
+    g.add_edge("echo", END)
+    return g.compile(checkpointer=saver)
+
+
+def _config(thread_id: str) -> dict:
+    return {"configurable": {"thread_id": thread_id}}
+
+
+@pytest.fixture(params=["memory", "sqlite"])
+def saver(request, tmp_path):
+    if request.param == "memory":
+        return BoundedMemorySaver()
+    return SQLiteSaver(path=str(tmp_path / "checkpoints.sqlite"))
+
+
+def _snapshot(saver, graph, thread_id: str) -> dict:
+    t = saver.get_tuple(_config(thread_id))
+    return {
+        "checkpoint_id": t.checkpoint["id"],
+        "channel_values": t.checkpoint["channel_values"],
+        "pending_writes": sorted(t.pending_writes, key=lambda w: (w[0], w[1])),
+        "history": [c.config["configurable"]["checkpoint_id"] for c in saver.list(_config(thread_id))],
+        "messages": [(m.type, m.content) for m in graph.get_state(_config(thread_id)).values["messages"]],
+    }
+
+
+def test_delete_thread_keeps_other_threads(saver):
+    graph = _graph(saver)
+    for thread_id in ("A", "B"):
+        for text in ("hello", "fly me to Zanzibar"):
+            graph.invoke({"messages": [HumanMessage(content=f"{thread_id}: {text}")]}, _config(thread_id))
+        # A pending write on each thread's latest checkpoint
+        latest = saver.get_tuple(_config(thread_id)).config
+        saver.put_writes(latest, [("messages", [HumanMessage(content=f"{thread_id}: pending")])], "task-1")
+
+    before = _snapshot(saver, graph, "B")
+    assert before["pending_writes"] and len(before["messages"]) == 4
+
+    assert saver.delete_thread("A") > 0
+
+    assert saver.get_tuple(_config("A")) is None
+    assert list(saver.list(_config("A"))) == []
+    assert _snapshot(saver, graph, "B") == before
+
+    # The surviving thread carries on from where it was
+    graph.invoke({"messages": [HumanMessage(content="B: and back")]}, _config("B"))
+    assert len(graph.get_state(_config("B")).values["messages"]) == 6
+
+
+def test_delete_unknown_thread_is_a_noop(saver):
+    graph = _graph(saver)
+    graph.invoke({"messages": [HumanMessage(content="hello")]}, _config("B"))
+    before = _snapshot(saver, graph, "B")
+
+    assert saver.delete_thread("nope") == 0
+    assert _snapshot(saver, graph, "B") == before
+
+
+def test_memory_list_is_safe_against_eviction():
+    saver = BoundedMemorySaver()
+    graph = _graph(saver)
+    for thread_id in ("A", "B", "C"):
+        graph.invoke({"messages": [HumanMessage(content="hello")]}, _config(thread_id))
+
+    listing = saver.list(None)  # every thread
+    first = next(listing)
+    saver.delete_thread("C")  # e.g. an eviction from another request, mid-listing
+    rest = list(listing)
+    assert first.config["configurable"]["thread_id"] == "A"
+    assert {t.config["configurable"]["thread_id"] for t in rest} == {"A", "B", "C"}
+
+    # Listing an unknown thread doesn't create an entry for it
+    assert list(saver.list(_config("nope"))) == []
+    assert "nope" not in saver.storage
@@ -0,0 +1,48 @@
+"""/fare-calendar rejects what it would otherwise quietly change: a range
+over FARE_CALENDAR_MAX_DAYS, and a request without `adults`."""
+import os
+import sys
+
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+os.environ.setdefault("OPENAI_API_KEY", "test")  # bot builds ChatOpenAI clients at import
+
+from fastapi.testclient import TestClient  # noqa: E402
+
+import app  # noqa: E402
+from bot import FARE_CALENDAR_MAX_DAYS, fare_calendar_dates  # noqa: E402
+
+REQUEST = {"from_code": "DAR", "to_code": "ZNZ", "start_date": "2026/11/01", "adults": 1}
+
+
+@pytest.fixture
+def client(monkeypatch):
+    def no_search(*args, **kwargs):
+        raise AssertionError("the request should be rejected before any search")
+    monkeypatch.setattr(app, "iter_fare_calendar", no_search)
+    return TestClient(app.app)
+
+
+@pytest.mark.parametrize("path", ["/fare-calendar", "/fare-calendar/stream"])
+def test_over_long_range_is_rejected(client, path):
+    dates, _ = fare_calendar_dates("2026/11/01", "2027/03/01", max_days=None)
+    assert len(dates) > FARE_CALENDAR_MAX_DAYS
+
+    response = client.post(path, json={**REQUEST, "end_date": "2027/03/01"})
+    assert response.status_code == 422
+    assert str(FARE_CALENDAR_MAX_DAYS) in response.json()["detail"]
+
+
+@pytest.mark.parametrize("path", ["/fare-calendar", "/fare-calendar/stream"])
+@pytest.mark.parametrize("adults", [None, 0])
+def test_adults_is_required(client, path, adults):
+    body = {k: v for k, v in REQUEST.items() if k != "adults"}
+    if adults is not None:
+        body["adults"] = adults
+    assert client.post(path, json=body).status_code == 422
+
+
+def test_chat_tool_keeps_the_capped_range():
+    dates, error = fare_calendar_dates("2026/11/01", "2027/03/01")
+    assert not error and len(dates) == FARE_CALENDAR_MAX_DAYS
@@ -0,0 +1,60 @@
+"""Restart / cancel intent: keywords match whole words only, and only an
+explicit restart drops the booking and search context."""
+import os
+import sys
+
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+os.environ.setdefault("OPENAI_API_KEY", "test")  # bot builds ChatOpenAI clients at import
+
+from langchain_core.messages import AIMessage, HumanMessage  # noqa: E402
+
+import bot  # noqa: E402
+
+
+def _booked_state() -> dict:
+    return {
+        "messages": [HumanMessage(content="DAR to ZNZ on 2026/11/20"), AIMessage(content="Booked!")],
+        "booking_id": 123, "flight_id": 456, "cancelled": False,
+        "last_search": {"from_code": "DAR", "to_code": "ZNZ"},
+        "summary": "", "summarized_upto": 0,
+    }
+
+
+def _turn(state: dict, text: str) -> dict:
+    """Ingest one user message; → the state after it."""
+    msg = HumanMessage(content=text)
+    state = {**state, "messages": state["messages"] + [msg]}
+    return {**state, **bot._ingest_message(state, msg)}
+
+
+@pytest.mark.parametrize("text, intent", [
+    ("what is the preset baggage allowance?", ""),
+    ("can you avoid early flights", ""),
+    ("my voided ticket", ""),
+    ("cancel my booking please", "cancel"),
+    ("Let's start over", "restart"),
+    ("never mind the baggage, when do we land?", "restart"),
+])
+def test_keywords_match_whole_words(text, intent):
+    assert bot._user_intent(text) == intent
+
+
+def test_ambiguous_restart_only_steers_this_turn():
+    state = _turn(_booked_state(), "never mind the baggage, when do we land?")
+    assert state["phase"] == "gathering"
+    assert (state["booking_id"], state["flight_id"], state["last_search"]) == (123, 456, {"from_code": "DAR", "to_code": "ZNZ"})
+
+    state = _turn(state, "thanks!")
+    assert state["phase"] == "post_booking"
+
+
+@pytest.mark.parametrize("text", ["start over", "ok, let's start over: Arusha to Zanzibar on Friday", "never mind"])
+def test_explicit_restart_drops_the_trip(text):
+    state = _turn(_booked_state(), text)
+    assert state["phase"] == "gathering"
+    assert (state["booking_id"], state["flight_id"], state["last_search"]) == (None, None, None)
+
+    state = _turn(state, "thanks!")
+    assert state["phase"] == "gathering"
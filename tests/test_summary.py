@@ -0,0 +1,45 @@
+"""The rolling summary is dropped only by an explicit restart, not by any
+message that happens to contain a restart keyword."""
+import os
+import sys
+
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+os.environ.setdefault("OPENAI_API_KEY", "test")  # bot builds ChatOpenAI clients at import
+
+from langchain_core.messages import AIMessage, HumanMessage  # noqa: E402
+
+import bot  # noqa: E402
+
+SUMMARY = "Traveller: 2 adults, DAR to ZNZ on 2026/11/20, prefers morning flights, booked TL100."
+
+
+def _route(text: str) -> dict:
+    """Run the entry node on a new user message; → the state after it."""
+    history = [HumanMessage(content=f"message {i}") if i % 2 == 0 else AIMessage(content=f"reply {i}")
+               for i in range(12)]
+    state = {
+        "messages": history + [HumanMessage(content=text)],
+        "booking_id": 123, "flight_id": 456, "cancelled": False,
+        "last_search": {"from_code": "DAR", "to_code": "ZNZ"},
+        "summary": SUMMARY, "summarized_upto": 8,
+    }
+    return {**state, **bot.router_node(state)}
+
+
+@pytest.mark.parametrize("text", [
+    "what is the preset baggage allowance?",
+    "is the ticket reset fee refundable?",
+    "never mind the baggage, when do we land?",
+])
+def test_summary_survives_keyword_substrings(text):
+    state = _route(text)
+    assert state["summary"] == SUMMARY
+    assert state["summarized_upto"] == 8
+
+
+def test_explicit_restart_drops_the_summary():
+    state = _route("let's start over")
+    assert state["summary"] == ""
+    assert state["summarized_upto"] == 12  # nothing before the restart is summarized again
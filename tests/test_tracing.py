@@ -0,0 +1,54 @@
+"""Request spans are labelled by route template, so made-up URLs can't add
+/metrics series, and trace export happens off the request path."""
+import json
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from fastapi import FastAPI  # noqa: E402
+from fastapi.testclient import TestClient  # noqa: E402
+
+import tracing  # noqa: E402
+from tracing import Metrics, TracingMiddleware  # noqa: E402
+
+
+def _client(monkeypatch) -> tuple:
+    metrics = Metrics()
+    monkeypatch.setattr(tracing, "metrics", metrics)
+    app = FastAPI()
+    app.add_middleware(TracingMiddleware)
+
+    @app.get("/items/{item_id}")
+    async def item(item_id: str):
+        return {"id": item_id}
+
+    return TestClient(app), metrics
+
+
+def _span_names(metrics: Metrics) -> set:
+    return {line.split('span="')[1].split('"')[0]
+            for line in metrics.render().splitlines() if 'span="http.' in line}
+
+
+def test_spans_use_the_route_template(monkeypatch):
+    client, metrics = _client(monkeypatch)
+    for path in ("/items/1", "/items/2", "/nonexistent-123", "/nonexistent-456"):
+        assert client.get(path).headers["x-trace-id"]
+    client.request("BREW", "/items/3")  # route found, method not allowed
+    client.request("BREW", "/nonexistent-789")
+
+    assert _span_names(metrics) == {
+        "http.GET /items/{item_id}", "http.GET unmatched", "http.OTHER /items/{item_id}", "http.OTHER unmatched",
+    }
+
+
+def test_export_is_written_by_the_writer_thread(tmp_path):
+    path = tmp_path / "traces.jsonl"
+    traces = [tracing.Trace("a"), tracing.Trace("b")]
+    for t in traces:
+        tracing.export(t, str(path))
+    assert tracing._export_writer is not None
+
+    tracing._stop_exports()  # waits for the queue to drain
+    assert [json.loads(line)["trace_id"] for line in path.read_text().splitlines()] == [t.trace_id for t in traces]
@@ -0,0 +1,276 @@
+import atexit
+import contextvars
+import os
+import queue
+import threading
+import time
+import uuid
+from bisect import bisect_left
+from contextlib import contextmanager
+from typing import Optional
+
+import serialization
+
+
+# Append every finished request trace to this file as one JSON line (off when empty)
+TRACE_EXPORT_PATH = os.getenv("TRACE_EXPORT_PATH", "")
+
+# Request spans are named by route template; anything else is counted under one label
+HTTP_METHODS = frozenset({"GET", "HEAD", "POST", "PUT", "PATCH", "DELETE", "OPTIONS"})
+UNMATCHED_ROUTE = "unmatched"
+
+# Histogram bucket upper bounds, in seconds
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+
+
+# ─────────────────────────────────────────────
+# METRICS — in-process histograms + counters
+# ─────────────────────────────────────────────
+
+class _Histogram:
+    def __init__(self, buckets: tuple):
+        self.buckets = buckets
+        self.counts = [0] * (len(buckets) + 1)  # last slot is +Inf
+        self.count = 0
+        self.sum = 0.0
+
+    def observe(self, value: float) -> None:
+        self.counts[bisect_left(self.buckets, value)] += 1
+        self.count += 1
+        self.sum += value
+
+
+class Metrics:
+    """Latency histograms keyed by span name, plus labelled counters.
+
+    Rendered in the Prometheus text format by /metrics.
+    """
+
+    def __init__(self, buckets: tuple = LATENCY_BUCKETS):
+        self.buckets = buckets
+        self._histograms = {}  # span name → _Histogram
+        self._counters = {}    # (metric, sorted label items) → value
+        self._lock = threading.Lock()
+
+    def observe(self, span_name: str, seconds: float) -> None:
+        with self._lock:
+            hist = self._histograms.get(span_name)
+            if hist is None:
+                hist = self._histograms[span_name] = _Histogram(self.buckets)
+            hist.observe(seconds)
+
+    def inc(self, metric: str, value: float = 1, **labels) -> None:
+        key = (metric, tuple(sorted(labels.items())))
+        with self._lock:
+            self._counters[key] = self._counters.get(key, 0) + value
+
+    def render(self) -> str:
+        with self._lock:
+            histograms = {name: (list(h.counts), h.count, h.sum) for name, h in self._histograms.items()}
+            counters = dict(self._counters)
+
+        lines = [
+            "# HELP travellink_span_seconds Latency of traced spans (requests, nodes, tools, LLM and AeroCRS calls).",
+            "# TYPE travellink_span_seconds histogram",
+        ]
+        for name in sorted(histograms):
+            counts, count, total = histograms[name]
+            label = _escape(name)
+            cumulative = 0
+            for bound, n in zip(self.buckets, counts):
+                cumulative += n
+                lines.append(f'travellink_span_seconds_bucket{{span="{label}",le="{bound}"}} {cumulative}')
+            lines.append(f'travellink_span_seconds_bucket{{span="{label}",le="+Inf"}} {count}')
+            lines.append(f'travellink_span_seconds_sum{{span="{label}"}} {total:.6f}')
+            lines.append(f'travellink_span_seconds_count{{span="{label}"}} {count}')
+
+        for metric in sorted({m for m, _ in counters}):
+            lines.append(f"# TYPE {metric} counter")
+            for (m, labels), value in sorted(counters.items()):
+                if m == metric:
+                    rendered = ",".join(f'{k}="{_escape(str(v))}"' for k, v in labels)
+                    lines.append(f"{metric}{{{rendered}}} {value}")
+        return "\n".join(lines) + "\n"
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+metrics = Metrics()
+
+
+# ─────────────────────────────────────────────
+# SPANS — per-request traces via contextvars
+# ─────────────────────────────────────────────
+
+class Span:
+    __slots__ = ("name", "span_id", "parent_id", "start", "duration", "attrs")
+
+    def __init__(self, name: str, parent_id: Optional[str], attrs: dict):
+        self.name = name
+        self.span_id = uuid.uuid4().hex[:16]
+        self.parent_id = parent_id
+        self.start = time.time()
+        self.duration = None
+        self.attrs = attrs
+
+    def set(self, **attrs) -> None:
+        self.attrs.update(attrs)
+
+    def to_dict(self) -> dict:
+        return {
+            "name": self.name,
+            "span_id": self.span_id,
+            "parent_id": self.parent_id,
+            "start": round(self.start, 6),
+            "duration_ms": round(self.duration * 1000, 3) if self.duration is not None else None,
+            "attrs": self.attrs,
+        }
+
+
+class Trace:
+    def __init__(self, name: str):
+        self.trace_id = uuid.uuid4().hex
+        self.name = name
+        self.spans = []
+        self._lock = threading.Lock()
+
+    def add(self, span: Span) -> None:
+        with self._lock:
+            self.spans.append(span)
+
+    def to_dict(self) -> dict:
+        with self._lock:
+            spans = [s.to_dict() for s in self.spans]
+        return {"trace_id": self.trace_id, "name": self.name, "spans": spans}
+
+
+_current_trace: contextvars.ContextVar = contextvars.ContextVar("trace", default=None)
+_current_span: contextvars.ContextVar = contextvars.ContextVar("span", default=None)
+
+_export_queue: queue.SimpleQueue = queue.SimpleQueue()  # (trace, path); None stops the writer
+_export_lock = threading.Lock()
+_export_writer = None
+
+
+@contextmanager
+def span(name: str, **attrs):
+    """Time a block: feeds the `name` histogram and, inside a request trace,
+    records the span (with attrs) under the current parent span."""
+    trace = _current_trace.get()
+    parent = _current_span.get()
+    s = Span(name, parent.span_id if parent else None, attrs)
+    token = _current_span.set(s)
+    start = time.perf_counter()
+    try:
+        yield s
+    except BaseException as e:
+        s.set(error=repr(e))
+        raise
+    finally:
+        s.duration = time.perf_counter() - start
+        _current_span.reset(token)
+        metrics.observe(s.name, s.duration)  # the block may have renamed it
+        if trace is not None:
+            trace.add(s)
+
+
+@contextmanager
+def trace(name: str, **attrs):
+    """Root span for one request; exports the finished trace if TRACE_EXPORT_PATH is set."""
+    t = Trace(name)
+    token = _current_trace.set(t)
+    root = None
+    try:
+        with span(name, **attrs) as root:
+            yield root
+    finally:
+        _current_trace.reset(token)
+        if root is not None:
+            t.name = root.name
+        if TRACE_EXPORT_PATH:
+            export(t)
+
+
+def _write_exports() -> None:
+    while True:
+        item = _export_queue.get()
+        if item is None:
+            return
+        t, path = item
+        try:
+            line = serialization.dumps(t.to_dict(), default=str)
+            with open(path, "a", encoding="utf-8") as f:
+                f.write(line + "\n")
+        except Exception:
+            pass  # a trace is best-effort; never take the writer down
+
+
+def _stop_exports() -> None:
+    """Write out what's queued and stop the writer; the next export starts a new one."""
+    global _export_writer
+    with _export_lock:
+        writer, _export_writer = _export_writer, None
+    if writer is not None:
+        _export_queue.put(None)
+        writer.join(timeout=5)
+
+
+atexit.register(_stop_exports)  # flush what's queued on shutdown
+
+
+def export(t: Trace, path: Optional[str] = None) -> None:
+    """Queue a finished trace for the writer thread, which appends it to
+    `path` as one JSON line — the request never waits on the file."""
+    global _export_writer
+    if _export_writer is None:
+        with _export_lock:
+            if _export_writer is None:
+                _export_writer = threading.Thread(target=_write_exports, name="trace-export", daemon=True)
+                _export_writer.start()
+    _export_queue.put((t, path or TRACE_EXPORT_PATH))
+
+
+def current_trace_id() -> Optional[str]:
+    t = _current_trace.get()
+    return t.trace_id if t else None
+
+
+# ─────────────────────────────────────────────
+# ASGI MIDDLEWARE — one trace per HTTP request
+# ─────────────────────────────────────────────
+
+class TracingMiddleware:
+    """Wraps each HTTP request in a trace. The app call only returns once the
+    whole body is sent, so streamed responses (/chat/stream) are timed to
+    completion. The trace id is returned in the X-Trace-Id header.
+
+    The root span is named after the matched route template
+    ("http.POST /chat"), never the raw path, so URLs a client makes up
+    ("/nonexistent-123", "/reset-chat/x") can't add metric series."""
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or scope["path"] == "/metrics":
+            return await self.app(scope, receive, send)
+
+        method = scope["method"] if scope["method"] in HTTP_METHODS else "OTHER"
+        with trace(f"http.{method} {UNMATCHED_ROUTE}") as root:
+            trace_id = current_trace_id().encode()
+
+            async def traced_send(message):
+                if message["type"] == "http.response.start":
+                    root.set(status=message["status"])
+                    message["headers"] = list(message.get("headers", [])) + [(b"x-trace-id", trace_id)]
+                await send(message)
+
+            try:
+                await self.app(scope, receive, traced_send)
+            finally:
+                # The router records the matched route in the scope on dispatch
+                route = getattr(scope.get("route"), "path", None)
+                if route:
+                    root.name = f"http.{method} {route}"